@@ -2,5 +2,6 @@
 
 # entrypoint script meant for use by Docker
 
-yes | yoyo apply
+# Run as a module, so migrations can import yellowstone
+yes | python -m yoyo apply
 exec python -m yellowstone /app/config.toml
@@ -0,0 +1,17 @@
+-- Notify listening dispatchers whenever jobs are added to the queue.
+-- depends: 20261018_job-claim-leases
+
+CREATE FUNCTION notify_job_added() RETURNS trigger AS $$
+BEGIN
+    -- Identical notifications within a transaction are merged,
+    -- so a bulk insert only wakes each listener once. The payload
+    -- says which dispatcher added the jobs, so it can ignore them.
+    PERFORM pg_notify('job_added', current_setting('application_name'));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER job_added
+    AFTER INSERT ON job
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_job_added();
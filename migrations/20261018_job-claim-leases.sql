@@ -0,0 +1,8 @@
+-- Add claim leases to jobs, so several dispatchers can share one queue.
+-- depends: 20240112_create-initial-tables
+
+ALTER TABLE job
+    ADD COLUMN claimed_by TEXT,
+    ADD COLUMN claimed_at TIMESTAMP WITH TIME ZONE;
+
+CREATE INDEX job_claimed_at_idx ON job (claimed_at);
@@ -0,0 +1,40 @@
+"""
+Deduplicate jobs by a fixed-width hash, instead of indexing the whole JSONB payload.
+
+Jobs already in the queue are keyed with job_dedup_key() itself,
+so their keys match the ones computed when adding jobs.
+"""
+
+from yoyo import step
+
+from yellowstone.job import JobType, job_dedup_key
+
+__depends__ = {"20261018_job-priority-site"}
+
+
+def backfill_dedup_key(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT job_id, job_type, data FROM job")
+    keys = [
+        (job_dedup_key(JobType(job_type), data), job_id)
+        for job_id, job_type, data in cursor.fetchall()
+    ]
+    cursor.executemany("UPDATE job SET dedup_key = %s WHERE job_id = %s", keys)
+
+
+steps = [
+    step("ALTER TABLE job ADD COLUMN dedup_key BYTEA"),
+    step(backfill_dedup_key),
+    # 16 bytes is the KangarooTwelve hash size, 128 bits
+    step(
+        """
+        ALTER TABLE job
+            ALTER COLUMN dedup_key SET NOT NULL,
+            ADD CONSTRAINT job_dedup_key_length CHECK (length(dedup_key) = 16),
+            ADD CONSTRAINT job_dedup_key_unique UNIQUE (dedup_key),
+            DROP CONSTRAINT job_job_type_data_key
+        """
+    ),
+    # For finding a site's jobs of a particular type
+    step("CREATE INDEX job_site_type_idx ON job (site_slug, job_type)"),
+]
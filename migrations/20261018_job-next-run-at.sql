@@ -0,0 +1,7 @@
+-- Add scheduled run times to jobs, so failed jobs are retried with a delay.
+-- depends: 20261018_job-added-notify
+
+ALTER TABLE job
+    ADD COLUMN next_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+
+CREATE INDEX job_next_run_at_idx ON job (next_run_at);
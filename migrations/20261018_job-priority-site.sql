@@ -0,0 +1,24 @@
+-- Add priorities and sites to jobs, for fair scheduling across sites.
+-- depends: 20261018_job-next-run-at
+
+ALTER TABLE job
+    ADD COLUMN site_slug TEXT,
+    ADD COLUMN priority SMALLINT NOT NULL DEFAULT 0;
+
+-- Jobs without a site make their requests to www.wikidot.com
+UPDATE job SET
+    site_slug = COALESCE(data ->> 'site_slug', 'www'),
+    priority = CASE job_type
+        WHEN 'index-site-pages' THEN 3
+        WHEN 'index-forum-categories' THEN 3
+        WHEN 'index-site-members' THEN 2
+        WHEN 'index-forum-threads' THEN 2
+        WHEN 'fetch-user' THEN 1
+        ELSE 0
+    END;
+
+ALTER TABLE job ALTER COLUMN site_slug SET NOT NULL;
+
+-- Jobs are claimed per site, highest priority first
+DROP INDEX job_next_run_at_idx;
+CREATE INDEX job_claim_idx ON job (site_slug, priority DESC, next_run_at);
@@ -0,0 +1,9 @@
+-- Add token buckets for rate limiting requests to Wikidot.
+-- depends: 20261018_job-dedup-key
+
+-- Bucket state is cheap to lose, so skip the write-ahead log
+CREATE UNLOGGED TABLE rate_limit (
+    bucket TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,  -- Negative when reserved ahead
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
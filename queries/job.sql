@@ -1,24 +1,81 @@
 -- :name add_job :insert
-INSERT INTO job (job_type, data)
-    VALUES (:job_type, :data)
-    ON CONFLICT (job_type, data)
+INSERT INTO job (job_type, site_slug, priority, dedup_key, data)
+    VALUES (:job_type, :site_slug, :priority, :dedup_key, :data)
+    ON CONFLICT (dedup_key)
+    DO NOTHING;
+
+-- :name add_jobs :affected
+INSERT INTO job (job_type, site_slug, priority, dedup_key, data)
+    SELECT :job_type, new_job.site_slug, :priority, decode(new_job.dedup_key, 'hex'), new_job.data
+        FROM jsonb_to_recordset(CAST(:jobs AS JSONB))
+            AS new_job (site_slug TEXT, dedup_key TEXT, data JSONB)
+    ON CONFLICT (dedup_key)
     DO NOTHING;
 
 -- :name has_jobs :one
 SELECT EXISTS (SELECT * FROM job LIMIT 1);
 
--- :name get_job :one
-SELECT * FROM job ORDER BY random() LIMIT 1;
+-- :name claim_jobs :many
+WITH site AS (
+    SELECT * FROM jsonb_to_recordset(CAST(:sites AS JSONB))
+        AS site (site_slug TEXT, turn INTEGER, weight INTEGER, capacity INTEGER)
+), candidate AS (
+    SELECT
+        site_job.job_id,
+        site.turn,
+        (row_number() OVER (
+            PARTITION BY site.turn
+            ORDER BY site_job.priority DESC, site_job.next_run_at
+        ) - 1) / site.weight AS round
+    FROM site
+    CROSS JOIN LATERAL (
+        SELECT job_id, priority, next_run_at FROM job
+            WHERE job.site_slug = site.site_slug
+            AND next_run_at <= now()
+            AND (claimed_at IS NULL OR claimed_at < now() - make_interval(secs => :lease_seconds))
+            ORDER BY priority DESC, next_run_at
+            LIMIT site.capacity
+            FOR UPDATE SKIP LOCKED
+    ) AS site_job
+    ORDER BY round, site.turn
+    LIMIT :count
+)
+UPDATE job
+    SET claimed_by = :worker_id, claimed_at = now()
+    FROM candidate
+    WHERE job.job_id = candidate.job_id
+    RETURNING job.*;
+
+-- :name release_jobs :affected
+UPDATE job
+    SET claimed_by = NULL, claimed_at = NULL
+    WHERE claimed_by = :worker_id;
 
 -- :name fail_job :affected
 UPDATE job
-    SET attempts = attempts + 1
+    SET
+        attempts = attempts + 1,
+        next_run_at = now() + make_interval(secs => :retry_delay),
+        claimed_by = NULL,
+        claimed_at = NULL
+    WHERE job_id = :job_id;
+
+-- :name defer_job :affected
+UPDATE job
+    SET
+        next_run_at = now() + make_interval(secs => :delay),
+        claimed_by = NULL,
+        claimed_at = NULL
     WHERE job_id = :job_id;
 
 -- :name delete_job :affected
 DELETE FROM job
     WHERE job_id = :job_id;
 
+-- :name delete_jobs :affected
+DELETE FROM job
+    WHERE job_id IN :job_ids;
+
 -- :name add_dead_job :insert
 INSERT INTO job_dead (job_id, job_type, data)
     VALUES (:job_id, :job_type, :data);
@@ -0,0 +1,12 @@
+-- :name take_rate_limit_token :scalar
+INSERT INTO rate_limit (bucket, tokens, updated_at)
+    VALUES (:bucket, :burst - 1, clock_timestamp())
+    ON CONFLICT (bucket)
+    DO UPDATE
+    SET
+        tokens = LEAST(
+            :burst,
+            rate_limit.tokens + :rate * EXTRACT(EPOCH FROM clock_timestamp() - rate_limit.updated_at)
+        ) - 1,
+        updated_at = clock_timestamp()
+    RETURNING tokens;
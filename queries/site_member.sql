@@ -6,5 +6,6 @@ INSERT INTO site_member (user_id, site_id, joined_at)
 
 -- :name get_site_member_job :one
 SELECT * FROM job
-    WHERE job_type = 'index-site-members'
-    AND data ->> 'site_slug' = :site_slug;
+    WHERE site_slug = :site_slug
+    AND job_type = 'index-site-members'
+    LIMIT 1;
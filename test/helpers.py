@@ -5,11 +5,15 @@ Helpers and utilities for the Yellowstone unit tests.
 import json
 import os
 from dataclasses import dataclass
-from typing import Union
+from typing import Iterator, Optional, Union
 
+from yellowstone.cassette import CassetteMode
 from yellowstone.config import Config
+from yellowstone.ratelimit import RateLimit
+from yellowstone.retry import RetryClass, RetryPolicy
 from yellowstone.types import Json
 from yellowstone.wikidot import Wikidot
+from yellowstone.wikidot_async import AsyncWikidot
 
 TEST_SOURCE = "[test_source]"
 
@@ -41,12 +45,15 @@ class FakeResponse:
             },
         )
 
+    status_code = 200
+
     def raise_for_status(self):
         pass
 
     @property
     def content(self) -> Union[bytes, str]:
-        assert isinstance(self.data, (bytes, str))
+        if isinstance(self.data, dict):
+            return json.dumps(self.data).encode()
         return self.data
 
     @property
@@ -58,6 +65,16 @@ class FakeResponse:
         assert isinstance(self.data, dict)
         return self.data
 
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        content = self.content
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        for start in range(0, len(content), chunk_size):
+            yield content[start : start + chunk_size]
+
+    def close(self):
+        pass
+
 
 def get_test_data(filename: str, extension: str = "html") -> str:
     path = os.path.join(os.path.dirname(__file__), "data", f"{filename}.{extension}")
@@ -69,12 +86,55 @@ def get_test_json(filename: str, extension: str = "json") -> Json:
     return json.loads(get_test_data(filename, extension))  # type: ignore
 
 
-def make_wikidot() -> Wikidot:
+def make_wikidot(base_url: Optional[str] = None) -> Wikidot:
     config = Config(
         s3_bucket="test",
         site_slugs=["test", "test-tls"],
         sites_use_tls=["test-tls"],
         sites_use_admin_members=[],
         always_fetch_site=True,
+        scraper_parser="html.parser",
+        scraper_workers=0,
+        wikidot_base_url=base_url,
+        worker_count=4,
+        worker_site_limit=2,
+        worker_site_limits={},
+        job_lease_seconds=900,
+        job_claim_batch=4,
+        job_flush_interval=5,
+        site_weights={"www": 2},
+        worker_async=False,
+        worker_async_count=16,
+        worker_async_site_limit=4,
+        rate_limit_shared=False,
+        rate_limit_default=RateLimit(rate=1000.0, burst=1000),
+        rate_limits={},
+        concurrency_initial=2,
+        concurrency_min=1,
+        concurrency_max=4,
+        concurrency_latency_target=3.0,
+        concurrency_backoff=0.5,
+        http_pool_size=4,
+        http_connect_timeout=10,
+        http_read_timeout=60,
+        http_coalesce_ttl=30,
+        http_coalesce_max_bytes=16 * 1024 * 1024,
+        retry_policies={
+            klass: RetryPolicy(retries=2, base_delay=0, max_delay=0)
+            for klass in RetryClass
+        },
+        circuit_failures=5,
+        circuit_open_seconds=60,
+        cache_enabled=False,
+        cache_directory="cache",
+        cache_max_bytes=16 * 1024 * 1024,
+        cache_ttl=86400,
+        cache_ttls={},
+        cassette_mode=CassetteMode.OFF,
+        cassette_path="cassette.jsonl.gz",
     )
     return Wikidot(config, username="test", api_key="test")
+
+
+def make_async_wikidot(base_url: Optional[str] = None) -> AsyncWikidot:
+    return AsyncWikidot(make_wikidot(base_url), username="test", api_key="test")
@@ -0,0 +1,66 @@
+import threading
+import unittest
+import xmlrpc.client
+from unittest.mock import patch
+
+import requests
+
+from yellowstone.api import decode_response, encode_call
+
+from .helpers import FakeResponse, make_wikidot
+
+
+class TestEncoding(unittest.TestCase):
+    def test_encode(self):
+        body = encode_call("posts.get", ({"posts": ["1"]},))
+        params, method = xmlrpc.client.loads(body)
+        self.assertEqual(method, "posts.get")
+        self.assertEqual(params, ({"posts": ["1"]},))
+
+    def test_decode_fault(self):
+        body = xmlrpc.client.dumps(xmlrpc.client.Fault(500, "Broken"))
+        with self.assertRaises(xmlrpc.client.Fault):
+            decode_response(body)
+
+
+class TestWikidotApi(unittest.TestCase):
+    def setUp(self):
+        self.wikidot = make_wikidot()
+
+    def test_posts_get_many(self):
+        # Both calls must be in flight at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def respond(method, url, *, data, **kwargs):
+            (arguments,), method = xmlrpc.client.loads(data)
+            self.assertEqual(method, "posts.get")
+            barrier.wait()
+            if arguments["posts"] == ["3"]:
+                fault = xmlrpc.client.Fault(406, "Bad post")
+                return FakeResponse(xmlrpc.client.dumps(fault, methodresponse=True))
+
+            # Echoes back which posts were requested
+            result = {post: {} for post in arguments["posts"]}
+            return FakeResponse(xmlrpc.client.dumps((result,), methodresponse=True))
+
+        with patch.object(requests.Session, "request", side_effect=respond) as mock:
+            first, second = self.wikidot.api.posts_get_many(
+                site="test",
+                batches=[["1", "2"], ["3"]],
+            )
+
+        # One request per call, merged back in order,
+        # with the first made on this thread, and the rest on the pool
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(
+            self.wikidot.api.executor._max_workers,
+            self.wikidot.config.worker_count,
+        )
+        self.assertEqual(first, {"1": {}, "2": {}})
+        self.assertIsInstance(second, xmlrpc.client.Fault)
+        self.assertEqual(second.faultCode, 406)
+
+    def test_close(self):
+        self.wikidot.close()
+        with self.assertRaises(RuntimeError):
+            self.wikidot.api.executor.submit(print)
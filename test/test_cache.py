@@ -0,0 +1,58 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from yellowstone import cache
+from yellowstone.cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(
+            self.directory.name,
+            default_ttl=60,
+            ttls={"users/UserInfoWinModule": 3600},
+            max_bytes=1000,
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get("html", "http://test.wikidot.com"))
+        self.cache.put("html", "http://test.wikidot.com", b"<html></html>")
+        self.assertEqual(
+            self.cache.get("html", "http://test.wikidot.com"),
+            b"<html></html>",
+        )
+
+        # Keys are separate per namespace
+        self.assertIsNone(self.cache.get("forum/ForumStartModule", "key"))
+
+    def test_ttl(self):
+        self.cache.put("html", "key", b"html")
+        self.cache.put("users/UserInfoWinModule", "key", b"user")
+
+        later = time.time() + 120
+        with patch.object(cache.time, "time", return_value=later):
+            self.assertIsNone(self.cache.get("html", "key"))
+            self.assertEqual(self.cache.get("users/UserInfoWinModule", "key"), b"user")
+
+    def test_evict(self):
+        for index in range(4):
+            self.cache.put("html", str(index), b"x" * 300)
+            path = self.cache.path("html", str(index))
+            os.utime(path, (index, time.time()))
+
+        # Entry 0 was evicted first, then entry 1 is used again
+        # so entry 2 is the least recently used
+        os.utime(self.cache.path("html", "1"), (10, time.time()))
+        self.cache.put("html", "4", b"x" * 300)
+
+        self.assertIsNone(self.cache.get("html", "0"))
+        self.assertIsNone(self.cache.get("html", "2"))
+        self.assertEqual(self.cache.get("html", "1"), b"x" * 300)
+        self.assertLessEqual(self.cache.size, 900)
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+import aiohttp
+import requests
+
+from yellowstone.cassette import CassetteMode, request_key
+from yellowstone.exception import CassetteError
+from yellowstone.request import user_avatar
+from yellowstone.wikidot import Wikidot
+from yellowstone.wikidot_async import AsyncWikidot
+
+from .helpers import FakeResponse, make_wikidot
+
+
+class TestCassette(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = replace(
+            make_wikidot().config,
+            cassette_path=os.path.join(self.directory.name, "cassette.jsonl.gz"),
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_wikidot(self, mode: CassetteMode) -> Wikidot:
+        config = replace(self.config, cassette_mode=mode)
+        return Wikidot(config, username="test", api_key="test")
+
+    def test_request_key(self):
+        key = request_key("POST", "url", data={"p": 1, "wikidot_token7": "a"})
+        self.assertEqual(
+            key,
+            request_key("POST", "url", data={"p": "1", "wikidot_token7": "b"}),
+        )
+        self.assertNotEqual(key, request_key("POST", "url", data={"p": 2}))
+
+    async def test_record_replay(self):
+        http_response = FakeResponse.ajax_from_file("user_info_win")
+        avatar_response = FakeResponse(b"\x89PNG\xff")
+        wikidot = self.make_wikidot(CassetteMode.RECORD)
+        with patch.object(
+            requests.Session,
+            "request",
+            side_effect=[http_response, avatar_response],
+        ):
+            html = wikidot.ajax_module_connector(
+                "www",
+                "users/UserInfoWinModule",
+                {"user_id": 4598089},
+            )
+            avatar = user_avatar.get(4598089, wikidot=wikidot)
+        wikidot.close()
+
+        # Replayed without any requests
+        wikidot = self.make_wikidot(CassetteMode.REPLAY)
+        with patch.object(requests.Session, "request") as mock:
+            self.assertEqual(
+                wikidot.ajax_module_connector(
+                    "www",
+                    "users/UserInfoWinModule",
+                    {"user_id": 4598089},
+                ),
+                html,
+            )
+            self.assertEqual(user_avatar.get(4598089, wikidot=wikidot), avatar)
+            mock.assert_not_called()
+
+            with self.assertRaises(CassetteError):
+                user_avatar.get(1, wikidot=wikidot)
+
+        # Also by the asyncio client
+        async with AsyncWikidot(wikidot, username="test", api_key="test") as client:
+            self.assertEqual(
+                await user_avatar.get_async(4598089, wikidot=client), avatar
+            )
+
+    async def test_replay_error(self):
+        wikidot = self.make_wikidot(CassetteMode.RECORD)
+        assert wikidot.cassette is not None
+        key = request_key("GET", "http://test.wikidot.com")
+        wikidot.cassette.record(key, 503, b"")
+        wikidot.close()
+
+        wikidot = self.make_wikidot(CassetteMode.REPLAY)
+        with self.assertRaises(requests.HTTPError):
+            wikidot.get("test", "http://test.wikidot.com")
+
+        # A new client, so the failures above have not opened the circuit
+        wikidot = self.make_wikidot(CassetteMode.REPLAY)
+        async with AsyncWikidot(wikidot, username="test", api_key="test") as client:
+            with self.assertRaises(aiohttp.ClientResponseError):
+                await client.get("test", "http://test.wikidot.com")
@@ -0,0 +1,166 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from yellowstone import circuit
+from yellowstone.circuit import CircuitBreaker, CircuitState
+from yellowstone.exception import CircuitOpenError
+from yellowstone.job import JobManager
+
+from .helpers import FakeResponse, make_wikidot
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=3, open_seconds=60)
+
+    def record_failures(self, key: str, count: int):
+        for _ in range(count):
+            probe = self.breaker.check(key)
+            self.breaker.record(key, probe, healthy=False)
+
+    def test_open(self):
+        with patch.object(circuit.time, "monotonic", return_value=100.0):
+            self.record_failures("scp-wiki", 2)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.CLOSED)
+
+            self.record_failures("scp-wiki", 1)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.OPEN)
+
+            with self.assertRaises(CircuitOpenError) as context:
+                self.breaker.check("scp-wiki")
+            self.assertEqual(context.exception.retry_after, 60)
+
+            # Other sites are unaffected
+            self.breaker.check("www")
+
+    def test_success_resets(self):
+        with patch.object(circuit.time, "monotonic", return_value=100.0):
+            self.record_failures("scp-wiki", 2)
+            self.breaker.record("scp-wiki", None, healthy=True)
+            self.record_failures("scp-wiki", 2)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.CLOSED)
+
+    def test_half_open(self):
+        with patch.object(circuit.time, "monotonic", return_value=100.0):
+            self.record_failures("scp-wiki", 3)
+
+        with patch.object(circuit.time, "monotonic", return_value=170.0):
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.HALF_OPEN)
+
+            # Only one probe at a time
+            probe = self.breaker.check("scp-wiki")
+            self.assertIsNotNone(probe)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.check("scp-wiki")
+
+            # Failed probe opens it again
+            self.breaker.record("scp-wiki", probe, healthy=False)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.OPEN)
+
+        with patch.object(circuit.time, "monotonic", return_value=240.0):
+            probe = self.breaker.check("scp-wiki")
+            self.breaker.record("scp-wiki", probe, healthy=True)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.CLOSED)
+            self.assertIsNone(self.breaker.check("scp-wiki"))
+
+    def test_probe_cancelled(self):
+        with patch.object(circuit.time, "monotonic", return_value=100.0):
+            self.record_failures("scp-wiki", 3)
+
+        with patch.object(circuit.time, "monotonic", return_value=170.0):
+            probe = self.breaker.check("scp-wiki")
+            self.breaker.cancel("scp-wiki", probe)
+
+            # Another request can probe instead
+            self.assertIsNotNone(self.breaker.check("scp-wiki"))
+
+    def test_stale_result(self):
+        with patch.object(circuit.time, "monotonic", return_value=100.0):
+            self.record_failures("scp-wiki", 3)
+
+        with patch.object(circuit.time, "monotonic", return_value=170.0):
+            probe = self.breaker.check("scp-wiki")
+
+            # Sent before the circuit opened, so it doesn't decide anything
+            self.breaker.record("scp-wiki", None, healthy=True)
+            self.breaker.cancel("scp-wiki", object())
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.HALF_OPEN)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.check("scp-wiki")
+
+            self.breaker.record("scp-wiki", probe, healthy=True)
+            self.assertEqual(self.breaker.state("scp-wiki"), CircuitState.CLOSED)
+
+    def test_wikidot_probe_not_sent(self):
+        wikidot = make_wikidot()
+        wikidot.circuit = CircuitBreaker(threshold=1, open_seconds=0)
+        wikidot.circuit.record("test", None, healthy=False)
+        self.assertEqual(wikidot.circuit.state("test"), CircuitState.HALF_OPEN)
+
+        # The probe fails before the request is sent
+        with (
+            patch.object(
+                type(wikidot.rate_limiter),
+                "acquire",
+                side_effect=RuntimeError("database down"),
+            ),
+            patch.object(requests.Session, "request") as mock,
+        ):
+            with self.assertRaises(RuntimeError):
+                wikidot.get("test", "http://test.wikidot.com")
+        mock.assert_not_called()
+
+        # So the circuit isn't stuck waiting for it
+        self.assertFalse(wikidot.circuit.probing)
+        with patch.object(
+            requests.Session,
+            "request",
+            return_value=FakeResponse("<html></html>"),
+        ):
+            wikidot.get("test", "http://test.wikidot.com")
+        self.assertEqual(wikidot.circuit.state("test"), CircuitState.CLOSED)
+
+    def test_wikidot_fast_fail(self):
+        wikidot = make_wikidot()
+        response = FakeResponse({"status": "ok"})
+        response.raise_for_status = MagicMock(
+            side_effect=requests.HTTPError(response=MagicMock(status_code=503)),
+        )
+        with patch.object(requests.Session, "request", return_value=response) as mock:
+            with self.assertRaises(requests.HTTPError):
+                wikidot.get("test", "http://test.wikidot.com")
+
+            # Opens partway through the retries of the second request
+            for _ in range(2):
+                with self.assertRaises(CircuitOpenError):
+                    wikidot.get("test", "http://test.wikidot.com")
+
+        self.assertEqual(mock.call_count, wikidot.config.circuit_failures)
+
+    def test_job_deferred(self):
+        database = MagicMock()
+        manager = JobManager(
+            database,
+            lease_seconds=900,
+            flush_interval=5,
+            site_weights={},
+        )
+        job = {
+            "job_id": 1,
+            "job_type": "fetch-user",
+            "site_slug": "www",
+            "priority": 1,
+            "attempts": 0,
+            "data": {"user_id": 1},
+        }
+        with patch.object(
+            JobManager,
+            "run",
+            side_effect=CircuitOpenError("www", 30),
+        ):
+            manager.process(MagicMock(), job)
+
+        database.defer_job.assert_called_once_with(job_id=1, delay=30)
+        database.fail_job.assert_not_called()
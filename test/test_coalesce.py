@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from yellowstone import coalesce
+from yellowstone.coalesce import Coalescer
+
+
+class TestCoalescer(unittest.TestCase):
+    def test_in_flight(self):
+        coalescer = Coalescer(ttl=30, max_bytes=1024, size=len)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(None)
+            started.set()
+            release.wait()
+            return "response"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(coalescer.get, "key", func)
+            started.wait()
+            followers = [executor.submit(coalescer.get, "key", func) for _ in range(3)]
+            release.set()
+            results = [future.result() for future in [leader, *followers]]
+
+        self.assertEqual(results, ["response"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(coalescer.in_flight)
+
+    def test_ttl(self):
+        coalescer = Coalescer(ttl=30, max_bytes=1024, size=len)
+        with patch.object(coalesce.time, "monotonic", return_value=100.0):
+            self.assertEqual(coalescer.get("key", lambda: "1"), "1")
+            self.assertEqual(coalescer.get("key", lambda: "2"), "1")
+            self.assertEqual(coalescer.get("other", lambda: "3"), "3")
+
+        with patch.object(coalesce.time, "monotonic", return_value=131.0):
+            self.assertEqual(coalescer.get("key", lambda: "4"), "4")
+
+    def test_max_bytes(self):
+        coalescer = Coalescer(ttl=30, max_bytes=10, size=len)
+        coalescer.get("first", lambda: "a" * 4)
+        coalescer.get("second", lambda: "b" * 4)
+        coalescer.get("third", lambda: "c" * 4)
+
+        # The oldest is dropped to make room
+        self.assertEqual(list(coalescer.results), ["second", "third"])
+        self.assertEqual(coalescer.results_bytes, 8)
+
+        # Too large to keep at all
+        coalescer.get("large", lambda: "d" * 11)
+        self.assertNotIn("large", coalescer.results)
+        self.assertEqual(coalescer.results_bytes, 8)
+
+    def test_failure(self):
+        coalescer = Coalescer(ttl=30, max_bytes=1024, size=len)
+
+        def fail():
+            raise RuntimeError("failed")
+
+        with self.assertRaises(RuntimeError):
+            coalescer.get("key", fail)
+
+        # Failures are not kept
+        self.assertEqual(coalescer.get("key", lambda: "1"), "1")
+
+    def test_async(self):
+        coalescer = Coalescer(ttl=0, max_bytes=1024, size=len)
+        calls = []
+
+        async def func():
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return "response"
+
+        async def main():
+            return await asyncio.gather(
+                *(coalescer.get_async("key", func) for _ in range(5)),
+            )
+
+        self.assertEqual(asyncio.run(main()), ["response"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(coalescer.in_flight_async)
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+from yellowstone import concurrency
+from yellowstone.concurrency import ConcurrencyController
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        self.controller = ConcurrencyController(
+            initial=2,
+            minimum=1,
+            maximum=4,
+            latency_target=1.0,
+            backoff=0.5,
+        )
+
+    def request(self, key: str, *, latency: float = 0.1, healthy: bool = True):
+        self.controller.acquire(key)
+        self.controller.release(key, latency=latency, healthy=healthy)
+
+    def test_increase(self):
+        self.assertEqual(self.controller.limit("scp-wiki"), 2)
+        for _ in range(3):
+            self.request("scp-wiki")
+        self.assertEqual(self.controller.limit("scp-wiki"), 3)
+
+        # Capped at the maximum
+        for _ in range(20):
+            self.request("scp-wiki")
+        self.assertEqual(self.controller.limit("scp-wiki"), 4)
+        self.assertEqual(self.controller.limits(), {"scp-wiki": 4})
+
+    def test_decrease(self):
+        for _ in range(20):
+            self.request("scp-wiki")
+
+        with patch.object(concurrency.time, "monotonic", return_value=100.0):
+            self.request("scp-wiki", healthy=False)
+            self.assertEqual(self.controller.limit("scp-wiki"), 2)
+
+            # Only cut once per latency target
+            self.request("scp-wiki", latency=5.0)
+            self.assertEqual(self.controller.limit("scp-wiki"), 2)
+
+        with patch.object(concurrency.time, "monotonic", return_value=102.0):
+            # Slow responses count as unhealthy, but not below the minimum
+            self.request("scp-wiki", latency=5.0)
+            self.assertEqual(self.controller.limit("scp-wiki"), 1)
+
+        with patch.object(concurrency.time, "monotonic", return_value=104.0):
+            self.request("scp-wiki", latency=5.0)
+            self.assertEqual(self.controller.limit("scp-wiki"), 1)
+
+        # Other sites are unaffected
+        self.assertEqual(self.controller.limit("www"), 2)
+
+    def test_try_acquire(self):
+        self.assertTrue(self.controller.try_acquire("scp-wiki"))
+        self.assertTrue(self.controller.try_acquire("scp-wiki"))
+        self.assertFalse(self.controller.try_acquire("scp-wiki"))
+        self.controller.release("scp-wiki", latency=0.1, healthy=True)
+        self.assertTrue(self.controller.try_acquire("scp-wiki"))
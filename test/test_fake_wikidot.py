@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+
+from aiohttp import ClientResponseError
+from aiohttp.test_utils import TestServer
+
+from yellowstone.fake_wikidot import FakeWikidot, FakeWikidotOptions
+from yellowstone.request import (
+    forum_categories,
+    forum_post_revisions,
+    forum_posts,
+    forum_threads,
+    site_home_raw,
+    site_members,
+    user,
+    user_avatar,
+)
+
+from .helpers import make_async_wikidot, make_wikidot
+
+OPTIONS = FakeWikidotOptions(
+    categories=3,
+    threads=25,
+    posts=12,
+    revisions=3,
+    members=30,
+    users=50,
+    seed=0,
+)
+
+
+class TestFakeWikidot(unittest.IsolatedAsyncioTestCase):
+    async def start(self, options: FakeWikidotOptions) -> str:
+        server = TestServer(FakeWikidot(["test", "test-tls"], options).app())
+        await server.start_server()
+        self.addAsyncCleanup(server.close)
+        return str(server.make_url("")).rstrip("/")
+
+    async def test_scrapers(self):
+        base_url = await self.start(OPTIONS)
+        async with make_async_wikidot(base_url) as wikidot:
+            site = await site_home_raw.get_async("test-tls", wikidot=wikidot)
+            self.assertEqual(site.slug, "test-tls")
+            self.assertIsNotNone(site.home_page_discussion_thread_id)
+
+            groups = await forum_categories.get_async("test", wikidot=wikidot)
+            categories = [category for group in groups for category in group.categories]
+            self.assertEqual(len(categories), OPTIONS.categories)
+
+            category_id = categories[0].id
+            pages = [
+                await forum_threads.get_async(
+                    "test",
+                    category_id=category_id,
+                    offset=offset,
+                    wikidot=wikidot,
+                )
+                for offset in (1, 2, 3)
+            ]
+            self.assertEqual([len(page) for page in pages], [20, 5, 0])
+            self.assertTrue(pages[0][0].sticky)
+
+            thread = pages[0][1]
+            self.assertEqual(thread.last_post.thread_id, thread.id)
+            posts = await forum_posts.get_async(
+                "test",
+                category_id=category_id,
+                thread_id=thread.id,
+                offset=1,
+                wikidot=wikidot,
+            )
+            self.assertEqual(len(posts), OPTIONS.posts)
+            self.assertEqual(posts[-1].id, thread.last_post.post_id)
+
+            members = await site_members.get_async("test", 2, wikidot=wikidot)
+            self.assertEqual(len(members), 10)
+
+            model = await user.get_async(members[0].id, wikidot=wikidot)
+            self.assertEqual(model.slug, members[0].slug)
+
+            avatar = await user_avatar.get_async(model.id, wikidot=wikidot)
+            self.assertTrue(avatar.startswith(b"GIF"))
+
+        # The synchronous client blocks, so must not run on the server's loop
+        revisions = await asyncio.to_thread(
+            forum_post_revisions.get,
+            "test",
+            category_id=category_id,
+            thread_id=thread.id,
+            post_id=posts[0].id,
+            wikidot=make_wikidot(base_url),
+        )
+        self.assertEqual(len(revisions), OPTIONS.revisions)
+
+    async def test_errors(self):
+        base_url = await self.start(FakeWikidotOptions(error_rate=1, seed=0))
+        async with make_async_wikidot(base_url) as wikidot:
+            with self.assertRaises(ClientResponseError) as context:
+                await site_home_raw.get_async("test", wikidot=wikidot)
+
+        self.assertGreaterEqual(context.exception.status, 500)
+
+    def test_scale_too_large(self):
+        with self.assertRaises(ValueError):
+            FakeWikidot(["test"], FakeWikidotOptions(threads=10**6, posts=10**4))
@@ -15,7 +15,9 @@ class TestForumCategories(unittest.TestCase):
 
     def test_forum_categories(self):
         http_response = FakeResponse.ajax_from_file("forum_categories")
-        with patch.object(requests, "post", return_value=http_response) as mock:
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
             models = forum_categories.get("scp-wiki", wikidot=self.wikidot)
             mock.assert_called_once()
 
@@ -18,8 +18,8 @@ class TestForumPostRevision(unittest.TestCase):
         http_response_3 = FakeResponse.from_json("forum_post_revision_3", "json")
 
         with patch.object(
-            requests,
-            "post",
+            requests.Session,
+            "request",
             side_effect=[http_response_1, http_response_2, http_response_3],
         ) as mock:
 
@@ -14,7 +14,9 @@ class TestForumPostRevisions(unittest.TestCase):
 
     def test_forum_posts(self):
         http_response = FakeResponse.ajax_from_file("forum_post_revisions")
-        with patch.object(requests, "post", return_value=http_response) as mock:
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
             revision_ids = forum_post_revisions.get(
                 site_slug="scptestwiki",
                 category_id=6196661,
@@ -1,8 +1,10 @@
 import unittest
-from unittest.mock import call, patch
+import xmlrpc.client
+from unittest.mock import patch
 
 import requests
 
+from yellowstone.api import API_PATH
 from yellowstone.request import forum_posts
 from yellowstone.request.forum_posts import ForumPostData
 
@@ -18,29 +20,46 @@ class TestForumPosts(unittest.TestCase):
         api_response_1 = get_test_json("forum_posts_1")
         api_response_2 = get_test_json("forum_posts_2")
 
-        with patch.object(requests, "post", return_value=http_response) as ajax_mock:
-            with patch.object(
-                self.wikidot.api,
-                "posts_get",
-                side_effect=[api_response_1, api_response_2],
-            ) as api_mock:
-                models = forum_posts.get(
-                    "scp-wiki",
-                    category_id=50742,
-                    thread_id=76692,
-                    offset=1,
-                    wikidot=self.wikidot,
-                )
+        api_responses = {"326022": api_response_1, "4688320": api_response_2}
+        api_calls = []
 
-                # calls once for the whole HTML
-                ajax_mock.assert_called_once()
+        def respond(method, url, **kwargs):
+            if not url.endswith(API_PATH):
+                return http_response
 
-                # calls twice for each group of posts (chunks of 10)
-                api_mock.assert_has_calls(
-                    [
-                        call(
-                            site="scp-wiki",
-                            posts=[
+            params, method = xmlrpc.client.loads(kwargs["data"])
+            api_calls.append((method, params))
+            (arguments,) = params
+            result = api_responses[arguments["posts"][0]]
+            return FakeResponse(
+                xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True),
+            )
+
+        with patch.object(
+            requests.Session,
+            "request",
+            side_effect=respond,
+        ) as mock:
+            models = forum_posts.get(
+                "scp-wiki",
+                category_id=50742,
+                thread_id=76692,
+                offset=1,
+                wikidot=self.wikidot,
+            )
+
+        # calls once for the whole HTML, then once for each
+        # group of posts (chunks of 10), made concurrently
+        self.assertEqual(mock.call_count, 3)
+        self.assertCountEqual(
+            api_calls,
+            [
+                (
+                    "posts.get",
+                    (
+                        {
+                            "site": "scp-wiki",
+                            "posts": [
                                 "326022",
                                 "328393",
                                 "1930722",
@@ -52,12 +71,15 @@ class TestForumPosts(unittest.TestCase):
                                 "6259068",
                                 "4288597",
                             ],
-                        ),
-                    ],
-                    [
-                        call(
-                            site="scp-wiki",
-                            posts=[
+                        },
+                    ),
+                ),
+                (
+                    "posts.get",
+                    (
+                        {
+                            "site": "scp-wiki",
+                            "posts": [
                                 "4688320",
                                 "4725042",
                                 "4767904",
@@ -68,9 +90,11 @@ class TestForumPosts(unittest.TestCase):
                                 "6144934",
                                 "5520725",
                             ],
-                        ),
-                    ],
-                )
+                        },
+                    ),
+                ),
+            ],
+        )
 
         self.assertEqual(len(models), 19)
         self.assertIsInstance(models[0], ForumPostData)
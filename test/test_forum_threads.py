@@ -5,8 +5,18 @@ import requests
 
 from yellowstone.request import forum_threads
 from yellowstone.request.forum_threads import ForumThreadData
+from yellowstone.types import AnonymousUserData
 
-from .helpers import FakeResponse, make_wikidot
+from .helpers import FakeResponse, get_test_data, make_wikidot
+
+ANONYMOUS_USER = (
+    '<span class="printuser anonymous">'
+    '<a href="javascript:;" onclick="WIKIDOT.page.listeners.anonymousUserInfo'
+    '(\'203.0.113.7\'); return false;"><img class="small" src="" alt=""/></a>'
+    '<a href="javascript:;" onclick="WIKIDOT.page.listeners.anonymousUserInfo'
+    "('203.0.113.7'); return false;\">Anonymous "
+    '<span class="ip">(203.0.113.x)</span></a></span>'
+)
 
 
 class TestForumThreads(unittest.TestCase):
@@ -15,7 +25,9 @@ class TestForumThreads(unittest.TestCase):
 
     def test_forum_threads(self):
         http_response = FakeResponse.ajax_from_file("forum_threads")
-        with patch.object(requests, "post", return_value=http_response) as mock:
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
             models = forum_threads.get(
                 "scp-wiki",
                 category_id=50742,
@@ -39,3 +51,31 @@ class TestForumThreads(unittest.TestCase):
         self.assertEqual(models[2].description, "In-universe spoilers/info leaks")
         self.assertTrue(models[2].sticky)
         self.assertEqual(models[2].created_by.name, "Dr Gears")
+
+    def test_forum_threads_fast_path(self):
+        html = get_test_data("forum_threads")
+        with patch.object(forum_threads, "split_rows", return_value=None):
+            expected = forum_threads.parse(50742, html)
+
+        with patch.object(forum_threads, "process_row") as mock:
+            models = forum_threads.parse(50742, html)
+            mock.assert_not_called()
+
+        self.assertEqual(models, expected)
+
+    def test_forum_threads_fallback(self):
+        # Anonymous users aren't handled by the fast path
+        html = get_test_data("forum_threads").replace(
+            '<span class="printuser deleted" data-id="8992606">'
+            '<img class="small" src="https://www.wikidot.com/common--images'
+            '/avatars/default/a16.png" alt=""/>(account deleted)</span>',
+            ANONYMOUS_USER,
+        )
+        models = forum_threads.parse(50742, html)
+        self.assertEqual(len(models), 20)
+
+        anonymous = [
+            model for model in models if isinstance(model.created_by, AnonymousUserData)
+        ]
+        self.assertEqual(len(anonymous), 1)
+        self.assertEqual(anonymous[0].created_by.ip, "203.0.113.7")
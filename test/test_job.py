@@ -0,0 +1,75 @@
+import json
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from yellowstone.config import Config
+from yellowstone.job import JobManager, JobType, data_site_slug, job_dedup_key
+from yellowstone.worker import WorkerPool
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.toml")
+
+
+class TestJob(unittest.TestCase):
+    def test_data_site_slug(self):
+        self.assertEqual(
+            data_site_slug({"site_slug": "scp-wiki", "offset": 1}), "scp-wiki"
+        )
+        self.assertEqual(data_site_slug({"user_id": 4598089}), "www")
+        self.assertEqual(data_site_slug(None), "www")
+
+    def test_dedup_key(self):
+        key = job_dedup_key(JobType.FETCH_USER, {"user_id": 4598089})
+        self.assertEqual(len(key), 16)
+
+        # Same payload with a different key order
+        self.assertEqual(
+            job_dedup_key(
+                JobType.INDEX_SITE_MEMBERS,
+                {"site_slug": "scp-wiki", "offset": 1},
+            ),
+            job_dedup_key(
+                JobType.INDEX_SITE_MEMBERS,
+                {"offset": 1, "site_slug": "scp-wiki"},
+            ),
+        )
+
+        # Different job type or payload
+        self.assertNotEqual(
+            key,
+            job_dedup_key(JobType.FETCH_USER_AVATAR, {"user_id": 4598089}),
+        )
+        self.assertNotEqual(
+            key,
+            job_dedup_key(JobType.FETCH_USER, {"user_id": 4598090}),
+        )
+
+    def test_site_weights(self):
+        # www's weight is only worth anything up to its per-site limit
+        config = Config.from_file(CONFIG_PATH)
+        database = MagicMock()
+        database.claim_jobs.return_value = []
+        manager = JobManager(
+            database,
+            lease_seconds=config.job_lease_seconds,
+            flush_interval=config.job_flush_interval,
+            site_weights=config.site_weights,
+        )
+
+        with WorkerPool(
+            lambda _: None,
+            count=config.worker_count,
+            site_limit=config.worker_site_limit,
+            site_limits=config.worker_site_limits,
+        ) as pool:
+            capacities = pool.capacities(["scp-wiki", "www"])
+
+        manager.claim(config.worker_count, capacities)
+        sites = {
+            site["site_slug"]: site
+            for site in json.loads(database.claim_jobs.call_args.kwargs["sites"])
+        }
+        www_share = min(sites["www"]["weight"], sites["www"]["capacity"])
+        other_share = min(sites["scp-wiki"]["weight"], sites["scp-wiki"]["capacity"])
+        self.assertGreater(www_share, other_share)
+        self.assertEqual(www_share, config.site_weights["www"])
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from yellowstone.core import BackupDispatcher
+from yellowstone.notify import JobListener
+
+
+class TestJobListener(unittest.TestCase):
+    def test_notify(self):
+        events = (threading.Event(), threading.Event())
+        listener = JobListener("postgresql://localhost/test", "us", events)
+        listener.notify()
+        self.assertTrue(all(event.is_set() for event in events))
+
+    def test_received(self):
+        event = threading.Event()
+        listener = JobListener("postgresql://localhost/test", "us", (event,))
+
+        # Jobs we added ourselves don't wake us
+        listener.received(["us", "us"])
+        self.assertFalse(event.is_set())
+
+        listener.received(["us", "them"])
+        self.assertTrue(event.is_set())
+
+    def test_notified_after_claim(self):
+        dispatcher = BackupDispatcher.__new__(BackupDispatcher)
+        dispatcher.job = MagicMock()
+        dispatcher.job.claim.return_value = []
+        dispatcher.jobs_added = threading.Event()
+        dispatcher.wakeup = threading.Event()
+        listener = JobListener(
+            "postgresql://localhost/test",
+            "us",
+            (dispatcher.jobs_added, dispatcher.wakeup),
+        )
+
+        # Queued between the last claim and waiting for more
+        self.assertEqual(dispatcher.claim_jobs(4, {"www": 4}), [])
+        listener.notify()
+        dispatcher.wakeup.clear()
+
+        deadline = time.monotonic() + 0.01
+        self.assertTrue(dispatcher.wait_for_jobs(deadline))
+        dispatcher.claim_jobs(4, {"www": 4})
+        self.assertFalse(dispatcher.wait_for_jobs(deadline))
+
+    def test_wait_deadline(self):
+        # Jobs keep being queued, but it's time for the next cycle
+        dispatcher = BackupDispatcher.__new__(BackupDispatcher)
+        dispatcher.jobs_added = threading.Event()
+        dispatcher.jobs_added.set()
+        self.assertFalse(dispatcher.wait_for_jobs(time.monotonic() - 1))
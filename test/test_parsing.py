@@ -0,0 +1,47 @@
+import unittest
+
+from yellowstone.exception import ScrapingError
+from yellowstone.parsing import ParsePool
+from yellowstone.request import user
+
+from . import test_soup_parser
+from .helpers import get_test_data
+
+
+class TestParsePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ParsePool(workers=1, soup_parser="html.parser")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_inline(self):
+        pool = ParsePool(workers=0, soup_parser="html.parser")
+        self.assertIsNone(pool.executor)
+        models = pool.run(user.parse, 4598089, get_test_data("user_info_win"))
+        self.assertEqual(models.slug, "aismallard")
+        pool.close()
+
+    def test_parity(self):
+        # Results must come back from the other process unchanged
+        for parse, args, fixture in test_soup_parser.PARSERS:
+            html = get_test_data(fixture)
+            with self.subTest(fixture=fixture):
+                self.assertEqual(self.pool.run(parse, *args, html), parse(*args, html))
+
+    def test_error(self):
+        with self.assertRaises(ScrapingError):
+            self.pool.run(user.parse, 4598089, "<html></html>")
+
+
+class TestParsePoolAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_run_async(self):
+        pool = ParsePool(workers=1, soup_parser="html.parser")
+        try:
+            html = get_test_data("user_info_win")
+            models = await pool.run_async(user.parse, 4598089, html)
+            self.assertEqual(models, user.parse(4598089, html))
+        finally:
+            pool.close()
@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import patch
+
+from yellowstone import ratelimit
+from yellowstone.ratelimit import LocalRateLimiter, RateLimit
+
+
+class TestLocalRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = LocalRateLimiter(
+            RateLimit(rate=2.0, burst=3),
+            {"www": RateLimit(rate=10.0, burst=1)},
+        )
+
+    def test_limit(self):
+        self.assertEqual(self.limiter.limit("scp-wiki"), RateLimit(rate=2.0, burst=3))
+        self.assertEqual(self.limiter.limit("www"), RateLimit(rate=10.0, burst=1))
+
+    def test_reserve(self):
+        with patch.object(ratelimit.time, "monotonic", return_value=100.0):
+            # Burst is available immediately
+            for _ in range(3):
+                self.assertEqual(self.limiter.reserve("scp-wiki"), 0.0)
+
+            # Then reservations are spaced out at the rate
+            self.assertAlmostEqual(self.limiter.reserve("scp-wiki"), 0.5)
+            self.assertAlmostEqual(self.limiter.reserve("scp-wiki"), 1.0)
+
+            # Buckets are separate
+            self.assertEqual(self.limiter.reserve("www"), 0.0)
+            self.assertAlmostEqual(self.limiter.reserve("www"), 0.1)
+
+        with patch.object(ratelimit.time, "monotonic", return_value=101.0):
+            # Time passing pays off the debt
+            self.assertAlmostEqual(self.limiter.reserve("scp-wiki"), 0.5)
+
+        with patch.object(ratelimit.time, "monotonic", return_value=200.0):
+            # Refills no higher than the burst size
+            for _ in range(3):
+                self.assertEqual(self.limiter.reserve("scp-wiki"), 0.0)
+            self.assertAlmostEqual(self.limiter.reserve("scp-wiki"), 0.5)
@@ -0,0 +1,94 @@
+import unittest
+from collections import Counter
+from unittest.mock import AsyncMock, Mock
+
+import requests
+
+from yellowstone.exception import ScrapingError, WikidotError, WikidotTokenError
+from yellowstone.retry import Retrier, RetryClass, RetryPolicy, retry_class
+
+
+def http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+class TestRetrier(unittest.TestCase):
+    def setUp(self):
+        self.retrier = Retrier(
+            {
+                RetryClass.TOKEN: RetryPolicy(retries=3, base_delay=0, max_delay=0),
+                RetryClass.CONNECTION: RetryPolicy(
+                    retries=1,
+                    base_delay=0,
+                    max_delay=0,
+                ),
+                RetryClass.SERVER: RetryPolicy(retries=0, base_delay=0, max_delay=0),
+            },
+        )
+
+    def test_retry_class(self):
+        self.assertEqual(retry_class(WikidotTokenError()), RetryClass.TOKEN)
+        self.assertEqual(retry_class(requests.ConnectionError()), RetryClass.CONNECTION)
+        self.assertEqual(retry_class(requests.ReadTimeout()), RetryClass.CONNECTION)
+        self.assertEqual(retry_class(http_error(503)), RetryClass.SERVER)
+        self.assertEqual(retry_class(http_error(429)), RetryClass.SERVER)
+        self.assertIsNone(retry_class(http_error(404)))
+        self.assertIsNone(retry_class(WikidotError("not_ok")))
+        self.assertIsNone(retry_class(ScrapingError()))
+
+    def test_delay(self):
+        retrier = Retrier(
+            {RetryClass.SERVER: RetryPolicy(retries=2, base_delay=1, max_delay=10)},
+        )
+        attempts: Counter[RetryClass] = Counter()
+        self.assertTrue(0.5 <= retrier.delay(http_error(500), attempts) <= 1)
+        self.assertTrue(1 <= retrier.delay(http_error(500), attempts) <= 2)
+        self.assertIsNone(retrier.delay(http_error(500), attempts))
+
+        # No policy for this class
+        self.assertIsNone(retrier.delay(WikidotTokenError(), attempts))
+
+    def test_call(self):
+        func = Mock(side_effect=[WikidotTokenError(), WikidotTokenError(), "ok"])
+        self.assertEqual(self.retrier.call("test", func), "ok")
+        self.assertEqual(func.call_count, 3)
+
+    def test_call_separate_limits(self):
+        # Each class of error counts against its own limit
+        func = Mock(
+            side_effect=[
+                WikidotTokenError(),
+                requests.ConnectionError(),
+                WikidotTokenError(),
+                "ok",
+            ],
+        )
+        self.assertEqual(self.retrier.call("test", func), "ok")
+
+    def test_call_exhausted(self):
+        func = Mock(side_effect=requests.ConnectionError())
+        with self.assertRaises(requests.ConnectionError):
+            self.retrier.call("test", func)
+        self.assertEqual(func.call_count, 2)
+
+    def test_call_permanent(self):
+        func = Mock(side_effect=http_error(404))
+        with self.assertRaises(requests.HTTPError):
+            self.retrier.call("test", func)
+        func.assert_called_once()
+
+
+class TestRetrierAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_call_async(self):
+        retrier = Retrier(
+            {RetryClass.TOKEN: RetryPolicy(retries=1, base_delay=0, max_delay=0)},
+        )
+        func = AsyncMock(side_effect=[WikidotTokenError(), "ok"])
+        self.assertEqual(await retrier.call_async("test", func), "ok")
+
+        func = AsyncMock(side_effect=WikidotTokenError())
+        with self.assertRaises(WikidotTokenError):
+            await retrier.call_async("test", func)
+        self.assertEqual(func.await_count, 2)
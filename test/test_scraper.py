@@ -5,7 +5,9 @@ from typing import Iterator, cast
 
 from bs4 import Tag
 
+from yellowstone.exception import ScrapingError
 from yellowstone.scraper import (
+    Source,
     extract_last_forum_post,
     find_element,
     get_entity_date,
@@ -69,6 +71,24 @@ class TestScraperBasics(unittest.TestCase):
         self.assertEqual(element.name, "span")
         self.assertEqual(element.attrs, {"id": "date", "style": "color: blue"})
 
+    def test_source(self):
+        class Label:
+            renders = 0
+
+            def __str__(self):
+                Label.renders += 1
+                return "thread"
+
+        source = Source("forum category %d", 123).child("%s", Label())
+        soup = make_soup('<div class="wrap"></div>')
+        find_element(source, soup, "div", class_="wrap")
+        self.assertEqual(Label.renders, 0)
+
+        with self.assertRaises(ScrapingError) as context:
+            find_element(source, soup, "span")
+        self.assertIn("forum category 123 thread", str(context.exception))
+        self.assertEqual(Label.renders, 1)
+
     def test_select_element(self):
         soup = make_soup(
             '<ol class="list">' "<li>ONE</li> <li>TWO</li> <li>THREE</li>" "</ol>",
@@ -6,7 +6,7 @@ import requests
 from yellowstone.request import site_home_raw
 from yellowstone.request.site_home_raw import SiteHomeData
 
-from .helpers import FakeResponse, make_wikidot
+from .helpers import FakeResponse, get_test_data, make_wikidot
 
 
 class TestSiteHomeRaw(unittest.TestCase):
@@ -15,7 +15,9 @@ class TestSiteHomeRaw(unittest.TestCase):
 
     def test_site_home(self):
         http_response = FakeResponse.from_file("site_home_raw")
-        with patch.object(requests, "get", return_value=http_response) as mock:
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
             model = site_home_raw.get("scp-wiki", wikidot=self.wikidot)
             mock.assert_called_once()
 
@@ -29,3 +31,12 @@ class TestSiteHomeRaw(unittest.TestCase):
         self.assertEqual(model.home_page_id, 1403571722)
         self.assertEqual(model.home_page_discussion_thread_id, 14881792)
         self.assertEqual(model.home_page_category_id, 366566)
+
+    def test_site_home_partial(self):
+        html = get_test_data("site_home_raw")
+        end = html.index(site_home_raw.END_MARKER) + len(site_home_raw.END_MARKER)
+        url = "https://scp-wiki.wikidot.com"
+        self.assertEqual(
+            site_home_raw.parse("scp-wiki", url, html[:end]),
+            site_home_raw.parse("scp-wiki", url, html),
+        )
@@ -6,7 +6,7 @@ import requests
 from yellowstone.request import site_members
 from yellowstone.request.site_members import SiteMemberData
 
-from .helpers import FakeResponse, make_wikidot
+from .helpers import FakeResponse, get_test_data, make_wikidot
 
 
 class TestSiteMembers(unittest.TestCase):
@@ -15,7 +15,9 @@ class TestSiteMembers(unittest.TestCase):
 
     def test_site_members_regular(self):
         http_response = FakeResponse.ajax_from_file("site_members_regular")
-        with patch.object(requests, "post", return_value=http_response) as mock:
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
             models = site_members.get(
                 "scp-wiki",
                 1,
@@ -34,6 +36,21 @@ class TestSiteMembers(unittest.TestCase):
         self.assertEqual(models[4].name, "Kraito")
         self.assertEqual(models[5].name, "Lt Masipag")
 
+    def test_site_members_fast_path(self):
+        html = get_test_data("site_members_regular")
+        with patch.object(site_members, "split_rows", return_value=None):
+            expected = site_members.parse(html)
+
+        with patch.object(site_members, "process_row") as mock:
+            models = site_members.parse(html)
+            mock.assert_not_called()
+
+        self.assertEqual(models, expected)
+
+        # Rows which can't be split out fall back to the DOM
+        models = site_members.parse(html.replace("</tr>", "", 1))
+        self.assertEqual(models, expected)
+
     def test_site_members_admin(self):
         # TODO add this when ADMIN_MEMBER_MODULE is working
         pass
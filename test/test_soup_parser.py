@@ -0,0 +1,120 @@
+import importlib.util
+import unittest
+from contextlib import ExitStack
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable
+from unittest.mock import patch
+
+from yellowstone import scraper
+from yellowstone.request import (
+    forum_categories,
+    forum_post_revisions,
+    forum_posts,
+    forum_threads,
+    site_home_raw,
+    site_members,
+    user,
+)
+from yellowstone.scraper import set_soup_parser
+
+from .helpers import get_test_data
+
+# Each scraper, with its arguments besides the HTML, and the fixture it parses
+PARSERS: list[tuple[Callable[..., Any], tuple, str]] = [
+    (forum_categories.parse, ("scp-wiki",), "forum_categories"),
+    (forum_threads.parse, (88827,), "forum_threads"),
+    (forum_posts.parse, (50742, 76692), "forum_posts"),
+    (forum_post_revisions.parse, (6462360,), "forum_post_revisions"),
+    (site_members.parse, (), "site_members_regular"),
+    (user.parse, (4598089,), "user_info_win"),
+    (
+        site_home_raw.parse,
+        ("scp-wiki", "https://scp-wiki.wikidot.com"),
+        "site_home_raw",
+    ),
+]
+
+
+# Scrapers with a regex fast path, which doesn't use the soup parser at all
+FAST_PATHS = [
+    (forum_threads, (88827,), "forum_threads"),
+    (site_members, (), "site_members_regular"),
+]
+
+
+def dom_only(mode: str) -> ExitStack:
+    """
+    Turns off the fast paths, so rows are parsed with the soup parser,
+    either one at a time ("rows") or as a whole page ("page").
+    """
+
+    stack = ExitStack()
+    for module, _, _ in FAST_PATHS:
+        if mode == "rows":
+            stack.enter_context(
+                patch.object(module, "fast_process_row", return_value=None),
+            )
+        else:
+            stack.enter_context(patch.object(module, "split_rows", return_value=None))
+    return stack
+
+
+def as_fields(value: Any) -> Any:
+    # For comparison field by field, so mismatches are easy to find
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (list, tuple)):
+        return [as_fields(item) for item in value]
+    return value
+
+
+class TestSoupParser(unittest.TestCase):
+    def test_set_soup_parser(self):
+        with self.assertRaises(ValueError):
+            set_soup_parser("html5lib")
+
+        with patch.object(scraper, "soup_parser", "html.parser"):
+            set_soup_parser("html.parser")
+            self.assertEqual(scraper.soup_parser, "html.parser")
+
+    @unittest.skipIf(importlib.util.find_spec("lxml") is None, "lxml not installed")
+    def test_lxml_parity(self):
+        self.check_lxml_parity(ExitStack())
+
+    @unittest.skipIf(importlib.util.find_spec("lxml") is None, "lxml not installed")
+    def test_lxml_parity_dom(self):
+        for mode in ("rows", "page"):
+            with self.subTest(mode=mode):
+                self.check_lxml_parity(dom_only(mode))
+
+    def check_lxml_parity(self, patches: ExitStack):
+        with patches:
+            for parse, args, fixture in PARSERS:
+                html = get_test_data(fixture)
+                with self.subTest(fixture=fixture):
+                    with patch.object(scraper, "soup_parser", "html.parser"):
+                        expected = as_fields(parse(*args, html))
+                    with patch.object(scraper, "soup_parser", "lxml"):
+                        actual = as_fields(parse(*args, html))
+
+                    self.assertTrue(expected, "Fixture produced no output")
+                    self.assertEqual(type(actual), type(expected))
+                    if isinstance(expected, list):
+                        self.assertEqual(len(actual), len(expected))
+                        for actual_item, expected_item in zip(actual, expected):
+                            self.assertEqual(actual_item, expected_item)
+                    else:
+                        self.assertEqual(actual, expected)
+
+    def test_fast_path(self):
+        # The fast path gives the same results as parsing the tree
+        for module, args, fixture in FAST_PATHS:
+            html = get_test_data(fixture)
+            rows = scraper.split_rows(html)
+            self.assertIsNotNone(rows)
+            self.assertTrue(any(module.fast_process_row(row) for row in rows))
+
+            expected = as_fields(module.parse(*args, html))
+            for mode in ("rows", "page"):
+                with self.subTest(fixture=fixture, mode=mode), dom_only(mode):
+                    self.assertEqual(as_fields(module.parse(*args, html)), expected)
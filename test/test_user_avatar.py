@@ -5,13 +5,18 @@ import requests
 
 from yellowstone.request import user_avatar
 
-from .helpers import FakeResponse
+from .helpers import FakeResponse, make_wikidot
 
 
 class TestUserAvatar(unittest.TestCase):
+    def setUp(self):
+        self.wikidot = make_wikidot()
+
     def test_user_avatar(self):
         http_response = FakeResponse(b"foo")
-        with patch.object(requests, "get", return_value=http_response) as mock:
-            data = user_avatar.get(4598089)
+        with patch.object(
+            requests.Session, "request", return_value=http_response
+        ) as mock:
+            data = user_avatar.get(4598089, wikidot=self.wikidot)
             self.assertEqual(data, b"foo")
             mock.assert_called_once()
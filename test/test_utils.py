@@ -1,6 +1,6 @@
 import unittest
 
-from yellowstone.utils import chunks, sql_array
+from yellowstone.utils import backoff_delay, chunks, sql_array
 
 
 class TestUtils(unittest.TestCase):
@@ -22,3 +22,14 @@ class TestUtils(unittest.TestCase):
 
     def test_sql_array(self):
         self.assertEqual(sql_array((3, 7, 9, 11)), "{3, 7, 9, 11}")
+
+    def test_backoff_delay(self):
+        for _ in range(20):
+            delay = backoff_delay(0, base=10, maximum=100)
+            self.assertTrue(5 <= delay <= 10)
+
+            delay = backoff_delay(2, base=10, maximum=100)
+            self.assertTrue(20 <= delay <= 40)
+
+            delay = backoff_delay(8, base=10, maximum=100)
+            self.assertTrue(50 <= delay <= 100)
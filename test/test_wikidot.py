@@ -1,8 +1,14 @@
+import tempfile
 import unittest
-from unittest.mock import patch
+from dataclasses import replace
+from unittest.mock import MagicMock, patch
 
 import requests
 
+from yellowstone.circuit import CircuitState
+from yellowstone.exception import WikidotError, WikidotTokenError
+from yellowstone.wikidot import Wikidot, is_overload, read_until
+
 from .helpers import FakeResponse, make_wikidot
 
 
@@ -12,7 +18,7 @@ class TestWikidotClass(unittest.TestCase):
 
     def test_ajax_module_connector(self):
         http_response = FakeResponse.ajax_from_file("user_info_win")
-        with patch.object(requests, "post", return_value=http_response):
+        with patch.object(requests.Session, "request", return_value=http_response):
             html = self.wikidot.ajax_module_connector(
                 "www",
                 "users/UserInfoWinModule",
@@ -20,6 +26,97 @@ class TestWikidotClass(unittest.TestCase):
             )
             self.assertEqual(html, http_response.data["body"])
 
+    def test_ajax_module_connector_cache(self):
+        http_response = FakeResponse.ajax_from_file("user_info_win")
+        with tempfile.TemporaryDirectory() as directory:
+            config = replace(
+                self.wikidot.config,
+                cache_enabled=True,
+                cache_directory=directory,
+            )
+            with patch.object(
+                requests.Session, "request", return_value=http_response
+            ) as mock:
+                # A new client each time, like a restarted dispatcher
+                for _ in range(2):
+                    wikidot = Wikidot(config, username="test", api_key="test")
+                    html = wikidot.ajax_module_connector(
+                        "www",
+                        "users/UserInfoWinModule",
+                        {"user_id": 4598089},
+                    )
+                    self.assertEqual(html, http_response.data["body"])
+
+                mock.assert_called_once()
+
+    def test_ajax_module_connector_retry(self):
+        http_response = FakeResponse.ajax_from_file("user_info_win")
+        responses = [FakeResponse({"status": "wrong_token7"}), http_response]
+        with patch.object(requests.Session, "request", side_effect=responses) as mock:
+            html = self.wikidot.ajax_module_connector(
+                "www",
+                "users/UserInfoWinModule",
+                {"user_id": 4598089},
+            )
+            self.assertEqual(html, http_response.data["body"])
+
+        self.assertEqual(mock.call_count, 2)
+
+    def test_ajax_module_connector_not_ok(self):
+        # Errors from Wikidot answer the request, they aren't overload
+        http_response = FakeResponse({"status": "not_ok", "message": "No user"})
+        with patch.object(requests.Session, "request", return_value=http_response):
+            for user_id in range(self.wikidot.config.circuit_failures + 1):
+                with self.assertRaises(WikidotError):
+                    self.wikidot.ajax_module_connector(
+                        "www",
+                        "users/UserInfoWinModule",
+                        {"user_id": user_id},
+                    )
+
+        self.assertGreaterEqual(
+            self.wikidot.concurrency.limit("www"),
+            self.wikidot.config.concurrency_initial,
+        )
+        self.assertEqual(self.wikidot.circuit.state("www"), CircuitState.CLOSED)
+
+    def test_is_overload(self):
+        response = requests.Response()
+        response.status_code = 503
+        self.assertTrue(is_overload(requests.HTTPError(response=response)))
+        self.assertTrue(is_overload(requests.ConnectionError()))
+        self.assertTrue(is_overload(requests.ReadTimeout()))
+
+        response.status_code = 404
+        self.assertFalse(is_overload(requests.HTTPError(response=response)))
+        self.assertFalse(is_overload(WikidotError("not_ok")))
+        self.assertFalse(is_overload(WikidotTokenError()))
+
+    def test_slot_rate_limit_order(self):
+        # Tokens are only taken while holding a concurrency slot
+        in_flight = []
+        rate_limiter = MagicMock()
+        rate_limiter.acquire.side_effect = lambda site_slug: in_flight.append(
+            self.wikidot.concurrency.in_flight[site_slug],
+        )
+        with patch.object(self.wikidot, "rate_limiter", rate_limiter):
+            with self.wikidot.slot("test"):
+                pass
+            self.assertEqual(in_flight, [1])
+
+            # A slot is given back if the token can't be had
+            rate_limiter.acquire.side_effect = RuntimeError("database down")
+            with self.assertRaises(RuntimeError):
+                with self.wikidot.slot("test"):
+                    pass
+
+        self.assertEqual(self.wikidot.concurrency.in_flight["test"], 0)
+
+    def test_session(self):
+        session = self.wikidot.session("scp-wiki")
+        self.assertIs(self.wikidot.session("scp-wiki"), session)
+        self.assertIsNot(self.wikidot.session("www"), session)
+
     def test_site_url(self):
         ajax_url = self.wikidot.site_url("test")
         self.assertEqual(ajax_url, "http://test.wikidot.com")
@@ -36,6 +133,23 @@ class TestWikidotClass(unittest.TestCase):
             ajax_url, "https://test-tls.wikidot.com/ajax-module-connector.php"
         )
 
+    def test_base_url(self):
+        wikidot = make_wikidot("http://localhost:8100")
+        self.assertEqual(wikidot.site_url("test-tls"), "http://localhost:8100/test-tls")
+        self.assertEqual(
+            wikidot.api.url,
+            "http://localhost:8100/www/xml-rpc-api.php",
+        )
+        self.assertEqual(
+            self.wikidot.www_url("avatar.php"),
+            "https://www.wikidot.com/avatar.php",
+        )
+
+    def test_read_until(self):
+        chunks = [b"<html>", b"<div i", b"d=x>", b"<p>rest</p>"]
+        self.assertEqual(read_until(chunks, b'id="x"'), b"".join(chunks))
+        self.assertEqual(read_until(iter(chunks), b"id="), b"<html><div id=x>")
+
     def test_generate_token7(self):
         token7 = self.wikidot.generate_token7()
         self.assertEqual(len(token7), 32)
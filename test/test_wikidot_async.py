@@ -0,0 +1,127 @@
+import asyncio
+import json
+import unittest
+import xmlrpc.client
+from unittest.mock import AsyncMock, patch
+
+from yellowstone.circuit import CircuitBreaker, CircuitState
+from yellowstone.request import user
+from yellowstone.wikidot_async import AsyncWikidot
+
+from .helpers import FakeResponse, make_async_wikidot
+
+
+class TestAsyncWikidot(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.wikidot = make_async_wikidot()
+
+    async def test_ajax_module_connector(self):
+        http_response = FakeResponse.ajax_from_file("user_info_win")
+        body = json.dumps(http_response.data).encode()
+        with patch.object(
+            AsyncWikidot, "request", AsyncMock(return_value=body)
+        ) as mock:
+            html = await self.wikidot.ajax_module_connector(
+                "www",
+                "users/UserInfoWinModule",
+                {"user_id": 4598089},
+            )
+            mock.assert_awaited_once()
+
+        self.assertEqual(html, http_response.data["body"])
+
+    async def test_user(self):
+        user_id = 4598089
+        http_response = FakeResponse.ajax_from_file("user_info_win")
+        body = json.dumps(http_response.data).encode()
+        with patch.object(AsyncWikidot, "request", AsyncMock(return_value=body)):
+            model = await user.get_async(user_id, wikidot=self.wikidot)
+
+        # Parsed the same way as the synchronous request
+        html = http_response.data["body"]
+        self.assertEqual(model, user.parse(user_id, html))
+
+    async def test_probe_cancelled(self):
+        circuit = CircuitBreaker(threshold=1, open_seconds=0)
+        circuit.record("test", None, healthy=False)
+        self.wikidot.wikidot.circuit = circuit
+
+        # Cancelled while rate limited, before the probe is sent
+        rate_limiter = self.wikidot.wikidot.rate_limiter
+        with patch.object(type(rate_limiter), "reserve", return_value=60.0):
+            task = asyncio.create_task(
+                self.wikidot.get("test", "http://test.wikidot.com"),
+            )
+            await asyncio.sleep(0.1)
+            self.assertTrue(circuit.probing)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertFalse(circuit.probing)
+        self.assertIsNotNone(circuit.check("test"))
+
+    async def test_probe_cancelled_in_flight(self):
+        circuit = CircuitBreaker(threshold=1, open_seconds=0)
+        circuit.record("test", None, healthy=False)
+        self.wikidot.wikidot.circuit = circuit
+        concurrency = self.wikidot.wikidot.concurrency
+        limit = concurrency.limit("test")
+
+        async def request(*args, **kwargs):
+            await asyncio.sleep(60)
+
+        with patch.object(AsyncWikidot, "request", AsyncMock(side_effect=request)):
+            task = asyncio.create_task(
+                self.wikidot.get("test", "http://test.wikidot.com"),
+            )
+            await asyncio.sleep(0.1)
+            self.assertTrue(circuit.probing)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        # Neither counted as a failure nor lowering the limit
+        self.assertEqual(circuit.state("test"), CircuitState.HALF_OPEN)
+        self.assertIsNotNone(circuit.check("test"))
+        self.assertEqual(concurrency.limit("test"), limit)
+        self.assertFalse(concurrency.in_flight.get("test"))
+
+    async def test_posts_get(self):
+        posts = {"326022": {"id": 326022, "title": ""}}
+        body = xmlrpc.client.dumps((posts,), methodresponse=True).encode()
+        with patch.object(
+            AsyncWikidot, "request", AsyncMock(return_value=body)
+        ) as mock:
+            data = await self.wikidot.api.posts_get(site="scp-wiki", posts=["326022"])
+            request = mock.call_args.kwargs["data"]
+
+        self.assertEqual(data, posts)
+        params, method = xmlrpc.client.loads(request)
+        self.assertEqual(method, "posts.get")
+        self.assertEqual(params, ({"site": "scp-wiki", "posts": ["326022"]},))
+
+    async def test_posts_get_many(self):
+        async def respond(method, session, url, *, data, **kwargs):
+            (arguments,), _ = xmlrpc.client.loads(data)
+            if arguments["posts"] == ["1"]:
+                # Finishes last, but still comes first
+                await asyncio.sleep(0.01)
+                result = {"1": {"id": 1}}
+                return xmlrpc.client.dumps((result,), methodresponse=True).encode()
+
+            fault = xmlrpc.client.Fault(406, "Bad post")
+            return xmlrpc.client.dumps(fault, methodresponse=True).encode()
+
+        with patch.object(
+            AsyncWikidot, "request", AsyncMock(side_effect=respond)
+        ) as mock:
+            first, second = await self.wikidot.api.posts_get_many(
+                site="scp-wiki",
+                batches=[["1"], ["2"]],
+            )
+
+        # One request per call
+        self.assertEqual(mock.await_count, 2)
+        self.assertEqual(first, {"1": {"id": 1}})
+        self.assertIsInstance(second, xmlrpc.client.Fault)
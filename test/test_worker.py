@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import unittest
+from typing import Optional
+
+from yellowstone.job import JobDict
+from yellowstone.worker import AsyncWorkerPool, WorkerPool
+
+
+def make_job(job_id: int, site_slug: Optional[str] = None) -> JobDict:
+    data = {"user_id": job_id} if site_slug is None else {"site_slug": site_slug}
+    return {
+        "job_id": job_id,
+        "job_type": "fetch-user",
+        "site_slug": site_slug or "www",
+        "priority": 0,
+        "attempts": 0,
+        "data": data,  # type: ignore
+    }
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_limits(self):
+        release = threading.Event()
+
+        with WorkerPool(lambda _: release.wait(), count=3, site_limit=2) as pool:
+            self.assertEqual(pool.wanted(), 4)
+            pool.add([make_job(1, "scp-wiki")])
+            self.assertEqual(
+                pool.capacities(["scp-wiki", "www"]), {"scp-wiki": 1, "www": 2}
+            )
+            pool.add([make_job(2, "scp-wiki"), make_job(3, "scp-wiki"), make_job(4)])
+            self.assertEqual(pool.capacities(["scp-wiki", "www"]), {"www": 1})
+            self.assertEqual(len(pool.running), 3)
+            self.assertEqual(len(pool.backlog), 1)
+            self.assertEqual(pool.wanted(), 0)
+
+            release.set()
+            while not pool.idle:
+                pool.wait(1)
+                pool.reap()
+
+            self.assertEqual(pool.wanted(), 4)
+            self.assertEqual(pool.capacities(["scp-wiki"]), {"scp-wiki": 2})
+
+    def test_batch_size(self):
+        release = threading.Event()
+
+        with WorkerPool(
+            lambda _: release.wait(),
+            count=2,
+            site_limit=10,
+            batch_size=5,
+        ) as pool:
+            pool.add([make_job(job_id, "scp-wiki") for job_id in range(7)])
+            self.assertEqual(len(pool.running), 2)
+            self.assertEqual(len(pool.backlog), 5)
+            self.assertEqual(pool.wanted(), 0)
+
+            release.set()
+            while not pool.idle:
+                pool.wait(1)
+                pool.reap()
+
+    def test_busy_site(self):
+        # A site at its limit can't fill the backlog and starve the others
+        release = threading.Event()
+
+        with WorkerPool(
+            lambda _: release.wait(),
+            count=4,
+            site_limit=2,
+            batch_size=4,
+        ) as pool:
+            pool.add([make_job(job_id, "scp-wiki") for job_id in range(2)])
+            self.assertEqual(pool.capacities(["scp-wiki", "www"]), {"www": 2})
+            self.assertEqual(pool.wanted(), 6)
+
+            pool.add([make_job(2), make_job(3)])
+            self.assertEqual(len(pool.running), 4)
+            self.assertFalse(pool.backlog)
+
+            release.set()
+            while not pool.idle:
+                pool.wait(1)
+                pool.reap()
+
+    def test_site_limits(self):
+        release = threading.Event()
+
+        with WorkerPool(
+            lambda _: release.wait(),
+            count=8,
+            site_limit=2,
+            site_limits={"www": 4},
+        ) as pool:
+            self.assertEqual(
+                pool.capacities(["scp-wiki", "www"]), {"scp-wiki": 2, "www": 4}
+            )
+            pool.add([make_job(job_id) for job_id in range(5)])
+            pool.add([make_job(job_id, "scp-wiki") for job_id in range(5, 8)])
+            self.assertEqual(pool.site_running, {"www": 4, "scp-wiki": 2})
+            self.assertEqual(len(pool.backlog), 2)
+
+            release.set()
+            while not pool.idle:
+                pool.wait(1)
+                pool.reap()
+
+    def test_reap_raises(self):
+        def process(_):
+            raise RuntimeError("fatal")
+
+        with WorkerPool(process, count=1, site_limit=1) as pool:
+            pool.add([make_job(1)])
+            pool.wait(1)
+            with self.assertRaises(RuntimeError):
+                pool.reap()
+            self.assertTrue(pool.idle)
+
+
+class TestAsyncWorkerPool(unittest.IsolatedAsyncioTestCase):
+    async def test_limits(self):
+        release = asyncio.Event()
+
+        async def process(_):
+            await release.wait()
+
+        async with AsyncWorkerPool(process, count=3, site_limit=2) as pool:
+            pool.add([make_job(job_id, "scp-wiki") for job_id in range(3)])
+            pool.add([make_job(3)])
+            self.assertEqual(len(pool.running), 3)
+            self.assertEqual(len(pool.backlog), 1)
+            self.assertEqual(pool.capacities(["scp-wiki", "www"]), {"www": 1})
+
+            release.set()
+            while not pool.idle:
+                await pool.wait(1)
+                pool.reap()
+
+            self.assertEqual(pool.wanted(), 4)
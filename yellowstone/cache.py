@@ -0,0 +1,155 @@
+"""
+On-disk cache of raw responses from Wikidot.
+
+Responses are stored as files named by the hash of the request which
+produced them, so re-running a cycle which crashed partway, or re-parsing
+after fixing a scraper, does not need to fetch everything again.
+
+Entries expire after a time-to-live, which can be set per namespace (the
+AJAX module, or "html" for pages). The cache is bounded in size, and once
+it is full, the least recently used entries are evicted. Each entry's
+modification time is when it was stored, and its access time is set
+explicitly whenever it is used, so this does not rely on the filesystem
+tracking access times.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from .text import hash_text
+
+# Once full, evict down to this fraction of the maximum size,
+# so the directory is not scanned on every write.
+EVICT_TARGET = 0.9
+
+TEMP_PREFIX = ".tmp-"
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    __slots__ = ("directory", "default_ttl", "ttls", "max_bytes", "lock", "size")
+
+    directory: str
+    default_ttl: float
+    ttls: dict[str, float]
+    max_bytes: int
+    lock: threading.Lock
+    size: Optional[int]
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        default_ttl: float,
+        ttls: dict[str, float],
+        max_bytes: int,
+    ) -> None:
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None
+
+    def ttl(self, namespace: str) -> float:
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def path(self, namespace: str, key: str) -> str:
+        digest = hash_text(f"{namespace}\0{key}").hex()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        path = self.path(namespace, key)
+        try:
+            with open(path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                now = time.time()
+                if now - stat.st_mtime > self.ttl(namespace):
+                    logger.debug("Cached response for %s expired", namespace)
+                    return None
+
+                value = file.read()
+        except FileNotFoundError:
+            return None
+
+        # Mark as recently used, keeping when it was stored
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+
+        logger.debug("Using cached response for %s", namespace)
+        return value
+
+    def put(self, namespace: str, key: str, value: bytes) -> None:
+        path = self.path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_PREFIX)
+        with os.fdopen(fd, "wb") as file:
+            file.write(value)
+
+        try:
+            old_size = os.path.getsize(path)
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(temp_path, path)
+
+        with self.lock:
+            if self.size is None:
+                self.size = self.scan_size()
+            else:
+                self.size += len(value) - old_size
+
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """
+        Lists every entry as (last used, size, path).
+        """
+
+        entries = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith(TEMP_PREFIX):
+                    continue
+
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def scan_size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        # Must be called while holding the lock
+        entries = self.entries()
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        entries.sort()
+
+        evicted = 0
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            evicted += 1
+
+        logger.info("Evicted %d responses from cache", evicted)
+        self.size = size
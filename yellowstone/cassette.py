@@ -0,0 +1,145 @@
+"""
+Recording and replaying of every exchange with Wikidot.
+
+In record mode, each request made through the Wikidot clients is stored,
+along with the response, in a "cassette" file (gzipped JSON lines). In
+replay mode, responses are served back from that file without touching
+the network, so the whole job pipeline can be run offline, such as to
+benchmark it or to reproduce a regression.
+
+Requests are matched on their method, URL and parameters, ignoring
+values which change on every run, like the AJAX token and avatar
+timestamps. When the same request was made several times, the responses
+are replayed in the order they were recorded.
+"""
+
+import base64
+import gzip
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from enum import Enum, unique
+from typing import IO, Any, Optional, Union
+
+from .exception import CassetteError
+from .text import hash_text
+
+# Request parameters which differ between runs, so are not matched on
+IGNORED_PARAMETERS = frozenset(("wikidot_token7", "timestamp"))
+
+logger = logging.getLogger(__name__)
+
+
+@unique
+class CassetteMode(Enum):
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+def request_key(
+    method: str,
+    url: str,
+    *,
+    params: Optional[dict] = None,
+    data: Union[dict, bytes, None] = None,
+) -> str:
+    body: Any
+    match data:
+        case dict():
+            body = {
+                key: str(value)
+                for key, value in data.items()
+                if key not in IGNORED_PARAMETERS
+            }
+        case bytes():
+            body = data.decode("utf-8")
+        case _:
+            body = data
+
+    query = {
+        key: str(value)
+        for key, value in (params or {}).items()
+        if key not in IGNORED_PARAMETERS
+    }
+    request = json.dumps([method, url, query, body], sort_keys=True)
+    return hash_text(request).hex()
+
+
+class Cassette:
+    __slots__ = ("path", "mode", "lock", "file", "responses")
+
+    path: str
+    mode: CassetteMode
+    lock: threading.Lock
+    file: Optional[IO[str]]
+    responses: dict[str, deque[tuple[int, bytes]]]
+
+    def __init__(self, path: str, mode: CassetteMode) -> None:
+        assert mode != CassetteMode.OFF, "Cassette created while turned off"
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.file = None
+        self.responses = defaultdict(deque)
+
+        if mode == CassetteMode.REPLAY:
+            self.load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CassetteMode.REPLAY
+
+    def load(self) -> None:
+        logger.info("Loading recorded responses from %s", self.path)
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                if "text" in entry:
+                    body = entry["text"].encode("utf-8")
+                else:
+                    body = base64.b64decode(entry["base64"])
+                self.responses[entry["key"]].append((entry["status"], body))
+                count += 1
+
+        logger.info("Loaded %d recorded responses", count)
+
+    def record(self, key: str, status: int, body: bytes) -> None:
+        entry: dict[str, Any] = {"key": key, "status": status}
+        try:
+            entry["text"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["base64"] = base64.b64encode(body).decode("ascii")
+
+        line = json.dumps(entry, separators=(",", ":"))
+        with self.lock:
+            if self.file is None:
+                logger.info("Recording responses to %s", self.path)
+                self.file = gzip.open(self.path, "at", encoding="utf-8")
+
+            self.file.write(f"{line}\n")
+            # So the cassette is usable even if the run crashes
+            self.file.flush()
+
+    def replay(self, key: str, description: str) -> tuple[int, bytes]:
+        """
+        Returns the status and body of the next recorded response.
+        The last response for a request is kept, so it can be repeated.
+        """
+
+        with self.lock:
+            responses = self.responses.get(key)
+            if not responses:
+                raise CassetteError(f"No recorded response for {description}")
+
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,153 @@
+"""
+Per-site circuit breakers for requests made to Wikidot.
+
+When a site is down or erroring, every request to it would otherwise be
+made and fail, over and over, wasting workers and request budget. After
+enough failures in a row, the site's circuit "opens" and requests to it
+fail immediately with CircuitOpenError, which jobs treat as a reason to
+be deferred rather than as a failed attempt.
+
+Once the circuit has been open for a while, it goes "half-open", letting
+a single probe request through. If that succeeds, the circuit closes and
+requests flow again, otherwise it opens for another period. Only the probe
+itself can decide this, not other requests which were already in flight.
+
+Failures are counted the same way as for the concurrency limits, so only
+errors suggesting the site is struggling trip the circuit.
+"""
+
+import logging
+import threading
+import time
+from enum import Enum, unique
+from typing import Optional
+
+from .exception import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+@unique
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    __slots__ = (
+        "threshold",
+        "open_seconds",
+        "lock",
+        "failures",
+        "opened_at",
+        "probing",
+    )
+
+    threshold: int
+    open_seconds: float
+    lock: threading.Lock
+    failures: dict[str, int]
+    opened_at: dict[str, float]
+    probing: dict[str, object]
+
+    def __init__(self, *, threshold: int, open_seconds: float) -> None:
+        assert threshold >= 1, "Circuit breaker threshold must be positive"
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.opened_at = {}
+        self.probing = {}
+
+    def state(self, key: str) -> CircuitState:
+        with self.lock:
+            return self.state_locked(key, time.monotonic())
+
+    def state_locked(self, key: str, now: float) -> CircuitState:
+        # Must be called while holding the lock
+        opened_at = self.opened_at.get(key)
+        if opened_at is None:
+            return CircuitState.CLOSED
+        if now - opened_at < self.open_seconds:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def check(self, key: str) -> Optional[object]:
+        """
+        Raises CircuitOpenError if no request may be made to the given site.
+        While half-open, lets through one probe request at a time.
+
+        For the probe, returns a token which must be passed back
+        to record() or cancel(), otherwise returns None.
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            match self.state_locked(key, now):
+                case CircuitState.CLOSED:
+                    return None
+                case CircuitState.OPEN:
+                    retry_after = self.opened_at[key] + self.open_seconds - now
+                case CircuitState.HALF_OPEN if key not in self.probing:
+                    logger.info("Circuit for '%s' is half-open, probing", key)
+                    probe = object()
+                    self.probing[key] = probe
+                    return probe
+                case CircuitState.HALF_OPEN:
+                    # Wait for the probe in flight to decide
+                    retry_after = self.open_seconds
+
+        raise CircuitOpenError(key, retry_after)
+
+    def cancel(self, key: str, probe: Optional[object]) -> None:
+        """
+        Called instead of record() when the request was never sent,
+        so if it was the probe, another request can probe instead.
+        """
+
+        with self.lock:
+            if probe is not None and self.probing.get(key) is probe:
+                logger.debug("Probe for '%s' was not sent", key)
+                del self.probing[key]
+
+    def record(self, key: str, probe: Optional[object], *, healthy: bool) -> None:
+        """
+        Records how a request to the given site went.
+        The probe is the token check() returned for the request, if any.
+        """
+
+        with self.lock:
+            if probe is not None and self.probing.get(key) is probe:
+                del self.probing[key]
+                if healthy:
+                    logger.info("Circuit for '%s' closed", key)
+                    del self.opened_at[key]
+                    self.failures.pop(key, None)
+                else:
+                    logger.warning(
+                        "Circuit for '%s' probe failed, opened for %.0fs",
+                        key,
+                        self.open_seconds,
+                    )
+                    self.opened_at[key] = time.monotonic()
+                return
+
+            if key in self.opened_at:
+                # Sent before the circuit opened, so it's up to the probe
+                return
+
+            if healthy:
+                self.failures.pop(key, None)
+                return
+
+            failures = self.failures.get(key, 0) + 1
+            self.failures[key] = failures
+            if failures >= self.threshold:
+                logger.warning(
+                    "Circuit for '%s' opened after %d failures, for %.0fs",
+                    key,
+                    failures,
+                    self.open_seconds,
+                )
+                self.opened_at[key] = time.monotonic()
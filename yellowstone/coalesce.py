@@ -0,0 +1,162 @@
+"""
+Request coalescing, so identical requests to Wikidot are only made once.
+
+Users are members of many sites, so the same user lookups are made over
+and over by different jobs, often at the same time. When a request is made
+while an identical one is already in flight, it waits for and shares that
+response rather than making its own. Responses are also kept for a short
+time afterwards, so requests made just after are served from memory.
+Responses hold whole pages, so these are limited by their total size.
+
+Failures are shared between the requests waiting at the time, but are
+never kept.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, TypeVar, cast
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class Coalescer:
+    __slots__ = (
+        "ttl",
+        "max_bytes",
+        "size",
+        "lock",
+        "in_flight",
+        "in_flight_async",
+        "results",
+        "results_bytes",
+    )
+
+    ttl: float
+    max_bytes: int
+    size: Callable[[Any], int]
+    lock: threading.Lock
+    in_flight: dict[Hashable, Future]
+    in_flight_async: dict[Hashable, asyncio.Future]
+    results: dict[Hashable, tuple[float, int, Any]]  # key -> (expires_at, size, value)
+    results_bytes: int
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_bytes: int,
+        size: Callable[[Any], int],
+    ) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = size
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.in_flight_async = {}
+        self.results = {}
+        self.results_bytes = 0
+
+    def get(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self.lock:
+            found, value = self.lookup(key)
+            if found:
+                return cast(T, value)
+
+            future = self.in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = self.in_flight[key] = Future()
+
+        if not leader:
+            logger.debug("Waiting on identical request in flight: %r", key)
+            return cast(T, future.result())
+
+        try:
+            value = func()
+        except BaseException as error:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(error)
+            raise
+
+        with self.lock:
+            del self.in_flight[key]
+            self.store(key, value)
+        future.set_result(value)
+        return value
+
+    async def get_async(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        with self.lock:
+            found, value = self.lookup(key)
+            if found:
+                return cast(T, value)
+
+        future = self.in_flight_async.get(key)
+        if future is not None:
+            logger.debug("Waiting on identical request in flight: %r", key)
+            return cast(T, await asyncio.shield(future))
+
+        future = self.in_flight_async[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await func()
+        except BaseException as error:
+            del self.in_flight_async[key]
+            future.set_exception(error)
+            # Mark it as retrieved, in case nobody else was waiting
+            future.exception()
+            raise
+
+        del self.in_flight_async[key]
+        with self.lock:
+            self.store(key, value)
+        future.set_result(value)
+        return value
+
+    def lookup(self, key: Hashable) -> tuple[bool, Any]:
+        # Must be called while holding the lock
+        cached = self.results.get(key)
+        if cached is None:
+            return False, None
+
+        expires_at, _, value = cached
+        if expires_at <= time.monotonic():
+            self.discard(key)
+            return False, None
+
+        logger.debug("Reusing recent response: %r", key)
+        return True, value
+
+    def store(self, key: Hashable, value: Any) -> None:
+        # Must be called while holding the lock
+        size = self.size(value)
+        if self.ttl <= 0 or size > self.max_bytes:
+            return
+
+        now = time.monotonic()
+        self.discard(key)
+        self.results[key] = (now + self.ttl, size, value)
+        self.results_bytes += size
+        if self.results_bytes <= self.max_bytes:
+            return
+
+        for old_key in [
+            old_key
+            for old_key, (expires_at, _, _) in self.results.items()
+            if expires_at <= now
+        ]:
+            self.discard(old_key)
+
+        # Still too large, so drop the oldest
+        while self.results_bytes > self.max_bytes:
+            self.discard(next(iter(self.results)))
+
+    def discard(self, key: Hashable) -> None:
+        # Must be called while holding the lock
+        cached = self.results.pop(key, None)
+        if cached is not None:
+            self.results_bytes -= cached[1]
@@ -0,0 +1,140 @@
+"""
+Adaptive limits on how many requests are made to each site at once.
+
+Wikidot's tolerance for load changes through the day, so rather than fixing
+the parallelism per site, it is adjusted with AIMD (additive increase,
+multiplicative decrease), like TCP congestion control. While requests to a
+site are fast and succeed, its limit grows by about one per round of
+requests. When a request is slow or fails in a way suggesting overload,
+the limit is cut sharply.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyController:
+    __slots__ = (
+        "initial",
+        "minimum",
+        "maximum",
+        "latency_target",
+        "backoff",
+        "condition",
+        "site_limits",
+        "in_flight",
+        "last_decrease",
+    )
+
+    initial: int
+    minimum: int
+    maximum: int
+    latency_target: float
+    backoff: float
+    condition: threading.Condition
+    site_limits: dict[str, float]
+    in_flight: Counter[str]
+    last_decrease: dict[str, float]
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_target: float,
+        backoff: float,
+    ) -> None:
+        assert 1 <= minimum <= initial <= maximum, "Invalid concurrency bounds"
+        assert 0 < backoff < 1, "Backoff factor must be between 0 and 1"
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.condition = threading.Condition()
+        self.site_limits = {}
+        self.in_flight = Counter()
+        self.last_decrease = {}
+
+    def limit(self, key: str) -> int:
+        return int(self.site_limits.get(key, self.initial))
+
+    def limits(self) -> dict[str, int]:
+        """
+        Returns the current limit for every site seen so far, for monitoring.
+        """
+
+        with self.condition:
+            return {key: int(limit) for key, limit in self.site_limits.items()}
+
+    def acquire(self, key: str) -> None:
+        with self.condition:
+            while self.in_flight[key] >= self.limit(key):
+                self.condition.wait()
+            self.in_flight[key] += 1
+
+    def try_acquire(self, key: str) -> bool:
+        """
+        Takes a request slot if one is free, without blocking.
+        Used by the asyncio client, which cannot wait on the condition.
+        """
+
+        with self.condition:
+            if self.in_flight[key] >= self.limit(key):
+                return False
+
+            self.in_flight[key] += 1
+            return True
+
+    def release(self, key: str, *, latency: float, healthy: bool) -> None:
+        """
+        Frees a request slot, adjusting the limit based on how it went.
+        """
+
+        with self.condition:
+            self.in_flight[key] -= 1
+            if healthy and latency <= self.latency_target:
+                self.increase(key)
+            else:
+                self.decrease(key)
+            self.condition.notify_all()
+
+    def abandon(self, key: str) -> None:
+        """
+        Frees a request slot without adjusting the limit,
+        for when the request was never made.
+        """
+
+        with self.condition:
+            self.in_flight[key] -= 1
+            self.condition.notify_all()
+
+    def increase(self, key: str) -> None:
+        limit = self.site_limits.get(key, self.initial)
+        if limit >= self.maximum:
+            return
+
+        # Grows by one each time a full limit's worth of requests succeed
+        new_limit = min(self.maximum, limit + 1 / limit)
+        self.site_limits[key] = new_limit
+        if int(new_limit) > int(limit):
+            logger.debug("Raised concurrency for '%s' to %d", key, int(new_limit))
+
+    def decrease(self, key: str) -> None:
+        # Requests already in flight when the limit is cut will often fail
+        # too, so only cut once per latency target, like TCP does per RTT.
+        now = time.monotonic()
+        if now - self.last_decrease.get(key, float("-inf")) < self.latency_target:
+            return
+
+        limit = self.site_limits.get(key, self.initial)
+        new_limit = max(self.minimum, limit * self.backoff)
+        self.site_limits[key] = new_limit
+        self.last_decrease[key] = now
+        if int(new_limit) < int(limit):
+            logger.info("Lowered concurrency for '%s' to %d", key, int(new_limit))
@@ -7,6 +7,11 @@ import os
 import tomllib
 from argparse import ArgumentParser
 from dataclasses import dataclass
+from typing import Optional
+
+from .cassette import CassetteMode
+from .ratelimit import RateLimit
+from .retry import RetryClass, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,42 @@ class Config:
     sites_use_tls: list[str]
     sites_use_admin_members: list[str]
     always_fetch_site: bool
+    scraper_parser: str
+    scraper_workers: int
+    wikidot_base_url: Optional[str]
+    worker_count: int
+    worker_site_limit: int
+    worker_site_limits: dict[str, int]
+    job_lease_seconds: int
+    job_claim_batch: int
+    job_flush_interval: float
+    site_weights: dict[str, int]
+    worker_async: bool
+    worker_async_count: int
+    worker_async_site_limit: int
+    rate_limit_shared: bool
+    rate_limit_default: RateLimit
+    rate_limits: dict[str, RateLimit]
+    concurrency_initial: int
+    concurrency_min: int
+    concurrency_max: int
+    concurrency_latency_target: float
+    concurrency_backoff: float
+    http_pool_size: int
+    http_connect_timeout: float
+    http_read_timeout: float
+    http_coalesce_ttl: float
+    http_coalesce_max_bytes: int
+    retry_policies: dict[RetryClass, RetryPolicy]
+    circuit_failures: int
+    circuit_open_seconds: float
+    cache_enabled: bool
+    cache_directory: str
+    cache_max_bytes: int
+    cache_ttl: float
+    cache_ttls: dict[str, float]
+    cassette_mode: CassetteMode
+    cassette_path: str
 
     @staticmethod
     def from_file(path: str) -> "Config":
@@ -31,6 +72,55 @@ class Config:
             sites_use_tls=data["wikidot"]["use-tls"],
             sites_use_admin_members=data["wikidot"]["use-admin-members-list"],
             always_fetch_site=data["wikidot"]["always-fetch-site"],
+            scraper_parser=data["scraper"]["parser"],
+            scraper_workers=data["scraper"]["workers"],
+            wikidot_base_url=data["wikidot"]["base-url"] or None,
+            worker_count=data["workers"]["count"],
+            worker_site_limit=data["workers"]["per-site"],
+            worker_site_limits=data["workers"]["per-site-overrides"],
+            job_lease_seconds=data["workers"]["job-lease"],
+            job_claim_batch=data["workers"]["claim-batch"],
+            job_flush_interval=data["workers"]["flush-interval"],
+            site_weights=data["workers"]["site-weights"],
+            worker_async=data["workers"]["async"],
+            worker_async_count=data["workers"]["async-count"],
+            worker_async_site_limit=data["workers"]["async-per-site"],
+            rate_limit_shared=data["rate-limit"]["shared"],
+            rate_limit_default=RateLimit(
+                rate=data["rate-limit"]["rate"],
+                burst=data["rate-limit"]["burst"],
+            ),
+            rate_limits={
+                key: RateLimit(rate=limit["rate"], burst=limit["burst"])
+                for key, limit in data["rate-limit"]["sites"].items()
+            },
+            concurrency_initial=data["concurrency"]["initial"],
+            concurrency_min=data["concurrency"]["min"],
+            concurrency_max=data["concurrency"]["max"],
+            concurrency_latency_target=data["concurrency"]["latency-target"],
+            concurrency_backoff=data["concurrency"]["backoff"],
+            http_pool_size=data["http"]["pool-size"],
+            http_connect_timeout=data["http"]["connect-timeout"],
+            http_read_timeout=data["http"]["read-timeout"],
+            http_coalesce_ttl=data["http"]["coalesce-ttl"],
+            http_coalesce_max_bytes=data["http"]["coalesce-max-size"] * 1024 * 1024,
+            retry_policies={
+                klass: RetryPolicy(
+                    retries=data["retry"][klass.value]["retries"],
+                    base_delay=data["retry"][klass.value]["base-delay"],
+                    max_delay=data["retry"][klass.value]["max-delay"],
+                )
+                for klass in RetryClass
+            },
+            circuit_failures=data["circuit-breaker"]["failures"],
+            circuit_open_seconds=data["circuit-breaker"]["open-seconds"],
+            cache_enabled=data["cache"]["enabled"],
+            cache_directory=data["cache"]["directory"],
+            cache_max_bytes=data["cache"]["max-size"] * 1024 * 1024,
+            cache_ttl=data["cache"]["ttl"],
+            cache_ttls=data["cache"]["ttls"],
+            cassette_mode=CassetteMode(data["cassette"]["mode"]),
+            cassette_path=data["cassette"]["path"],
         )
 
     @staticmethod
@@ -5,22 +5,34 @@ This class instance runs the core of the server, which intakes new events
 and processes new tasks to be run in response.
 """
 
+import asyncio
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import NoReturn
 
 import pugsql
 
 from .config import Config, getenv
 from .job import (
+    WWW_SITE_SLUG,
+    JobDict,
     JobManager,
     get_site,
 )
+from .notify import JobListener
 from .s3 import S3
+from .scraper import set_soup_parser
 from .wikidot import Wikidot
+from .wikidot_async import AsyncWikidot
+from .worker import AsyncWorkerPool, WorkerPool
 
 FULL_WORKLOAD_PAUSE = 10
 
+# Longest a connection's application_name can be, in bytes
+APPLICATION_NAME_LENGTH = 63
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +44,9 @@ class BackupDispatcher:
         "job",
         "s3",
         "site_id_cache",
+        "jobs_added",
+        "wakeup",
+        "listener",
     )
 
     config: Config
@@ -39,24 +54,81 @@ class BackupDispatcher:
     job: JobManager
     s3: S3
     site_id_cache: dict[str, int]
+    jobs_added: threading.Event
+    wakeup: threading.Event
+    listener: JobListener
 
     def __init__(self, config) -> None:
         self.config = config
-        self.wikidot = Wikidot(config)
+        set_soup_parser(config.scraper_parser)
+        database_url = getenv("POSTGRES_DATABASE_URL")
         self.database = pugsql.module("queries/")
-        self.database.connect(getenv("POSTGRES_DATABASE_URL"))
-        self.job = JobManager(self.database)
+        self.job = JobManager(
+            self.database,
+            lease_seconds=config.job_lease_seconds,
+            flush_interval=config.job_flush_interval,
+            site_weights=config.site_weights,
+        )
+        # Tags our job notifications, see notify.py
+        name = self.job.worker_id.encode("utf-8")[:APPLICATION_NAME_LENGTH]
+        application_name = name.decode("utf-8", errors="ignore")
+        self.database.connect(
+            database_url,
+            pool_size=config.worker_count,
+            connect_args={"application_name": application_name},
+        )
+        self.wikidot = Wikidot(config, database=self.database)
         self.s3 = S3(config)
         self.site_id_cache = {}
+        # Jobs being queued sets both. Only claiming clears "jobs_added",
+        # while the worker pool clears "wakeup" as it reaps finished jobs.
+        self.jobs_added = threading.Event()
+        self.wakeup = threading.Event()
+        self.listener = JobListener(
+            database_url,
+            application_name,
+            (self.jobs_added, self.wakeup),
+        )
 
     def run(self) -> NoReturn:
         logger.info("Running Yellowstone dispatcher")
         self.insert_all_sites()
-        while True:
-            self.queue_all_sites()
-            self.process_all_jobs()
-            logger.info("Finished everything! Starting new process cycle")
-            time.sleep(FULL_WORKLOAD_PAUSE)
+        self.listener.start()
+        try:
+            while True:
+                self.queue_all_sites()
+                self.process_all_jobs()
+                deadline = time.monotonic() + FULL_WORKLOAD_PAUSE
+                while self.wait_for_jobs(deadline):
+                    logger.info("New jobs were queued, resuming processing")
+                    self.process_all_jobs()
+                logger.info("Finished everything! Starting new process cycle")
+        finally:
+            self.listener.stop()
+            self.job.flush(force=True)
+            self.job.release()
+            self.wikidot.close()
+
+    def wait_for_jobs(self, deadline: float) -> bool:
+        """
+        Blocks until another dispatcher queues jobs, or the pause between
+        cycles elapses. Returns whether it was woken up by new jobs.
+
+        Returns immediately if jobs were queued since the last claim.
+        Once the deadline passes, returns False, so a dispatcher kept busy
+        by others' jobs still starts its next cycle.
+        """
+
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            return False
+        return self.jobs_added.wait(timeout)
+
+    def claim_jobs(self, count: int, capacities: dict[str, int]) -> list[JobDict]:
+        # Jobs queued from now on are either claimed here,
+        # or noticed afterwards by wait_for_jobs().
+        self.jobs_added.clear()
+        return self.job.claim(count, capacities)
 
     def insert_all_sites(self) -> None:
         for site_slug in self.config.site_slugs:
@@ -70,11 +142,99 @@ class BackupDispatcher:
             self.job.index_forum_categories(site_slug)
             self.job.index_site_members_continue(site_slug)
 
+    @property
+    def job_site_slugs(self) -> list[str]:
+        return self.config.site_slugs + [WWW_SITE_SLUG]
+
     def process_all_jobs(self) -> None:
-        logger.info("Processing all jobs in queue")
-        while True:
-            job = self.database.get_job()
-            if job is None:
-                break
-            self.job.process(self, job)
+        if self.config.worker_async:
+            asyncio.run(self.process_all_jobs_async())
+        else:
+            self.process_all_jobs_threaded()
+
+        self.job.flush(force=True)
         logger.info("No more jobs received, done")
+        logger.info(
+            "Current per-site concurrency limits: %r",
+            self.wikidot.concurrency.limits(),
+        )
+
+    def process_all_jobs_threaded(self) -> None:
+        logger.info(
+            "Processing all jobs in queue (%d workers, %d per site)",
+            self.config.worker_count,
+            self.config.worker_site_limit,
+        )
+
+        with WorkerPool(
+            lambda job: self.job.process(self, job),
+            count=self.config.worker_count,
+            site_limit=self.config.worker_site_limit,
+            site_limits=self.config.worker_site_limits,
+            batch_size=self.config.job_claim_batch,
+            wakeup=self.wakeup,
+        ) as pool:
+            while True:
+                pool.reap()
+                self.job.flush()
+
+                jobs = []
+                if count := pool.wanted():
+                    capacities = pool.capacities(self.job_site_slugs)
+                    jobs = self.claim_jobs(count, capacities)
+                    pool.add(jobs)
+
+                if jobs:
+                    continue
+                elif pool.idle:
+                    break
+                else:
+                    # Either every worker is busy, or the only jobs left are
+                    # for sites at their limit. Check again once a job
+                    # finishes or any dispatcher queues more work.
+                    pool.wait(self.config.job_flush_interval)
+
+    async def process_all_jobs_async(self) -> None:
+        logger.info(
+            "Processing all jobs in queue (%d tasks, %d per site)",
+            self.config.worker_async_count,
+            self.config.worker_async_site_limit,
+        )
+
+        # Database and S3 calls block, so they are run on threads,
+        # no more at once than there are database connections.
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=self.config.worker_count,
+                thread_name_prefix="worker",
+            ),
+        )
+
+        async with (
+            AsyncWikidot(self.wikidot) as wikidot,
+            AsyncWorkerPool(
+                lambda job: self.job.process_async(self, wikidot, job),
+                count=self.config.worker_async_count,
+                site_limit=self.config.worker_async_site_limit,
+                batch_size=self.config.job_claim_batch,
+            ) as pool,
+        ):
+            while True:
+                pool.reap()
+                await asyncio.to_thread(self.job.flush)
+
+                jobs = []
+                if count := pool.wanted():
+                    capacities = pool.capacities(self.job_site_slugs)
+                    jobs = await asyncio.to_thread(self.claim_jobs, count, capacities)
+                    pool.add(jobs)
+
+                if jobs:
+                    continue
+                elif pool.idle:
+                    break
+                else:
+                    # Jobs queued by other dispatchers are picked up
+                    # on the next check, rather than through the listener.
+                    await pool.wait(self.config.job_flush_interval)
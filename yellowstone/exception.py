@@ -3,6 +3,17 @@ Defines exceptions used by the service.
 """
 
 
+class CassetteError(RuntimeError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, site_slug: str, retry_after: float) -> None:
+        super().__init__(f"Circuit open for site '{site_slug}'")
+        self.site_slug = site_slug
+        self.retry_after = retry_after
+
+
 class JobFailed(RuntimeError):
     pass
 
@@ -0,0 +1,720 @@
+"""
+A stand-in for Wikidot, for load testing without touching the real site.
+
+Serves the AJAX module connector, the XML-RPC API, avatars and site home
+pages for every site in the configuration file, using the same markup the
+scrapers expect. Data is synthetic, generated on the fly from the IDs being
+requested, so sites of any size can be served without storing anything.
+Latency and errors can be injected, to see how the system holds up when
+Wikidot is struggling.
+
+To use, start the server with the same configuration file:
+
+    python -m yellowstone.fake_wikidot config.toml --port 8100
+
+then set "base-url" under [wikidot] to "http://localhost:8100".
+Sites are served under their slug, and www.wikidot.com under "www".
+"""
+
+import asyncio
+import logging
+import random
+import time
+import xmlrpc.client
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from html import escape
+from typing import Any, Awaitable, Callable, Optional, cast
+
+from aiohttp import web
+
+from .config import Config
+
+# Items per page, for forum threads, forum posts and site members
+PAGE_SIZE = 20
+
+# How many forum categories are shown in each group
+GROUP_SIZE = 5
+
+# Offsets for each kind of ID, to make them easier to tell apart.
+# IDs are stored as 32-bit integers, so the scale must keep them below this.
+SITE_ID_BASE = 100_000
+CATEGORY_ID_BASE = 1_000_000
+USER_ID_BASE = 1_000_000
+THREAD_ID_BASE = 10_000_000
+POST_ID_BASE = 100_000_000
+REVISION_ID_BASE = 100_000_000
+MAX_ID = 2**31 - 1
+
+# When the synthetic history begins
+START_TIMESTAMP = 1_200_000_000
+
+# Statuses returned for injected errors
+ERROR_STATUSES = (500, 502, 503)
+
+KARMA_LEVELS = ("none", "low", "medium", "high", "very high", "guru")
+
+# A 1x1 transparent GIF
+AVATAR = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01"
+    b"\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+logger = logging.getLogger(__name__)
+
+AjaxHandler = Callable[[int, dict[str, str]], dict[str, Any]]
+
+
+class FakeWikidotError(Exception):
+    """
+    A request for something which does not exist.
+    Returned as a failed AJAX response or an API fault.
+    """
+
+
+@dataclass
+class FakeWikidotOptions:
+    categories: int = 10
+    threads: int = 50
+    posts: int = 20
+    revisions: int = 2
+    members: int = 500
+    users: int = 5000
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+class FakeWikidot:
+    __slots__ = ("sites", "options", "random", "modules")
+
+    sites: dict[str, int]
+    options: FakeWikidotOptions
+    random: random.Random
+    modules: dict[str, AjaxHandler]
+
+    def __init__(self, site_slugs: list[str], options: FakeWikidotOptions) -> None:
+        if options.users <= 0:
+            raise ValueError("There must be at least one user")
+
+        self.sites = {}
+        for site_slug in site_slugs:
+            self.sites.setdefault(site_slug, len(self.sites))
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.modules = {
+            "forum/ForumStartModule": self.forum_start,
+            "forum/ForumViewCategoryModule": self.forum_category,
+            "forum/ForumViewThreadModule": self.forum_thread,
+            "forum/sub/ForumPostRevisionsModule": self.forum_post_revisions,
+            "forum/sub/ForumPostRevisionModule": self.forum_post_revision,
+            "membership/MembersListModule": self.members_list,
+            "managesite/members/ManageSiteMembersListModule": self.members_list,
+            "users/UserInfoWinModule": self.user_info,
+        }
+
+        last_post_id = self.post_id(len(self.sites) - 1, *self.last_post_key())
+        last_revision_id = self.revision_id(last_post_id, options.revisions - 1)
+        if max(last_post_id, last_revision_id) > MAX_ID:
+            raise ValueError("Scale too large, IDs would not fit in 32 bits")
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.disrupt])
+        app.add_routes(
+            [
+                web.post("/www/xml-rpc-api.php", self.handle_api),
+                web.get("/www/avatar.php", self.handle_avatar),
+                web.post("/{site}/ajax-module-connector.php", self.handle_ajax),
+                web.get("/{site}", self.handle_home),
+                web.get("/{site}/", self.handle_home),
+            ],
+        )
+        return app
+
+    # Request handling
+
+    @web.middleware
+    async def disrupt(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        options = self.options
+        delay = options.latency + self.random.uniform(0, options.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.random.random() < options.error_rate:
+            status = self.random.choice(ERROR_STATUSES)
+            logger.debug("Injecting error %d for %s", status, request.path)
+            return web.Response(status=status, text="Injected error")
+
+        return await handler(request)
+
+    def site_index(self, request: web.Request) -> int:
+        site_slug = request.match_info["site"]
+        if site_slug == "www":
+            # Only used for user lookups, which do not belong to a site
+            return 0
+
+        index = self.sites.get(site_slug)
+        if index is None:
+            raise web.HTTPNotFound(text=f"No site '{site_slug}'")
+        return index
+
+    async def handle_ajax(self, request: web.Request) -> web.Response:
+        site = self.site_index(request)
+        data = {key: str(value) for key, value in (await request.post()).items()}
+        module_name = data.get("moduleName", "")
+        handler = self.modules.get(module_name)
+
+        response: dict[str, Any]
+        if handler is None:
+            response = {"status": "not_ok", "message": f"No module {module_name}"}
+        else:
+            try:
+                response = {"status": "ok", **handler(site, data)}
+            except (FakeWikidotError, KeyError, ValueError) as error:
+                response = {"status": "not_ok", "message": str(error)}
+
+        response.setdefault("body", "")
+        response["CURRENT_TIMESTAMP"] = int(time.time())
+        response["jsInclude"] = []
+        response["cssInclude"] = []
+        response["callbackIndex"] = None
+        return web.json_response(response)
+
+    async def handle_api(self, request: web.Request) -> web.Response:
+        if "Authorization" not in request.headers:
+            raise web.HTTPUnauthorized()
+
+        params, method = xmlrpc.client.loads(await request.read())
+        if method is None:
+            raise web.HTTPBadRequest(text="No method called")
+
+        try:
+            if method == "system.multicall":
+                calls = cast(list[dict], params[0])
+                result: Any = [self.api_multicall_entry(call) for call in calls]
+            else:
+                result = self.api_call(method, params)
+            body = xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True)
+        except xmlrpc.client.Fault as fault:
+            body = xmlrpc.client.dumps(fault, methodresponse=True)
+
+        return web.Response(body=body.encode("utf-8"), content_type="text/xml")
+
+    def api_multicall_entry(self, call: dict) -> Any:
+        try:
+            return [self.api_call(call["methodName"], tuple(call["params"]))]
+        except xmlrpc.client.Fault as fault:
+            return {"faultCode": fault.faultCode, "faultString": fault.faultString}
+
+    def api_call(self, method: str, params: tuple) -> Any:
+        if method != "posts.get":
+            raise xmlrpc.client.Fault(404, f"Method {method} not supported")
+
+        (arguments,) = params
+        site = self.sites.get(arguments["site"])
+        if site is None:
+            raise xmlrpc.client.Fault(406, f"No site '{arguments['site']}'")
+
+        try:
+            return {
+                post_id: self.post_data(site, int(post_id))
+                for post_id in arguments["posts"]
+            }
+        except FakeWikidotError as error:
+            raise xmlrpc.client.Fault(406, str(error)) from error
+
+    async def handle_avatar(self, request: web.Request) -> web.Response:
+        return web.Response(body=AVATAR, content_type="image/gif")
+
+    async def handle_home(self, request: web.Request) -> web.Response:
+        site = self.site_index(request)
+        site_slug = request.match_info["site"]
+        site_id = SITE_ID_BASE + site
+        discuss = ""
+        if self.options.threads > 0:
+            thread_id = self.thread_id(site, 0, 0)
+            discuss = (
+                f'<a id="discuss-button" href="/forum/t-{thread_id}/main">Discuss</a>'
+            )
+
+        html = f"""<!DOCTYPE html>
+<html>
+<head>
+<title>Fake site {escape(site_slug)}</title>
+<script type="text/javascript">
+    var WIKIREQUEST = {{}};
+    WIKIREQUEST.info = {{}};
+    WIKIREQUEST.info.siteId = {site_id};
+    WIKIREQUEST.info.siteUnixName = "{site_slug}";
+    WIKIREQUEST.info.categoryId = {site_id};
+    WIKIREQUEST.info.lang = 'en';
+    WIKIREQUEST.info.pageUnixName = "main";
+    WIKIREQUEST.info.pageId = {site_id};
+</script>
+</head>
+<body>
+<div id="header">
+    <h1><a href="/"><span>Fake site {escape(site_slug)}</span></a></h1>
+    <h2><span>Synthetic data for load testing</span></h2>
+</div>
+<div id="page-content"><p>Welcome.</p></div>
+<div id="page-options-bottom">{discuss}</div>
+<div id="action-area" style="display: none;"></div>
+<div id="footer">Powered by nothing in particular</div>
+</body>
+</html>
+"""
+        return web.Response(text=html, content_type="text/html")
+
+    # AJAX modules
+
+    def forum_start(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        groups = []
+        for start in range(0, self.options.categories, GROUP_SIZE):
+            end = min(start + GROUP_SIZE, self.options.categories)
+            rows = "".join(self.category_row(site, c) for c in range(start, end))
+            groups.append(
+                '<div class="forum-group">'
+                '<div class="head">'
+                f'<div class="title">Group {start // GROUP_SIZE}</div>'
+                '<div class="description">Synthetic forum group</div>'
+                "</div>"
+                "<div><table>"
+                '<tr class="head"><td>Category name</td><td>Threads</td>'
+                "<td>Posts</td><td>Last post</td></tr>"
+                f"{rows}"
+                "</table></div>"
+                "</div>"
+            )
+
+        return {"body": f'<div class="forum-start-box">{"".join(groups)}</div>'}
+
+    def category_row(self, site: int, category: int) -> str:
+        options = self.options
+        category_id = self.category_id(site, category)
+        last_post = self.last_post(site, category, options.threads - 1)
+        return (
+            "<tr>"
+            '<td class="name">'
+            f'<div class="title"><a href="/forum/c-{category_id}/category-{category}">'
+            f"Category {category}</a></div>"
+            f'<div class="description">Synthetic category {category}</div>'
+            "</td>"
+            f'<td class="threads">{options.threads}</td>'
+            f'<td class="posts">{options.threads * options.posts}</td>'
+            f'<td class="last">{last_post}</td>'
+            "</tr>"
+        )
+
+    def forum_category(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        category_site, category = self.split_category_id(int(data["c"]))
+        if category_site != site:
+            raise FakeWikidotError(f"No category {data['c']}")
+
+        page = int(data.get("p", 1))
+        start = (page - 1) * PAGE_SIZE
+        end = min(start + PAGE_SIZE, self.options.threads)
+        rows = "".join(
+            self.thread_row(site, category, thread) for thread in range(start, end)
+        )
+        return {
+            "body": (
+                '<div class="forum-category-box">'
+                '<table class="table">'
+                '<tr class="head"><td>Thread name</td><td>Started</td>'
+                "<td>Posts</td><td>Recent post</td></tr>"
+                f"{rows}"
+                "</table>"
+                "</div>"
+            ),
+        }
+
+    def thread_row(self, site: int, category: int, thread: int) -> str:
+        thread_id = self.thread_id(site, category, thread)
+        sticky = "Sticky: " if thread == 0 else ""
+        return (
+            "<tr>"
+            '<td class="name">'
+            f'<div class="title">{sticky}'
+            f'<a href="/forum/t-{thread_id}/thread-{thread}">Thread {thread}</a></div>'
+            f'<div class="description">Synthetic thread {thread}</div>'
+            "</td>"
+            '<td class="started">'
+            f"by: {self.printuser(self.post_author(site, category, thread, 0))}<br/>"
+            f"{self.odate(self.post_timestamp(site, category, thread, 0))}"
+            "</td>"
+            f'<td class="posts">{self.options.posts}</td>'
+            f'<td class="last">{self.last_post(site, category, thread)}</td>'
+            "</tr>"
+        )
+
+    def forum_thread(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        thread_site, category, thread = self.split_thread_id(int(data["t"]))
+        if thread_site != site:
+            raise FakeWikidotError(f"No thread {data['t']}")
+
+        category_id = self.category_id(site, category)
+        page = int(data.get("pageNo", 1))
+        start = (page - 1) * PAGE_SIZE
+        end = min(start + PAGE_SIZE, self.options.posts)
+        posts = "".join(
+            self.post_block(site, category, thread, post) for post in range(start, end)
+        )
+        return {
+            "body": (
+                '<div class="forum-thread-box">'
+                '<div class="forum-breadcrumbs">'
+                '<a href="/forum/start">Forum</a> &raquo; '
+                f'<a href="/forum/c-{category_id}/category-{category}">'
+                f"Group / Category {category}</a> &raquo; Thread {thread}"
+                "</div>"
+                '<div id="thread-container">'
+                f'<div id="thread-container-posts">{posts}</div>'
+                "</div>"
+                "</div>"
+            ),
+        }
+
+    def post_block(self, site: int, category: int, thread: int, post: int) -> str:
+        post_id = self.post_id(site, category, thread, post)
+        author = self.post_author(site, category, thread, post)
+        timestamp = self.post_timestamp(site, category, thread, post)
+        return (
+            f'<div class="post-container" id="fpc-{post_id}">'
+            f'<div class="post" id="post-{post_id}">'
+            '<div class="long">'
+            '<div class="head">'
+            f'<div class="title" id="post-title-{post_id}">Post {post}</div>'
+            f'<div class="info">{self.printuser(author)} {self.odate(timestamp)}</div>'
+            "</div>"
+            f'<div class="content" id="post-content-{post_id}">'
+            f"<p>Post {post} in thread {thread}</p>"
+            "</div>"
+            "</div>"
+            "</div>"
+            "</div>"
+        )
+
+    def forum_post_revisions(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        post_id = int(data["postId"])
+        _, category, thread, post = self.split_post_id(site, post_id)
+        timestamp = self.post_timestamp(site, category, thread, post)
+        author = self.post_author(site, category, thread, post)
+
+        rows = []
+        for revision in reversed(range(self.options.revisions)):
+            revision_id = self.revision_id(post_id, revision)
+            rows.append(
+                "<tr>"
+                f"<td>{self.printuser(author)}</td>"
+                f"<td>{self.odate(timestamp + revision * 60)}</td>"
+                '<td><a href="javascript:;" onclick="WIKIDOT.modules.'
+                f'ForumViewThreadModule.listeners.showRevision(event, {revision_id})">'
+                "Show revision</a></td>"
+                "</tr>"
+            )
+
+        return {
+            "body": (
+                '<div class="title">Post revisions</div>'
+                f'<table class="table">{"".join(rows)}</table>'
+            ),
+        }
+
+    def forum_post_revision(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        index = int(data["revisionId"]) - REVISION_ID_BASE
+        if index < 0 or self.options.revisions <= 0:
+            raise FakeWikidotError(f"No revision {data['revisionId']}")
+
+        post_index, revision = divmod(index, self.options.revisions)
+        post_id = POST_ID_BASE + post_index
+        _, _, _, post = self.split_post_id(site, post_id)
+        return {
+            "body": "ok",
+            "title": f"Post {post}",
+            "content": f"\n\n<p>Revision {revision + 1} of post {post_id}</p>\n",
+            "postId": post_id,
+        }
+
+    def members_list(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        page = int(data.get("page", 1))
+        start = (page - 1) * PAGE_SIZE
+        end = min(start + PAGE_SIZE, self.options.members)
+        rows = []
+        for member in range(start, end):
+            user = (site * self.options.members + member) % self.options.users
+            joined_at = START_TIMESTAMP + member * 3600
+            rows.append(
+                "<tr>"
+                f"<td>{self.printuser(user)}</td>"
+                f"<td>since {self.odate(joined_at)}</td>"
+                "</tr>"
+            )
+
+        return {
+            "body": (
+                f'<div id="ml-{SITE_ID_BASE + site}">'
+                f"<table>{''.join(rows)}</table>"
+                "</div>"
+            ),
+        }
+
+    def user_info(self, site: int, data: dict[str, str]) -> dict[str, Any]:
+        user_id = int(data["user_id"])
+        user = user_id - USER_ID_BASE
+        if not 0 <= user < self.options.users:
+            raise FakeWikidotError(f"No user {user_id}")
+
+        karma = KARMA_LEVELS[user % len(KARMA_LEVELS)]
+        account_type = "Pro" if user % 10 == 0 else "free"
+        fields = (
+            ("Wikidot.com User since:", self.odate(START_TIMESTAMP - user * 60)),
+            ("Account type", account_type),
+            (
+                "Karma level",
+                f'{karma}\t<img src="//www.wikidot.com/userkarma.php?u={user_id}"/>'
+                '(<a href="http://www.wikidot.com/doc:karma">what is this?</a>)',
+            ),
+        )
+        rows = "".join(
+            f'<tr><td class="active"><b>{field}</b></td><td>{value}</td></tr>'
+            for field, value in fields
+        )
+        return {
+            "body": (
+                '<div class="owindow">'
+                '<div class="content modal-body">'
+                f"<h1>{self.user_name(user)}</h1>"
+                f'<table class="table">{rows}</table>'
+                f'<a href="http://www.wikidot.com/user:info/{self.user_slug(user)}" '
+                'class="btn btn-primary">Profile page</a>'
+                "</div>"
+                "</div>"
+            ),
+        }
+
+    def post_data(self, site: int, post_id: int) -> dict[str, Any]:
+        _, category, thread, post = self.split_post_id(site, post_id)
+        timestamp = self.post_timestamp(site, category, thread, post)
+        content = f"Post {post} in thread {thread}"
+        return {
+            "id": post_id,
+            "fullname": f"thread-{thread}",
+            "reply_to": self.post_id(site, category, thread, post - 1)
+            if post % 2
+            else None,
+            "title": f"Post {post}",
+            "content": content,
+            "html": f"\n\n<p>{content}</p>\n",
+            "created_by": self.user_name(
+                self.post_author(site, category, thread, post)
+            ),
+            "created_at": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+        }
+
+    # Synthetic data
+
+    def category_id(self, site: int, category: int) -> int:
+        return CATEGORY_ID_BASE + site * self.options.categories + category
+
+    def split_category_id(self, category_id: int) -> tuple[int, int]:
+        index = category_id - CATEGORY_ID_BASE
+        if index < 0 or self.options.categories <= 0:
+            raise FakeWikidotError(f"No category {category_id}")
+
+        return divmod(index, self.options.categories)
+
+    def thread_id(self, site: int, category: int, thread: int) -> int:
+        options = self.options
+        return (
+            THREAD_ID_BASE
+            + (site * options.categories + category) * options.threads
+            + thread
+        )
+
+    def split_thread_id(self, thread_id: int) -> tuple[int, int, int]:
+        index = thread_id - THREAD_ID_BASE
+        if index < 0 or self.options.threads <= 0:
+            raise FakeWikidotError(f"No thread {thread_id}")
+
+        index, thread = divmod(index, self.options.threads)
+        site, category = divmod(index, self.options.categories)
+        return site, category, thread
+
+    def post_id(self, site: int, category: int, thread: int, post: int) -> int:
+        thread_index = self.thread_id(site, category, thread) - THREAD_ID_BASE
+        return POST_ID_BASE + thread_index * self.options.posts + post
+
+    def split_post_id(self, site: int, post_id: int) -> tuple[int, int, int, int]:
+        index = post_id - POST_ID_BASE
+        if index < 0 or self.options.posts <= 0:
+            raise FakeWikidotError(f"No post {post_id}")
+
+        thread_index, post = divmod(index, self.options.posts)
+        post_site, category, thread = self.split_thread_id(
+            THREAD_ID_BASE + thread_index
+        )
+        if post_site != site:
+            raise FakeWikidotError(f"No post {post_id}")
+        return post_site, category, thread, post
+
+    def revision_id(self, post_id: int, revision: int) -> int:
+        return (
+            REVISION_ID_BASE
+            + (post_id - POST_ID_BASE) * self.options.revisions
+            + revision
+        )
+
+    def last_post_key(self) -> tuple[int, int, int]:
+        options = self.options
+        return options.categories - 1, options.threads - 1, options.posts - 1
+
+    def post_author(self, site: int, category: int, thread: int, post: int) -> int:
+        return self.post_id(site, category, thread, post) * 7919 % self.options.users
+
+    def post_timestamp(self, site: int, category: int, thread: int, post: int) -> int:
+        thread_index = self.thread_id(site, category, thread) - THREAD_ID_BASE
+        return START_TIMESTAMP + thread_index * 3600 + post * 60
+
+    def last_post(self, site: int, category: int, thread: int) -> str:
+        options = self.options
+        if thread < 0 or options.posts <= 0:
+            # Nothing posted, so the cell is empty
+            return ""
+
+        post = options.posts - 1
+        thread_id = self.thread_id(site, category, thread)
+        post_id = self.post_id(site, category, thread, post)
+        author = self.post_author(site, category, thread, post)
+        timestamp = self.post_timestamp(site, category, thread, post)
+        return (
+            f"by {self.printuser(author)}<br/>{self.odate(timestamp)}"
+            f'<a href="/forum/t-{thread_id}#post-{post_id}">Jump!</a>'
+        )
+
+    @staticmethod
+    def user_name(user: int) -> str:
+        return f"User {user}"
+
+    @staticmethod
+    def user_slug(user: int) -> str:
+        return f"user-{user}"
+
+    def printuser(self, user: int) -> str:
+        user_id = USER_ID_BASE + user
+        link = (
+            f'href="http://www.wikidot.com/user:info/{self.user_slug(user)}" '
+            f'onclick="WIKIDOT.page.listeners.userInfo({user_id}); return false;"'
+        )
+        return (
+            '<span class="printuser avatarhover">'
+            f'<a {link}><img class="small" '
+            f'src="https://www.wikidot.com/avatar.php?userid={user_id}" '
+            f'alt="{self.user_name(user)}"/></a>'
+            f"<a {link}>{self.user_name(user)}</a>"
+            "</span>"
+        )
+
+    @staticmethod
+    def odate(timestamp: int) -> str:
+        date = datetime.fromtimestamp(timestamp, timezone.utc)
+        return (
+            f'<span class="odate time_{timestamp} format_%25e%20%25b%20%25Y">'
+            f"{date:%d %b %Y %H:%M}</span>"
+        )
+
+
+def parse_args() -> tuple[list[str], FakeWikidotOptions, str, int]:
+    defaults = FakeWikidotOptions()
+    parser = ArgumentParser(description="A stand-in Wikidot server for load testing")
+    parser.add_argument(
+        "config",
+        help="The configuration file whose sites should be served",
+    )
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument(
+        "--categories",
+        type=int,
+        default=defaults.categories,
+        help="Forum categories per site",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=defaults.threads,
+        help="Forum threads per category",
+    )
+    parser.add_argument(
+        "--posts",
+        type=int,
+        default=defaults.posts,
+        help="Forum posts per thread",
+    )
+    parser.add_argument(
+        "--revisions",
+        type=int,
+        default=defaults.revisions,
+        help="Revisions per forum post",
+    )
+    parser.add_argument(
+        "--members",
+        type=int,
+        default=defaults.members,
+        help="Members per site",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=defaults.users,
+        help="Users in total, which site members are drawn from",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=defaults.latency,
+        help="Seconds to wait before every response",
+    )
+    parser.add_argument(
+        "--latency-jitter",
+        type=float,
+        default=defaults.latency_jitter,
+        help="Up to how many more seconds to wait, at random",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=defaults.error_rate,
+        help="Fraction of requests which fail with a server error",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    options = FakeWikidotOptions(
+        categories=args.categories,
+        threads=args.threads,
+        posts=args.posts,
+        revisions=args.revisions,
+        members=args.members,
+        users=args.users,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    site_slugs = Config.from_file(args.config).site_slugs
+    return site_slugs, options, args.host, args.port
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    site_slugs, options, host, port = parse_args()
+    fake = FakeWikidot(site_slugs, options)
+    logger.info("Serving %d fake sites on http://%s:%d", len(fake.sites), host, port)
+    web.run_app(fake.app(), host=host, port=port)
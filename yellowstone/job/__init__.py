@@ -7,13 +7,20 @@ Wikidot. For instance, a combination of an XMLRPC API call
 and scraping.
 """
 
+import asyncio
 import json
 import logging
+import os
+import socket
+import threading
+import time
 from enum import Enum, unique
-from typing import TYPE_CHECKING, TypedDict, cast
+from typing import TYPE_CHECKING, Iterable, TypedDict, cast
 
-from ..exception import UnknownJobError
+from ..exception import CircuitOpenError, UnknownJobError
+from ..text import hash_text
 from ..types import Json
+from ..utils import backoff_delay
 from . import (
     get_user,
     get_user_avatar,
@@ -28,10 +35,16 @@ from .index_site_members import SiteMemberJob
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
+    from ..wikidot_async import AsyncWikidot
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 4
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 3600
+
+# Jobs without a site (e.g. fetching users) make their requests to www.wikidot.com
+WWW_SITE_SLUG = "www"
 
 
 @unique
@@ -44,25 +57,199 @@ class JobType(Enum):
     FETCH_USER_AVATAR = "fetch-user-avatar"
 
 
+# Within a site, jobs with a higher priority are claimed first.
+# Jobs which page through listings run ahead of the jobs they fan out into,
+# and cheap indexing jobs are not stuck behind large numbers of user fetches.
+JOB_PRIORITY = {
+    JobType.INDEX_SITE_PAGES: 3,
+    JobType.INDEX_FORUM_CATEGORIES: 3,
+    JobType.INDEX_SITE_MEMBERS: 2,
+    JobType.INDEX_FORUM_THREADS: 2,
+    JobType.FETCH_USER: 1,
+    JobType.FETCH_USER_AVATAR: 0,
+}
+
+
 class JobDict(TypedDict):
     job_id: int
     job_type: str
+    site_slug: str
+    priority: int
     attempts: int
     data: Json
 
 
+def data_site_slug(data: Json) -> str:
+    if isinstance(data, dict):
+        site_slug = data.get("site_slug")
+        if isinstance(site_slug, str):
+            return site_slug
+
+    return WWW_SITE_SLUG
+
+
+def job_dedup_key(type: JobType, data: Json) -> bytes:
+    """
+    Produces a fixed-width key identifying a job by its type and payload.
+    The queue only holds one job for any given key.
+    """
+
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hash_text(f"{type.value}:{payload}")
+
+
+def make_worker_id() -> str:
+    """
+    Produces an identifier for this process, unique across hosts.
+    Used to mark which dispatcher holds the lease on a job.
+    """
+
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
 class JobManager:
-    __slots__ = ("database",)
+    __slots__ = (
+        "database",
+        "worker_id",
+        "lease_seconds",
+        "flush_interval",
+        "completed",
+        "completed_lock",
+        "last_flush",
+        "site_weights",
+        "turn",
+    )
+
+    worker_id: str
+    lease_seconds: int
+    flush_interval: float
+    completed: list[int]
+    completed_lock: threading.Lock
+    last_flush: float
+    site_weights: dict[str, int]
+    turn: int
 
-    def __init__(self, database):
+    def __init__(
+        self,
+        database,
+        *,
+        lease_seconds: int,
+        flush_interval: float,
+        site_weights: dict[str, int],
+    ):
         self.database = database
+        self.worker_id = make_worker_id()
+        self.lease_seconds = lease_seconds
+        self.flush_interval = flush_interval
+        self.completed = []
+        self.completed_lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.site_weights = site_weights
+        self.turn = 0
+
+    def claim(self, count: int, capacities: dict[str, int]) -> list[JobDict]:
+        """
+        Atomically takes a lease on up to the given number of jobs in the queue.
+
+        Sites are served in weighted round-robin order: each round, every
+        site gets as many jobs as its weight, until each site's capacity
+        is used up. The site which goes first rotates between claims.
+
+        Jobs leased by other dispatchers are skipped, unless the lease
+        has expired, which means the dispatcher holding it has crashed.
+        """
+
+        site_slugs = sorted(capacities)
+        if not site_slugs:
+            return []
+
+        offset = self.turn % len(site_slugs)
+        site_slugs = site_slugs[offset:] + site_slugs[:offset]
+        self.turn += 1
+
+        sites = [
+            {
+                "site_slug": site_slug,
+                "turn": turn,
+                "weight": self.site_weights.get(site_slug, 1),
+                "capacity": capacities[site_slug],
+            }
+            for turn, site_slug in enumerate(site_slugs)
+        ]
+        jobs = self.database.claim_jobs(
+            worker_id=self.worker_id,
+            lease_seconds=self.lease_seconds,
+            sites=json.dumps(sites),
+            count=count,
+        )
+        return cast(list[JobDict], list(jobs))
+
+    def complete(self, job: JobDict) -> None:
+        """
+        Marks a job as finished.
+
+        The job is removed from the queue on the next flush, along with
+        every other job completed in the meantime. Until then its lease
+        keeps other dispatchers from picking it up.
+        """
+
+        with self.completed_lock:
+            self.completed.append(job["job_id"])
+
+    def flush(self, *, force: bool = False) -> None:
+        if not force and time.monotonic() - self.last_flush < self.flush_interval:
+            return
+
+        with self.completed_lock:
+            job_ids, self.completed = self.completed, []
+
+        self.last_flush = time.monotonic()
+        if job_ids:
+            logger.debug("Removing %d completed jobs from queue", len(job_ids))
+            self.database.delete_jobs(job_ids=job_ids)
+
+    def release(self) -> None:
+        """
+        Gives up the leases on all jobs claimed by this dispatcher,
+        so other dispatchers can pick them up immediately.
+        """
+
+        count = self.database.release_jobs(worker_id=self.worker_id)
+        logger.info("Released %d claimed jobs", count)
 
     def add_raw(self, type: JobType, data: Json) -> None:
         self.database.add_job(
             job_type=type.value,
+            site_slug=data_site_slug(data),
+            priority=JOB_PRIORITY[type],
+            dedup_key=job_dedup_key(type, data),
             data=json.dumps(data),
         )
 
+    def add_many(self, type: JobType, payloads: Iterable[Json]) -> None:
+        """
+        Adds many jobs of the same type in a single statement.
+        Like add_raw(), jobs which are already queued are skipped.
+        """
+
+        jobs = [
+            {
+                "site_slug": data_site_slug(data),
+                "dedup_key": job_dedup_key(type, data).hex(),
+                "data": data,
+            }
+            for data in payloads
+        ]
+        if not jobs:
+            return
+
+        logger.debug("Adding %d %s jobs", len(jobs), type.value)
+        self.database.add_jobs(
+            job_type=type.value,
+            priority=JOB_PRIORITY[type],
+            jobs=json.dumps(jobs),
+        )
+
     def index_site_pages(self, data: None) -> None:
         self.add_raw(JobType.INDEX_SITE_PAGES, data)
 
@@ -91,9 +278,15 @@ class JobManager:
     def index_forum_threads(self, data: ForumThreadsJob) -> None:
         self.add_raw(JobType.INDEX_FORUM_THREADS, cast(Json, data))
 
+    def index_forum_threads_many(self, data: Iterable[ForumThreadsJob]) -> None:
+        self.add_many(JobType.INDEX_FORUM_THREADS, cast(Iterable[Json], data))
+
     def fetch_user(self, data: GetUserJob) -> None:
         self.add_raw(JobType.FETCH_USER, cast(Json, data))
 
+    def fetch_users(self, data: Iterable[GetUserJob]) -> None:
+        self.add_many(JobType.FETCH_USER, cast(Iterable[Json], data))
+
     def fetch_user_avatar(self, data: GetUserAvatarJob) -> None:
         self.add_raw(JobType.FETCH_USER_AVATAR, cast(Json, data))
 
@@ -104,60 +297,157 @@ class JobManager:
         return exists
 
     def process(self, core: "BackupDispatcher", job: JobDict) -> None:
-        job_type = JobType(job["job_type"])
-        data = job["data"]
         logger.info("Processing job %r", job)
         try:
-            match job_type:
-                case JobType.INDEX_SITE_PAGES:
-                    raise NotImplementedError
-                case JobType.INDEX_SITE_MEMBERS:
-                    index_site_members.run(
-                        core,
-                        cast(index_site_members.SiteMemberJob, data),
-                    )
-                case JobType.INDEX_FORUM_CATEGORIES:
-                    index_forum_categories.run(
-                        core,
-                        cast(index_forum_categories.ForumCategoriesJob, data),
-                    )
-                case JobType.INDEX_FORUM_THREADS:
-                    index_forum_threads.run(
-                        core,
-                        cast(index_forum_threads.ForumThreadsJob, data),
-                    )
-                case JobType.FETCH_USER:
-                    get_user.run(
-                        core,
-                        cast(get_user.GetUserJob, data),
-                    )
-                case JobType.FETCH_USER_AVATAR:
-                    get_user_avatar.run(
-                        core,
-                        cast(get_user_avatar.GetUserAvatarJob, data),
-                    )
-                case _:
-                    raise UnknownJobError(f"Unknown job type: {job_type}")
+            self.run(core, job)
         except UnknownJobError:
             logger.error("Fatal: No job implementation", exc_info=True)
             raise
+        except CircuitOpenError as error:
+            self.defer(job, error)
         except Exception as _:
             logger.error("Error occurred while processing job", exc_info=True)
-            if job["attempts"] < MAX_RETRIES:
-                logger.debug(
-                    "Adding to attempt count, currently at %d",
-                    job["attempts"],
-                )
-                self.database.fail_job(job_id=job["job_id"])
-            else:
-                logger.error("Job failed too many times, sending to dead letter queue")
-                with self.database.transaction():
-                    self.database.delete_job(job_id=job["job_id"])
-                    self.database.add_dead_job(
-                        job_id=job["job_id"],
-                        job_type=job["job_type"],
-                        data=json.dumps(job["data"]),
-                    )
+            self.fail(job)
         else:
             logger.debug("Job completed successfully, removing from queue")
-            self.database.delete_job(job_id=job["job_id"])
+            self.complete(job)
+
+    async def process_async(
+        self,
+        core: "BackupDispatcher",
+        wikidot: "AsyncWikidot",
+        job: JobDict,
+    ) -> None:
+        logger.info("Processing job %r", job)
+        try:
+            await self.run_async(core, wikidot, job)
+        except UnknownJobError:
+            logger.error("Fatal: No job implementation", exc_info=True)
+            raise
+        except CircuitOpenError as error:
+            await asyncio.to_thread(self.defer, job, error)
+        except Exception as _:
+            logger.error("Error occurred while processing job", exc_info=True)
+            await asyncio.to_thread(self.fail, job)
+        else:
+            logger.debug("Job completed successfully, removing from queue")
+            self.complete(job)
+
+    def run(self, core: "BackupDispatcher", job: JobDict) -> None:
+        job_type = JobType(job["job_type"])
+        data = job["data"]
+        match job_type:
+            case JobType.INDEX_SITE_PAGES:
+                raise NotImplementedError
+            case JobType.INDEX_SITE_MEMBERS:
+                index_site_members.run(
+                    core,
+                    cast(index_site_members.SiteMemberJob, data),
+                )
+            case JobType.INDEX_FORUM_CATEGORIES:
+                index_forum_categories.run(
+                    core,
+                    cast(index_forum_categories.ForumCategoriesJob, data),
+                )
+            case JobType.INDEX_FORUM_THREADS:
+                index_forum_threads.run(
+                    core,
+                    cast(index_forum_threads.ForumThreadsJob, data),
+                )
+            case JobType.FETCH_USER:
+                get_user.run(
+                    core,
+                    cast(get_user.GetUserJob, data),
+                )
+            case JobType.FETCH_USER_AVATAR:
+                get_user_avatar.run(
+                    core,
+                    cast(get_user_avatar.GetUserAvatarJob, data),
+                )
+            case _:
+                raise UnknownJobError(f"Unknown job type: {job_type}")
+
+    async def run_async(
+        self,
+        core: "BackupDispatcher",
+        wikidot: "AsyncWikidot",
+        job: JobDict,
+    ) -> None:
+        job_type = JobType(job["job_type"])
+        data = job["data"]
+        match job_type:
+            case JobType.INDEX_SITE_PAGES:
+                raise NotImplementedError
+            case JobType.INDEX_SITE_MEMBERS:
+                await index_site_members.run_async(
+                    core,
+                    wikidot,
+                    cast(index_site_members.SiteMemberJob, data),
+                )
+            case JobType.INDEX_FORUM_CATEGORIES:
+                await index_forum_categories.run_async(
+                    core,
+                    wikidot,
+                    cast(index_forum_categories.ForumCategoriesJob, data),
+                )
+            case JobType.INDEX_FORUM_THREADS:
+                await index_forum_threads.run_async(
+                    core,
+                    wikidot,
+                    cast(index_forum_threads.ForumThreadsJob, data),
+                )
+            case JobType.FETCH_USER:
+                await get_user.run_async(
+                    core,
+                    wikidot,
+                    cast(get_user.GetUserJob, data),
+                )
+            case JobType.FETCH_USER_AVATAR:
+                await get_user_avatar.run_async(
+                    core,
+                    wikidot,
+                    cast(get_user_avatar.GetUserAvatarJob, data),
+                )
+            case _:
+                raise UnknownJobError(f"Unknown job type: {job_type}")
+
+    def defer(self, job: JobDict, error: CircuitOpenError) -> None:
+        """
+        Puts a job back in the queue until its site's circuit breaker
+        may let requests through again. This does not count as an attempt.
+        """
+
+        logger.info(
+            "Site '%s' is unavailable, deferring job for %.0fs",
+            error.site_slug,
+            error.retry_after,
+        )
+        self.database.defer_job(job_id=job["job_id"], delay=error.retry_after)
+
+    def fail(self, job: JobDict) -> None:
+        """
+        Schedules a failed job to be retried after a backoff, or moves
+        it to the dead letter queue once it has run out of attempts.
+        """
+
+        if job["attempts"] < MAX_RETRIES:
+            retry_delay = backoff_delay(
+                job["attempts"],
+                base=RETRY_BASE_DELAY,
+                maximum=RETRY_MAX_DELAY,
+            )
+            logger.debug(
+                "Adding to attempt count, currently at %d, retrying in %.0fs",
+                job["attempts"],
+                retry_delay,
+            )
+            self.database.fail_job(job_id=job["job_id"], retry_delay=retry_delay)
+        else:
+            logger.error("Job failed too many times, sending to dead letter queue")
+            with self.database.transaction():
+                self.database.delete_job(job_id=job["job_id"])
+                self.database.add_dead_job(
+                    job_id=job["job_id"],
+                    job_type=job["job_type"],
+                    data=json.dumps(job["data"]),
+                )
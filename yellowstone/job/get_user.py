@@ -2,10 +2,12 @@
 Retrieves all information associated with a user.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, TypedDict
 
 from ..request import user as user_data
+from ..wikidot_async import AsyncWikidot
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
@@ -22,6 +24,22 @@ def run(core: "BackupDispatcher", data: GetUserJob) -> None:
     logger.info("Retrieving user information for user ID %d", user_id)
 
     user = user_data.get(user_id, wikidot=core.wikidot)
+    save(core, data, user)
+
+
+async def run_async(
+    core: "BackupDispatcher",
+    wikidot: AsyncWikidot,
+    data: GetUserJob,
+) -> None:
+    user_id = data["user_id"]
+    logger.info("Retrieving user information for user ID %d", user_id)
+
+    user = await user_data.get_async(user_id, wikidot=wikidot)
+    await asyncio.to_thread(save, core, data, user)
+
+
+def save(core: "BackupDispatcher", data: GetUserJob, user: user_data.UserData) -> None:
     core.database.add_user(
         user_slug=user.slug,
         user_name=user.name,
@@ -2,10 +2,12 @@
 Stores the current avatar for a user.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, TypedDict
 
 from ..request import user_avatar
+from ..wikidot_async import AsyncWikidot
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
@@ -20,6 +22,21 @@ class GetUserAvatarJob(TypedDict):
 def run(core: "BackupDispatcher", data: GetUserAvatarJob) -> None:
     user_id = data["user_id"]
     logger.info("Downloading avatar for user ID %d", user_id)
-    avatar = user_avatar.get(user_id)
+    avatar = user_avatar.get(user_id, wikidot=core.wikidot)
+    save(core, user_id, avatar)
+
+
+async def run_async(
+    core: "BackupDispatcher",
+    wikidot: AsyncWikidot,
+    data: GetUserAvatarJob,
+) -> None:
+    user_id = data["user_id"]
+    logger.info("Downloading avatar for user ID %d", user_id)
+    avatar = await user_avatar.get_async(user_id, wikidot=wikidot)
+    await asyncio.to_thread(save, core, user_id, avatar)
+
+
+def save(core: "BackupDispatcher", user_id: int, avatar: bytes) -> None:
     hash = core.s3.upload_avatar(avatar)
     core.database.add_user_avatar(hash=hash, user_id=user_id)
@@ -5,11 +5,14 @@ This then queues each forum category for thread indexing.
 This is the top-level job for forums in a site.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, Optional, TypedDict
 
 from ..request import forum_categories
 from ..utils import sql_array
+from ..wikidot_async import AsyncWikidot
+from .index_forum_threads import ForumThreadsJob
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
@@ -30,11 +33,29 @@ class ForumCategoryProgressRow(TypedDict):
 
 def run(core: "BackupDispatcher", data: ForumCategoriesJob) -> None:
     site_slug = data["site_slug"]
+    groups = forum_categories.get(site_slug, wikidot=core.wikidot)
+    save(core, site_slug, groups)
+
+
+async def run_async(
+    core: "BackupDispatcher",
+    wikidot: AsyncWikidot,
+    data: ForumCategoriesJob,
+) -> None:
+    site_slug = data["site_slug"]
+    groups = await forum_categories.get_async(site_slug, wikidot=wikidot)
+    await asyncio.to_thread(save, core, site_slug, groups)
 
+
+def save(
+    core: "BackupDispatcher",
+    site_slug: str,
+    groups: list[forum_categories.ForumGroupData],
+) -> None:
     # Clear out and re-insert forum groups
     core.database.delete_forum_groups(site_slug=site_slug)
 
-    groups = forum_categories.get(site_slug, wikidot=core.wikidot)
+    thread_jobs: list[ForumThreadsJob] = []
     for group in groups:
         core.database.add_forum_group(
             site_slug=site_slug,
@@ -67,7 +88,7 @@ def run(core: "BackupDispatcher", data: ForumCategoriesJob) -> None:
             )
 
             if progress is None or needs_update(progress, category):
-                core.job.index_forum_threads(
+                thread_jobs.append(
                     {
                         "site_slug": site_slug,
                         "category_id": category.id,
@@ -75,6 +96,9 @@ def run(core: "BackupDispatcher", data: ForumCategoriesJob) -> None:
                     },
                 )
 
+    # Queue thread indexing for all updated categories at once
+    core.job.index_forum_threads_many(thread_jobs)
+
 
 def needs_update(
     last_progress: ForumCategoryProgressRow,
@@ -5,10 +5,12 @@ If present, then queue the threads for ingestion, as well
 as the next page of the list.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, Optional, TypedDict
 
 from ..request import forum_threads
+from ..wikidot_async import AsyncWikidot
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
@@ -40,6 +42,32 @@ def run(core: "BackupDispatcher", data: ForumThreadsJob) -> None:
         offset=offset,
         wikidot=core.wikidot,
     )
+    save(core, data, threads)
+
+
+async def run_async(
+    core: "BackupDispatcher",
+    wikidot: AsyncWikidot,
+    data: ForumThreadsJob,
+) -> None:
+    threads = await forum_threads.get_async(
+        data["site_slug"],
+        category_id=data["category_id"],
+        offset=data["offset"] or 1,
+        wikidot=wikidot,
+    )
+    await asyncio.to_thread(save, core, data, threads)
+
+
+def save(
+    core: "BackupDispatcher",
+    data: ForumThreadsJob,
+    threads: list[forum_threads.ForumThreadData],
+) -> None:
+    site_slug = data["site_slug"]
+    category_id = data["category_id"]
+    offset = data["offset"] or 1
+
     # TODO save data
     _ = threads
     core.job.index_forum_threads(
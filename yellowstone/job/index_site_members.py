@@ -5,10 +5,12 @@ If present, then queue the users for ingestion, as well
 as the next page of the list.
 """
 
+import asyncio
 import logging
 from typing import TYPE_CHECKING, TypedDict
 
 from ..request import site_members
+from ..wikidot_async import AsyncWikidot
 
 if TYPE_CHECKING:
     from ..core import BackupDispatcher
@@ -41,6 +43,43 @@ def run(core: "BackupDispatcher", data: SiteMemberJob) -> None:
         wikidot=core.wikidot,
         use_admin=core.config.uses_admin_members(site_slug),
     )
+    save(core, data, members)
+
+
+async def run_async(
+    core: "BackupDispatcher",
+    wikidot: AsyncWikidot,
+    data: SiteMemberJob,
+) -> None:
+    site_slug = data["site_slug"]
+    offset = data["offset"]
+
+    assert offset >= 1, "Offset cannot be zero or negative"
+    site_id = core.site_id_cache[site_slug]
+    logger.info(
+        "Retrieving page %d of site members from '%s' (%d)",
+        offset,
+        site_slug,
+        site_id,
+    )
+
+    members = await site_members.get_async(
+        site_slug,
+        offset,
+        wikidot=wikidot,
+        use_admin=core.config.uses_admin_members(site_slug),
+    )
+    await asyncio.to_thread(save, core, data, members)
+
+
+def save(
+    core: "BackupDispatcher",
+    data: SiteMemberJob,
+    members: list[site_members.SiteMemberData],
+) -> None:
+    site_slug = data["site_slug"]
+    offset = data["offset"]
+    site_id = core.site_id_cache[site_slug]
 
     # Save member data
     if members:
@@ -55,7 +94,7 @@ def run(core: "BackupDispatcher", data: SiteMemberJob) -> None:
                     site_id=site_id,
                     joined_at=member.joined_at,
                 )
-                core.job.fetch_user({"user_id": member.id})
+            core.job.fetch_users({"user_id": member.id} for member in members)
 
     # Save member page progress
     core.database.update_last_member_offset(site_slug=site_slug, last_offset=offset)
@@ -0,0 +1,101 @@
+"""
+Wakes the dispatcher when jobs are added to the queue.
+
+Inserting a job sends a notification on the 'job_added' channel (see the
+trigger in the migrations). Listening for it means work queued by any
+dispatcher is picked up immediately, rather than on the next poll.
+
+Each notification carries the application_name of the connection which
+added the jobs. Dispatchers name their connections after themselves, so
+they can ignore the jobs they queued themselves.
+"""
+
+import logging
+import select
+import threading
+import time
+from typing import Iterable
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+CHANNEL = "job_added"
+POLL_TIMEOUT = 30
+RECONNECT_PAUSE = 5
+
+logger = logging.getLogger(__name__)
+
+
+class JobListener:
+    __slots__ = ("database_url", "name", "events", "thread", "running")
+
+    database_url: str
+    name: str
+    events: tuple[threading.Event, ...]
+    thread: threading.Thread
+    running: bool
+
+    def __init__(
+        self,
+        database_url: str,
+        name: str,
+        events: Iterable[threading.Event],
+    ) -> None:
+        self.database_url = database_url
+        self.name = name
+        self.events = tuple(events)
+        self.thread = threading.Thread(
+            target=self.listen,
+            name="job-listener",
+            daemon=True,
+        )
+        self.running = False
+
+    def start(self) -> None:
+        logger.info("Listening for new jobs on channel '%s'", CHANNEL)
+        self.running = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def notify(self) -> None:
+        for event in self.events:
+            event.set()
+
+    def received(self, payloads: Iterable[str]) -> None:
+        # Skip jobs we added ourselves, so they don't keep us busy forever
+        if any(payload != self.name for payload in payloads):
+            logger.debug("Received notification of new jobs")
+            self.notify()
+
+    def listen(self) -> None:
+        while self.running:
+            try:
+                self.listen_connection()
+            except psycopg2.Error:
+                logger.error("Lost connection for job notifications", exc_info=True)
+
+                # We might have missed notifications, so check the queue
+                self.notify()
+                time.sleep(RECONNECT_PAUSE)
+
+    def listen_connection(self) -> None:
+        connection = psycopg2.connect(self.database_url)
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL};")
+
+            while self.running:
+                # Time out occasionally to check if we're still running
+                readable, _, _ = select.select([connection], [], [], POLL_TIMEOUT)
+                if not readable:
+                    continue
+
+                connection.poll()
+                payloads = [notify.payload for notify in connection.notifies]
+                connection.notifies.clear()
+                self.received(payloads)
+        finally:
+            connection.close()
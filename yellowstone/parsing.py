@@ -0,0 +1,69 @@
+"""
+A pool of processes to parse scraped pages in.
+
+Parsing with BeautifulSoup is pure-Python CPU work which holds the GIL,
+so while a page is parsed on one worker thread, every other job stalls,
+including those waiting to make requests. Sending the raw HTML to other
+processes lets parsing use every core, and only the small dataclasses
+built from the page are sent back.
+
+With no processes configured, pages are parsed on the job's own thread,
+or for async jobs, a thread off the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from .scraper import set_soup_parser
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePool:
+    __slots__ = ("executor",)
+
+    executor: Optional[ProcessPoolExecutor]
+
+    def __init__(self, *, workers: int, soup_parser: str) -> None:
+        assert workers >= 0, "Parse pool size cannot be negative"
+        self.executor = None
+        if workers > 0:
+            logger.info("Parsing pages in %d processes", workers)
+            # Forking a process with other threads running can leave locks
+            # held forever in the child, so start each one from scratch.
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=set_soup_parser,
+                initargs=(soup_parser,),
+            )
+
+    def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a parsing function, blocking until it finishes.
+        The function and its arguments must be picklable.
+        """
+
+        if self.executor is None:
+            return func(*args, **kwargs)
+        return self.executor.submit(func, *args, **kwargs).result()
+
+    async def run_async(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a parsing function off the event loop.
+        The function and its arguments must be picklable.
+        """
+
+        if self.executor is None:
+            return await asyncio.to_thread(func, *args, **kwargs)
+        future = self.executor.submit(func, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
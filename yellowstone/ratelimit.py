@@ -0,0 +1,109 @@
+"""
+Token-bucket rate limiting for requests made to Wikidot.
+
+Each bucket is keyed by the site being requested ("www" for www.wikidot.com),
+and refills at a configured rate up to a burst size. Tokens are reserved
+rather than waited for, so a bucket can go into debt, and each caller sleeps
+until its reservation comes due. That way a bucket only needs one atomic
+update per request, which lets it live in the database and be shared by
+every dispatcher.
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimit:
+    rate: float  # tokens per second
+    burst: int
+
+
+class RateLimiter(ABC):
+    __slots__ = ("default", "limits")
+
+    default: RateLimit
+    limits: dict[str, RateLimit]
+
+    def __init__(self, default: RateLimit, limits: dict[str, RateLimit]) -> None:
+        self.default = default
+        self.limits = limits
+
+    def limit(self, key: str) -> RateLimit:
+        return self.limits.get(key, self.default)
+
+    @abstractmethod
+    def reserve(self, key: str) -> float:
+        """
+        Takes a token from the given bucket.
+        Returns how long to wait, in seconds, before it may be used.
+        """
+
+    def acquire(self, key: str) -> None:
+        delay = self.reserve(key)
+        if delay > 0:
+            logger.debug("Rate limited for '%s', waiting %.2fs", key, delay)
+            time.sleep(delay)
+
+
+class LocalRateLimiter(RateLimiter):
+    """
+    Rate limiter shared between the threads of this process only.
+    """
+
+    __slots__ = ("buckets", "lock")
+
+    buckets: dict[str, tuple[float, float]]  # key -> (tokens, updated_at)
+    lock: threading.Lock
+
+    def __init__(self, default: RateLimit, limits: dict[str, RateLimit]) -> None:
+        super().__init__(default, limits)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, key: str) -> float:
+        limit = self.limit(key)
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated_at = self.buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate) - 1
+            self.buckets[key] = (tokens, now)
+
+        return max(0.0, -tokens / limit.rate)
+
+
+class DatabaseRateLimiter(RateLimiter):
+    """
+    Rate limiter shared between every dispatcher using the same database.
+
+    Each reservation is one upsert on the rate_limit table, timed using the
+    database's clock so all hosts agree. This should not be called while
+    holding a transaction, since the bucket row stays locked until it ends.
+    """
+
+    __slots__ = ("database",)
+
+    def __init__(
+        self,
+        default: RateLimit,
+        limits: dict[str, RateLimit],
+        *,
+        database,
+    ) -> None:
+        super().__init__(default, limits)
+        self.database = database
+
+    def reserve(self, key: str) -> float:
+        limit = self.limit(key)
+        tokens = self.database.take_rate_limit_token(
+            bucket=key,
+            rate=limit.rate,
+            burst=limit.burst,
+        )
+        assert isinstance(tokens, float), "Token count is not a float"
+        return max(0.0, -tokens / limit.rate)
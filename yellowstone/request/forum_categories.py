@@ -10,6 +10,7 @@ from typing import Optional
 from bs4 import Tag
 
 from ..scraper import (
+    Source,
     extract_last_forum_post,
     find_element,
     make_soup,
@@ -18,6 +19,7 @@ from ..scraper import (
 )
 from ..types import ForumLastPostData
 from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 
 CATEGORY_ID_REGEX = re.compile(r"\/forum\/c-(\d+)(?:\/.+)?")
 
@@ -53,8 +55,27 @@ def get(
         "forum/ForumStartModule",
         {"hidden": True},
     )
+    return wikidot.parse(parse, site_slug, html)
+
+
+async def get_async(
+    site_slug: str,
+    *,
+    wikidot: AsyncWikidot,
+) -> list[ForumGroupData]:
+    logger.info("Retrieving forum category data for %s", site_slug)
+
+    html = await wikidot.ajax_module_connector(
+        site_slug,
+        "forum/ForumStartModule",
+        {"hidden": True},
+    )
+    return await wikidot.parse(parse, site_slug, html)
+
+
+def parse(site_slug: str, html: str) -> list[ForumGroupData]:
     soup = make_soup(html)
-    source = f"{site_slug} forum"
+    source = Source("%s forum", site_slug)
     return list(
         map(
             lambda group: extract_group(source, group),
@@ -63,9 +84,9 @@ def get(
     )
 
 
-def extract_group(source: str, group: Tag) -> ForumGroupData:
+def extract_group(source: Source, group: Tag) -> ForumGroupData:
     name = select_element(source, group, ".head .title").text
-    source = f"{source} group '{name}'"
+    source = source.child("group '%s'", name)
     description = select_element(source, group, ".head .description").text
     categories = list(
         map(
@@ -81,11 +102,11 @@ def extract_group(source: str, group: Tag) -> ForumGroupData:
     )
 
 
-def extract_category(source: str, category: Tag) -> ForumCategoryData:
+def extract_category(source: Source, category: Tag) -> ForumCategoryData:
     element = select_element(source, category, ".title a")
     id = regex_extract_int(source, element.attrs["href"], CATEGORY_ID_REGEX)
     name = element.text
-    source = f"{source} category '{name}'"
+    source = source.child("category '%s'", name)
 
     description = find_element(source, category, class_="description").text
     thread_count = int(find_element(source, category, class_="threads").text)
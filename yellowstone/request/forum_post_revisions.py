@@ -6,6 +6,7 @@ import logging
 import re
 
 from ..scraper import (
+    Source,
     make_soup,
     regex_extract_int,
 )
@@ -39,8 +40,12 @@ def get(
         "forum/sub/ForumPostRevisionsModule",
         {"postId": post_id},
     )
+    return wikidot.parse(parse, post_id, html)
+
+
+def parse(post_id: int, html: str) -> list[int]:
     soup = make_soup(html)
-    source = f"forum post {post_id}"
+    source = Source("forum post %d", post_id)
     revision_ids = []
 
     for element in soup.select('td a[href="javascript:;"]'):
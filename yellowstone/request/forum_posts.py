@@ -7,11 +7,13 @@ import re
 from collections import namedtuple
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, Union
+from xmlrpc.client import Fault
 
 from bs4 import Tag
 
 from ..scraper import (
+    Source,
     find_element,
     get_entity_user,
     make_soup,
@@ -20,6 +22,7 @@ from ..scraper import (
 from ..types import ForumPostUser, assert_is_tag
 from ..utils import chunks
 from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 from .forum_categories import CATEGORY_ID_REGEX
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,9 @@ logger = logging.getLogger(__name__)
 THREAD_TITLE = re.compile(r"\s*» (.+?)\s*")
 POST_ID = re.compile(r"(?:post|fpc)-(\d+)")
 
+# Wikidot allows at most 10 posts to be fetched per call
+POSTS_PER_CALL = 10
+
 ForumPostDataPartial = namedtuple("ForumPostDataPartial", ("id", "created_by"))
 
 
@@ -62,8 +68,56 @@ def get(
         "forum/ForumViewThreadModule",
         {"t": thread_id, "pageNo": offset},
     )
+    partial_posts = wikidot.parse(parse, category_id, thread_id, html)
+
+    # Then fetch the rest of the post data from the API,
+    # with the call for each batch of posts sent concurrently.
+    batches = post_batches(partial_posts)
+    results = wikidot.api.posts_get_many(
+        site=site_slug,
+        batches=[[str(post.id) for post in batch] for batch in batches],
+    )
+    return merge_posts(source_name(category_id, thread_id), batches, results)
+
+
+async def get_async(
+    site_slug: str,
+    *,
+    category_id: int,
+    thread_id: int,
+    offset: int,
+    wikidot: AsyncWikidot,
+) -> list[ForumPostData]:
+    assert offset >= 1, "Offset cannot be zero or negative"
+    logger.info(
+        "Retrieving forum post data for site %s thread %d (offset %d)",
+        site_slug,
+        thread_id,
+        offset,
+    )
+
+    html = await wikidot.ajax_module_connector(
+        site_slug,
+        "forum/ForumViewThreadModule",
+        {"t": thread_id, "pageNo": offset},
+    )
+    partial_posts = await wikidot.parse(parse, category_id, thread_id, html)
+
+    batches = post_batches(partial_posts)
+    results = await wikidot.api.posts_get_many(
+        site=site_slug,
+        batches=[[str(post.id) for post in batch] for batch in batches],
+    )
+    return merge_posts(source_name(category_id, thread_id), batches, results)
+
+
+def parse(
+    category_id: int,
+    thread_id: int,
+    html: str,
+) -> tuple[ForumPostDataPartial, ...]:
     soup = make_soup(html)
-    source = f"forum category {category_id} thread {thread_id}"
+    source = source_name(category_id, thread_id)
 
     # Get header information
     breadcrumbs = assert_is_tag(
@@ -86,44 +140,72 @@ def get(
         soup.find(id="thread-container-posts"),
         "thread container",
     )
-    partial_posts = tuple(
+    return tuple(
         map(
             lambda post: process_post_partial(source, post),
             container.find_all(class_="post"),
         )
     )
 
-    # Then do batch post fetches until everything is populated.
-    # Wikidot allows at most 10 posts to be fetched per request.
+
+def source_name(category_id: int, thread_id: int) -> Source:
+    return Source("forum category %d thread %d", category_id, thread_id)
+
+
+def post_batches(
+    partial_posts: tuple[ForumPostDataPartial, ...],
+) -> list[tuple[ForumPostDataPartial, ...]]:
+    return list(chunks(partial_posts, POSTS_PER_CALL))
+
+
+def merge_posts(
+    source: Source,
+    batches: list[tuple[ForumPostDataPartial, ...]],
+    results: list[Union[dict[str, dict[str, Any]], Fault]],
+) -> list[ForumPostData]:
+    """
+    Combines each batch of scraped posts with the API results for it.
+    If any call failed, the first failure is raised.
+    """
+
     posts: list[ForumPostData] = []
-    for chunk in chunks(partial_posts, 10):
-        results = wikidot.api.posts_get(
-            site=site_slug,
-            posts=[str(post.id) for post in chunk],
-        )
-        for partial in chunk:
-            data = results[str(partial.id)]
-            assert isinstance(data, dict)
-            assert partial.id == data["id"]
-
-            posts.append(
-                ForumPostData(
-                    id=partial.id,
-                    parent=data["reply_to"],
-                    title=data["title"],
-                    created_by=partial.created_by,
-                    created_at=datetime.fromisoformat(data["created_at"]),
-                    wikitext=data["content"],
-                    html=data["html"].strip(),
-                )
+    for batch, result in zip(batches, results, strict=True):
+        if isinstance(result, Fault):
+            logger.error(
+                "API call for posts %s in %s failed: %s",
+                [post.id for post in batch],
+                source,
+                result.faultString,
             )
+            raise result
+
+        for partial in batch:
+            posts.append(merge_post(partial, result[str(partial.id)]))
 
     return posts
 
 
-def process_post_partial(source: str, post: Tag) -> ForumPostDataPartial:
+def merge_post(partial: ForumPostDataPartial, data: dict) -> ForumPostData:
+    """
+    Combines the scraped parts of a post with its data from the API.
+    """
+
+    assert isinstance(data, dict)
+    assert partial.id == data["id"]
+    return ForumPostData(
+        id=partial.id,
+        parent=data["reply_to"],
+        title=data["title"],
+        created_by=partial.created_by,
+        created_at=datetime.fromisoformat(data["created_at"]),
+        wikitext=data["content"],
+        html=data["html"].strip(),
+    )
+
+
+def process_post_partial(source: Source, post: Tag) -> ForumPostDataPartial:
     post_id = regex_extract_int(source, post.attrs["id"], POST_ID)
-    source = f"{source} post {post_id}"
+    source = source.child("post %d", post_id)
 
     started = find_element(source, post, class_="info")
     created_by = get_entity_user(
@@ -7,10 +7,11 @@ import re
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from ..scraper import (
     download_html,
+    download_html_async,
     make_soup,
     regex_extract_int,
     regex_extract_str,
@@ -18,6 +19,7 @@ from ..scraper import (
 )
 from ..types import assert_is_tag
 from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 
 if TYPE_CHECKING:
     pass
@@ -30,6 +32,14 @@ PAGE_SLUG_REGEX = re.compile(r'WIKIREQUEST\.info\.pageUnixName = "([^"]+)";')
 PAGE_CATEGORY_ID_REGEX = re.compile(r"WIKIREQUEST\.info\.categoryId = (\d+);")
 FORUM_POST_ID_REGEX = re.compile(r"/forum/t-(\d+)/.*")
 
+# Everything needed is in the page head, the header, or the page options
+# below the content. The action area comes after all of these, so the
+# rest of the page (e.g. the footer) isn't downloaded.
+END_MARKER = '<div id="action-area"'
+
+# Only these elements are built into the tree
+HOME_STRAINER = SoupStrainer(id=["header", "discuss-button"])
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,9 +59,31 @@ class SiteHomeData:
 def get(site_slug: str, *, wikidot: Wikidot) -> SiteHomeData:
     logger.info("Retrieving site home page for %s", site_slug)
 
-    source = url = wikidot.site_url(site_slug)
-    html = download_html(url)
+    url = wikidot.site_url(site_slug)
+    html = download_html(
+        url,
+        site_slug=site_slug,
+        wikidot=wikidot,
+        until=END_MARKER,
+    )
+    return wikidot.parse(parse, site_slug, url, html)
+
+
+async def get_async(site_slug: str, *, wikidot: AsyncWikidot) -> SiteHomeData:
+    logger.info("Retrieving site home page for %s", site_slug)
+
+    url = wikidot.site_url(site_slug)
+    html = await download_html_async(
+        url,
+        site_slug=site_slug,
+        wikidot=wikidot,
+        until=END_MARKER,
+    )
+    return await wikidot.parse(parse, site_slug, url, html)
+
 
+def parse(site_slug: str, url: str, html: str) -> SiteHomeData:
+    source = url
     language = regex_extract_str(url, html, LANGUAGE_REGEX)
     site_id = regex_extract_int(url, html, SITE_ID_REGEX)
     site_slug_ex = regex_extract_str(url, html, SITE_SLUG_REGEX)
@@ -60,7 +92,7 @@ def get(site_slug: str, *, wikidot: Wikidot) -> SiteHomeData:
     page_category_id = regex_extract_int(url, html, PAGE_CATEGORY_ID_REGEX)
     assert site_slug == site_slug_ex, "site slug in scraped page doesn't match"
 
-    soup = make_soup(html)
+    soup = make_soup(html, parse_only=HOME_STRAINER)
     name, tagline = get_site_titles(source, soup)
     discussion_thread_id = get_discussion_thread_id(source, soup)
 
@@ -3,24 +3,38 @@ Retrieve groups of site members by page.
 """
 
 import logging
+import re
 from dataclasses import dataclass
 from datetime import datetime
+from html import unescape
+from typing import Optional
 
 from bs4 import Tag
 
 from ..scraper import (
+    FAST_USER_REGEX,
     USER_ID_REGEX,
+    Source,
     find_element,
     get_entity_date,
     get_user_slug,
+    make_row_soup,
     make_soup,
     regex_extract_int,
+    split_rows,
 )
 from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 
 ADMIN_MEMBER_MODULE = "managesite/members/ManageSiteMembersListModule"
 REGULAR_MEMBER_MODULE = "membership/MembersListModule"
 
+FAST_MEMBER_ROW_REGEX = re.compile(
+    r"<tr[^>]*>\s*<td>(?P<user><span .*?</span>)</td>\s*"
+    r'<td[^>]*>since <span class="odate time_(?P<joined_at>\d+)[^"]*">[^<]*</span>'
+    r"</td>\s*</tr>",
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,13 +65,71 @@ def get(
             "order": "",
         },
     )
-    soup = make_soup(html)
-    rows = soup.find_all("tr")
-    return list(map(process_row, rows))
+    return wikidot.parse(parse, html)
+
+
+async def get_async(
+    site_slug: str,
+    offset: int,
+    *,
+    wikidot: AsyncWikidot,
+    use_admin: bool = False,
+) -> list[SiteMemberData]:
+    logger.info("Retrieving site member data for %s (offset %d)", site_slug, offset)
+
+    html = await wikidot.ajax_module_connector(
+        site_slug,
+        ADMIN_MEMBER_MODULE if use_admin else REGULAR_MEMBER_MODULE,
+        {
+            "page": offset,
+            "group": "",
+            "order": "",
+        },
+    )
+    return await wikidot.parse(parse, html)
+
+
+def parse(html: str) -> list[SiteMemberData]:
+    rows = split_rows(html)
+    if rows is None:
+        logger.debug("Cannot split member list rows, using DOM")
+        soup = make_soup(html)
+        return list(map(process_row, soup.find_all("tr")))
+
+    members = []
+    for row in rows:
+        member = fast_process_row(row)
+        if member is None:
+            logger.debug("Member row did not match fast path, using DOM")
+            member = process_row(make_row_soup("site members", row))
+        members.append(member)
+    return members
+
+
+def fast_process_row(row: str) -> Optional[SiteMemberData]:
+    """
+    Extracts a member from a row's HTML without building a tree.
+    Returns None if it isn't laid out as expected for a regular user.
+    """
+
+    match = FAST_MEMBER_ROW_REGEX.fullmatch(row)
+    if match is None:
+        return None
+
+    user = FAST_USER_REGEX.fullmatch(match["user"])
+    if user is None:
+        return None
+
+    return SiteMemberData(
+        name=unescape(user["name"]),
+        slug=user["slug"],
+        id=int(user["id"]),
+        joined_at=datetime.utcfromtimestamp(int(match["joined_at"])),
+    )
 
 
 def process_row(row: Tag) -> SiteMemberData:
-    source = str(row)
+    source = Source("%s", row)
 
     # Extract user information
     element = row.find_all("a")[1]
@@ -12,6 +12,7 @@ from bs4 import Tag
 
 from ..scraper import (
     ScrapingError,
+    Source,
     find_element,
     get_entity_date,
     get_user_slug,
@@ -20,6 +21,7 @@ from ..scraper import (
 )
 from ..utils import chunks
 from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 
 KARMA_LEVEL_STRIP_REGEX = re.compile(r"([\w ]+?) *\t.*?")
 DATE_REGEX = re.compile(r"(\d+) (\w+) (\d+)")
@@ -44,14 +46,26 @@ class UserData:
 
 
 def get(user_id: int, *, wikidot: Wikidot) -> UserData:
-    source = f"users/UserInfoWinModule ({user_id})"
-
     # Fetch from standard 'www' site to avoid dealing with localization issues
     html = wikidot.ajax_module_connector(
         "www",
         "users/UserInfoWinModule",
         {"user_id": user_id},
     )
+    return wikidot.parse(parse, user_id, html)
+
+
+async def get_async(user_id: int, *, wikidot: AsyncWikidot) -> UserData:
+    html = await wikidot.ajax_module_connector(
+        "www",
+        "users/UserInfoWinModule",
+        {"user_id": user_id},
+    )
+    return await wikidot.parse(parse, user_id, html)
+
+
+def parse(user_id: int, html: str) -> UserData:
+    source = Source("users/UserInfoWinModule (%d)", user_id)
     soup = make_soup(html)
 
     # Get name-like fields
@@ -171,7 +185,7 @@ def parse_month(value: str) -> int:
             raise ScrapingError(f"Unknown month value: {value!r}")
 
 
-def parse_date(source: str, value: str) -> date:
+def parse_date(source: Source, value: str) -> date:
     match = regex_extract(source, value, DATE_REGEX)
     year = int(match[3])
     month = parse_month(match[2])
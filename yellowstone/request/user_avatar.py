@@ -5,19 +5,31 @@ Download a user's avatar.
 import logging
 from datetime import datetime
 
-import requests
+from ..wikidot import Wikidot
+from ..wikidot_async import AsyncWikidot
 
 logger = logging.getLogger(__name__)
 
 
-def get(user_id: int) -> bytes:
+def get(user_id: int, *, wikidot: Wikidot) -> bytes:
     # We include the timestamp to blend in with regular requests
-    r = requests.get(
-        "https://www.wikidot.com/avatar.php",
+    r = wikidot.get(
+        "www",
+        wikidot.www_url("avatar.php"),
         params={
             "userid": user_id,
             "timestamp": int(datetime.utcnow().timestamp()),
         },
     )
-    r.raise_for_status()
     return r.content
+
+
+async def get_async(user_id: int, *, wikidot: AsyncWikidot) -> bytes:
+    return await wikidot.get(
+        "www",
+        wikidot.www_url("avatar.php"),
+        params={
+            "userid": user_id,
+            "timestamp": int(datetime.utcnow().timestamp()),
+        },
+    )
@@ -0,0 +1,148 @@
+"""
+Retrying requests to Wikidot which failed for a transient reason.
+
+An expired token, a dropped connection or a brief overload on Wikidot's
+end usually clears up within moments, so such requests are retried in
+the client after a short, jittered backoff, rather than failing the whole
+job and sending it back to the queue. Each class of error has its own
+policy, and any other error, like a missing page, is raised immediately.
+
+Every attempt waits for its own request slot, so retries still count
+towards the rate and concurrency limits.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum, unique
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+import requests
+
+from .exception import WikidotTokenError
+from .utils import backoff_delay
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+@unique
+class RetryClass(Enum):
+    TOKEN = "token"
+    CONNECTION = "connection"
+    SERVER = "server"
+
+
+@dataclass
+class RetryPolicy:
+    retries: int
+    base_delay: float  # seconds
+    max_delay: float  # seconds
+
+
+def retry_class(error: BaseException) -> Optional[RetryClass]:
+    """
+    Determines which kind of transient failure this error is,
+    or None if it should not be retried.
+    """
+
+    match error:
+        case WikidotTokenError():
+            return RetryClass.TOKEN
+        case requests.HTTPError(response=response) if response is not None:
+            return status_retry_class(response.status_code)
+        case aiohttp.ClientResponseError(status=status):
+            return status_retry_class(status)
+        case (
+            requests.ConnectionError()
+            | requests.Timeout()
+            | aiohttp.ClientConnectionError()
+            | TimeoutError()
+        ):
+            return RetryClass.CONNECTION
+        case _:
+            return None
+
+
+def status_retry_class(status: int) -> Optional[RetryClass]:
+    if status >= 500 or status == 429:
+        return RetryClass.SERVER
+    return None
+
+
+class Retrier:
+    __slots__ = ("policies",)
+
+    policies: dict[RetryClass, RetryPolicy]
+
+    def __init__(self, policies: dict[RetryClass, RetryPolicy]) -> None:
+        self.policies = policies
+
+    def delay(
+        self,
+        error: BaseException,
+        attempts: Counter[RetryClass],
+    ) -> Optional[float]:
+        """
+        Returns how long to wait before retrying after this error,
+        or None if it should be raised. Updates the attempt counts.
+        """
+
+        klass = retry_class(error)
+        if klass is None:
+            return None
+
+        policy = self.policies.get(klass)
+        attempt = attempts[klass]
+        if policy is None or attempt >= policy.retries:
+            return None
+
+        attempts[klass] += 1
+        return backoff_delay(
+            attempt,
+            base=policy.base_delay,
+            maximum=policy.max_delay,
+        )
+
+    def call(self, description: str, func: Callable[[], T]) -> T:
+        attempts: Counter[RetryClass] = Counter()
+        while True:
+            try:
+                return func()
+            except Exception as error:
+                delay = self.delay(error, attempts)
+                if delay is None:
+                    raise
+
+                log_retry(description, error, delay)
+                time.sleep(delay)
+
+    async def call_async(
+        self,
+        description: str,
+        func: Callable[[], Awaitable[T]],
+    ) -> T:
+        attempts: Counter[RetryClass] = Counter()
+        while True:
+            try:
+                return await func()
+            except Exception as error:
+                delay = self.delay(error, attempts)
+                if delay is None:
+                    raise
+
+                log_retry(description, error, delay)
+                await asyncio.sleep(delay)
+
+
+def log_retry(description: str, error: Exception, delay: float) -> None:
+    logger.warning(
+        "Request for %s failed (%s), retrying in %.2fs",
+        description,
+        type(error).__name__,
+        delay,
+    )
@@ -2,13 +2,14 @@
 Utilities to assist with scraping.
 """
 
+import asyncio
 import logging
 import re
 from datetime import datetime
-from typing import Optional, Reversible, Union
+from html import unescape
+from typing import TYPE_CHECKING, Any, Optional, Reversible, Union
 
-import requests
-from bs4 import BeautifulSoup, PageElement, Tag
+from bs4 import BeautifulSoup, FeatureNotFound, PageElement, SoupStrainer, Tag
 
 from .exception import ScrapingError
 from .types import (
@@ -21,6 +22,10 @@ from .types import (
     assert_is_tag,
 )
 
+if TYPE_CHECKING:
+    from .wikidot import Wikidot
+    from .wikidot_async import AsyncWikidot
+
 LAST_THREAD_AND_POST_ID = re.compile(r"/forum/t-(\d+)(?:/[^/]*)?#post-(\d+)")
 TIMESTAMP_REGEX = re.compile(r"time_(\d+)")
 USER_ID_REGEX = re.compile(r"WIKIDOT\.page\.listeners\.userInfo\((\d+)\).*")
@@ -30,21 +35,191 @@ USER_IP_REGEX = re.compile(
     r"WIKIDOT\.page\.listeners\.anonymousUserInfo\('([^']+)'\).*",
 )
 
+# For the fast paths of list modules, which avoid building a tree.
+# See split_rows() and fast_entity_user().
+ROW_REGEX = re.compile(r"<tr[\s>].*?</tr>", re.DOTALL)
+ROW_START_REGEX = re.compile(r"<tr[\s>]")
+FAST_USER_REGEX = re.compile(
+    r'<span class="printuser avatarhover">'
+    r'<a href="https?://www\.wikidot\.com/user:info/(?P<slug>[^"/]+)" '
+    r'onclick="WIKIDOT\.page\.listeners\.userInfo\((?P<id>\d+)\); return false;"\s*>'
+    r'<img class="small" [^>]*?alt="(?P<alt>[^"]*)"[^>]*></a>'
+    r"<a [^>]*>(?P<name>[^<]*)</a></span>",
+)
+FAST_DELETED_USER_REGEX = re.compile(
+    r'<span class="printuser deleted" data-id="(\d+)">[^<]*<img [^>]*>[^<]*</span>',
+)
+
+# BeautifulSoup tree builders which the scrapers are known to work with.
+# "lxml" builds the tree faster, but needs the lxml package installed.
+SOUP_PARSERS = ("html.parser", "lxml")
+
 logger = logging.getLogger(__name__)
 
+# Set once on startup, see set_soup_parser()
+soup_parser = "html.parser"
+
+
+class Source:
+    """
+    Describes what is being scraped, for log and error messages.
+
+    Scrapers make one of these for every row and post on a page, but they
+    are rarely needed, so the message is only formatted when converted to
+    a string, using %-style arguments (which may be Sources themselves).
+    """
+
+    __slots__ = ("message", "args")
+
+    message: str
+    args: tuple[Any, ...]
+
+    def __init__(self, message: str, *args: Any) -> None:
+        self.message = message
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.message % self.args
+
+    def child(self, message: str, *args: Any) -> "Source":
+        """
+        Narrows this source, e.g. from a forum thread to a post in it.
+        """
+
+        return Source(f"%s {message}", self, *args)
+
+
+# Plain strings are fine where the label is already at hand
+SourceLike = Union[str, Source]
+
+
+def download_html(
+    url: str,
+    *,
+    site_slug: str,
+    wikidot: "Wikidot",
+    until: Optional[str] = None,
+) -> str:
+    """
+    Downloads a page. If "until" is given, only the start of the page
+    is downloaded, up to and including the first occurrence of it.
+    """
+
+    cache = wikidot.response_cache
+    cache_key = html_cache_key(url, until)
+    if cache is not None:
+        body = cache.get("html", cache_key)
+        if body is not None:
+            return body.decode("utf-8")
+
+    logging.debug("Downloading HTML from %s", url)
+    if until is None:
+        html = wikidot.get(site_slug, url).text
+    else:
+        body = wikidot.get_until(site_slug, url, until.encode("utf-8"))
+        html = body.decode("utf-8", errors="replace")
+
+    if cache is not None:
+        cache.put("html", cache_key, html.encode("utf-8"))
+    return html
+
+
+async def download_html_async(
+    url: str,
+    *,
+    site_slug: str,
+    wikidot: "AsyncWikidot",
+    until: Optional[str] = None,
+) -> str:
+    cache = wikidot.response_cache
+    cache_key = html_cache_key(url, until)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, "html", cache_key)
+        if cached is not None:
+            return cached.decode("utf-8")
 
-def download_html(url: str) -> str:
     logging.debug("Downloading HTML from %s", url)
-    r = requests.get(url)
-    r.raise_for_status()
-    return r.text
+    if until is None:
+        body = await wikidot.get(site_slug, url)
+    else:
+        body = await wikidot.get_until(site_slug, url, until.encode("utf-8"))
+
+    html = body.decode("utf-8", errors="replace")
+    if cache is not None:
+        await asyncio.to_thread(cache.put, "html", cache_key, html.encode("utf-8"))
+    return html
+
+
+def html_cache_key(url: str, until: Optional[str]) -> str:
+    # Partial pages are kept apart from whole ones
+    return url if until is None else f"{url} until {until}"
+
+
+def set_soup_parser(name: str) -> None:
+    global soup_parser
+
+    if name not in SOUP_PARSERS:
+        raise ValueError(f"Unsupported HTML parser: {name!r}")
+    try:
+        BeautifulSoup("", name)
+    except FeatureNotFound as error:
+        raise RuntimeError(f"HTML parser {name!r} is not installed") from error
+
+    logger.info("Using HTML parser %s", name)
+    soup_parser = name
+
+
+def make_soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parses HTML. If "parse_only" is given, only matching elements
+    (and their contents) are built into the tree.
+    """
+
+    return BeautifulSoup(html, soup_parser, parse_only=parse_only)
+
+
+def split_rows(html: str) -> Optional[list[str]]:
+    """
+    Splits out the table rows of a list module without building a tree.
+    Returns None if the rows cannot be cleanly separated (e.g. a missing
+    end tag or a nested table), in which case the DOM should be used.
+    """
+
+    rows = ROW_REGEX.findall(html)
+    if len(rows) != len(ROW_START_REGEX.findall(html)):
+        return None
+    return rows
+
+
+def make_row_soup(source: SourceLike, row: str) -> Tag:
+    # For rows from split_rows() that the fast path couldn't handle
+    soup = make_soup(f"<table>{row}</table>")
+    return find_element(source, soup, "tr")
+
+
+def fast_entity_user(html: str) -> Optional[ForumPostUser]:
+    """
+    Parses out a .printuser entity from its HTML, without building a tree.
+    Only regular and deleted users are handled, for anything else returns
+    None and get_entity_user() should be used instead.
+    """
+
+    match = FAST_USER_REGEX.fullmatch(html)
+    if match is not None:
+        return UserModuleData(
+            id=int(match["id"]),
+            slug=match["slug"],
+            name=unescape(match["alt"]),
+        )
 
+    match = FAST_DELETED_USER_REGEX.fullmatch(html)
+    if match is not None:
+        return DeletedUserData(int(match[1]))
 
-def make_soup(html: str) -> BeautifulSoup:
-    return BeautifulSoup(html, "html.parser")
+    return None
 
 
-def regex_extract(source: str, body: str, regex: re.Pattern) -> re.Match:
+def regex_extract(source: SourceLike, body: str, regex: re.Pattern) -> re.Match:
     logging.debug("Extracting pattern %s from %s", regex.pattern, source)
     match = regex.search(body)
     if match is None:
@@ -53,7 +228,7 @@ def regex_extract(source: str, body: str, regex: re.Pattern) -> re.Match:
     return match
 
 
-def regex_extract_str(source: str, body: str, regex: re.Pattern) -> str:
+def regex_extract_str(source: SourceLike, body: str, regex: re.Pattern) -> str:
     match = regex_extract(source, body, regex)
     assert (
         len(match.groups()) == 1
@@ -63,11 +238,13 @@ def regex_extract_str(source: str, body: str, regex: re.Pattern) -> str:
     return string
 
 
-def regex_extract_int(source: str, body: str, regex: re.Pattern) -> int:
+def regex_extract_int(source: SourceLike, body: str, regex: re.Pattern) -> int:
     return int(regex_extract_str(source, body, regex))
 
 
-def find_element(source: str, soup: Union[BeautifulSoup, Tag], *args, **kwargs) -> Tag:
+def find_element(
+    source: SourceLike, soup: Union[BeautifulSoup, Tag], *args, **kwargs
+) -> Tag:
     logging.debug("Finding %s %s from %s", args, kwargs, source)
     element = soup.find(*args, **kwargs)
     if element is None:
@@ -75,7 +252,9 @@ def find_element(source: str, soup: Union[BeautifulSoup, Tag], *args, **kwargs)
     return assert_is_tag(element, "Element")
 
 
-def select_element(source: str, soup: Union[BeautifulSoup, Tag], selector: str) -> Tag:
+def select_element(
+    source: SourceLike, soup: Union[BeautifulSoup, Tag], selector: str
+) -> Tag:
     logging.debug("Selecting %s from %s", selector, source)
     element = soup.select_one(selector)
     if element is None:
@@ -83,7 +262,7 @@ def select_element(source: str, soup: Union[BeautifulSoup, Tag], selector: str)
     return assert_is_tag(element, "Element")
 
 
-def get_entity_date(source: str, tag: Tag) -> datetime:
+def get_entity_date(source: SourceLike, tag: Tag) -> datetime:
     """
     Parses out a date entity.
 
@@ -102,7 +281,7 @@ def get_entity_date(source: str, tag: Tag) -> datetime:
     raise ScrapingError(f"Could not find date timestamp from {source}")
 
 
-def get_entity_user(source: str, tag: Tag) -> ForumPostUser:
+def get_entity_user(source: SourceLike, tag: Tag) -> ForumPostUser:
     """
     Parses out a user module entity, including unusual cases.
     Requires being focused on .printuser
@@ -149,7 +328,7 @@ def get_entity_user(source: str, tag: Tag) -> ForumPostUser:
 
 
 def get_entity_user_regular(
-    source: str,
+    source: SourceLike,
     tag: Tag,
 ) -> UserModuleData:
     """
@@ -175,7 +354,7 @@ def get_entity_user_regular(
     )
 
 
-def get_user_slug(source: str, element: Tag) -> str:
+def get_user_slug(source: SourceLike, element: Tag) -> str:
     href = element["href"]
     assert isinstance(href, str), "multiple href attributes found"
     match = regex_extract(source, href, USER_SLUG_REGEX)
@@ -183,8 +362,10 @@ def get_user_slug(source: str, element: Tag) -> str:
     return match[1]
 
 
-def extract_last_forum_post(source: str, parent: Tag) -> Optional[ForumLastPostData]:
-    source = f"{source} last-info"
+def extract_last_forum_post(
+    source: SourceLike, parent: Tag
+) -> Optional[ForumLastPostData]:
+    source = Source("%s last-info", source)
     element = find_element(source, parent, class_="last")
     children = tuple(element.children)
     if all(isinstance(c, str) for c in children):
@@ -216,7 +397,7 @@ def extract_last_forum_post(source: str, parent: Tag) -> Optional[ForumLastPostD
     )
 
 
-def _get_last_anchor(source: str, children: Reversible[PageElement]) -> Tag:
+def _get_last_anchor(source: SourceLike, children: Reversible[PageElement]) -> Tag:
     for child in reversed(children):
         if isinstance(child, Tag) and child.name == "a" and "href" in child.attrs:
             return child
@@ -2,6 +2,7 @@
 Miscellaneous utility functions.
 """
 
+import random
 from itertools import islice
 from typing import Iterable, TypeVar
 
@@ -17,3 +18,15 @@ def chunks(it: Iterable[T], size: int) -> Iterable[tuple[T, ...]]:
 def sql_array(it: Iterable[T]) -> str:
     contents = ", ".join(str(item) for item in it)
     return f"{{{contents}}}"
+
+
+def backoff_delay(attempt: int, *, base: float, maximum: float) -> float:
+    """
+    Exponential backoff with jitter, for the given zero-indexed attempt.
+
+    The delay doubles with each attempt, capped at the maximum, and then
+    is randomly reduced by up to half, so retries don't happen in lockstep.
+    """
+
+    delay = min(maximum, base * 2.0**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
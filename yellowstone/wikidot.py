@@ -2,29 +2,376 @@
 Common utilities for interfacing with Wikidot.
 """
 
+import json
 import logging
 import random
 import string
+import threading
+import time
+from contextlib import contextmanager
 from functools import cache
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, cast
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .api import WikidotApi
+from .cache import DiskCache
+from .cassette import Cassette, CassetteMode, request_key
+from .circuit import CircuitBreaker
+from .coalesce import Coalescer
+from .concurrency import ConcurrencyController
 from .config import Config
 from .exception import WikidotError, WikidotTokenError
+from .parsing import ParsePool
+from .ratelimit import DatabaseRateLimiter, LocalRateLimiter, RateLimiter
+from .retry import Retrier
+
+# How much of a response body to read at a time, when streaming
+STREAM_CHUNK_SIZE = 16 * 1024
+
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
 
+def is_overload(error: Exception) -> bool:
+    """
+    Whether this error suggests Wikidot is struggling with our load,
+    as opposed to a problem with the particular request.
+
+    Errors reported by Wikidot itself (e.g. "not_ok" for a missing user)
+    are answers to the request, so they don't count.
+    """
+
+    match error:
+        case requests.HTTPError(response=response) if response is not None:
+            return response.status_code >= 500 or response.status_code == 429
+        case requests.ConnectionError() | requests.Timeout():
+            return True
+        case _:
+            return False
+
+
+def check_ajax_response(response: dict) -> dict:
+    """
+    Checks the status of a response from the AJAX module connector,
+    raising the matching error if it did not succeed.
+    """
+
+    match response["status"]:
+        case "ok":
+            assert isinstance(response, dict)
+            return response
+        case "wrong_token7":
+            raise WikidotTokenError
+        case "not_ok":
+            raise WikidotError(response["message"])
+        case status:
+            raise WikidotError(status)
+
+
+def append_until(body: bytearray, chunk: bytes, marker: bytes) -> bool:
+    """
+    Appends a chunk of a streamed body, returning whether the marker
+    has now been seen. The marker may be split between chunks.
+    """
+
+    start = max(len(body) - len(marker) + 1, 0)
+    body += chunk
+    return body.find(marker, start) != -1
+
+
+def read_until(chunks: Iterable[bytes], marker: bytes) -> bytes:
+    """
+    Reads a streamed body until the marker has been seen, returning
+    what was read, or the whole body if the marker never appears.
+    """
+
+    body = bytearray()
+    for chunk in chunks:
+        if append_until(body, chunk, marker):
+            break
+    return bytes(body)
+
+
+def ajax_request_key(site_slug: str, module_name: str, data: dict) -> tuple:
+    """
+    Identifies an AJAX module call, for sharing responses between identical calls.
+    """
+
+    return (site_slug, module_name, json.dumps(data, sort_keys=True))
+
+
+def ajax_response_size(response: dict) -> int:
+    # The page body is nearly all of it
+    return len(response.get("body", ""))
+
+
+def ajax_cache_key(site_slug: str, data: dict) -> str:
+    # The module name is the cache namespace, so it isn't needed here
+    return json.dumps([site_slug, data], sort_keys=True)
+
+
 class Wikidot:
-    __slots__ = ("config", "api")
+    __slots__ = (
+        "config",
+        "rate_limiter",
+        "concurrency",
+        "retrier",
+        "circuit",
+        "sessions",
+        "sessions_lock",
+        "coalescer",
+        "response_cache",
+        "cassette",
+        "parse_pool",
+        "api",
+    )
 
     config: Config
+    rate_limiter: RateLimiter
+    concurrency: ConcurrencyController
+    retrier: Retrier
+    circuit: CircuitBreaker
+    sessions: dict[str, requests.Session]
+    sessions_lock: threading.Lock
+    coalescer: Coalescer
+    response_cache: Optional[DiskCache]
+    cassette: Optional[Cassette]
+    parse_pool: ParsePool
     api: WikidotApi
 
-    def __init__(self, config, *, username=None, api_key=None) -> None:
+    def __init__(
+        self,
+        config,
+        *,
+        database=None,
+        username=None,
+        api_key=None,
+    ) -> None:
         self.config = config
-        self.api = WikidotApi(username, api_key)
+        if config.rate_limit_shared and database is not None:
+            self.rate_limiter = DatabaseRateLimiter(
+                config.rate_limit_default,
+                config.rate_limits,
+                database=database,
+            )
+        else:
+            self.rate_limiter = LocalRateLimiter(
+                config.rate_limit_default,
+                config.rate_limits,
+            )
+        self.concurrency = ConcurrencyController(
+            initial=config.concurrency_initial,
+            minimum=config.concurrency_min,
+            maximum=config.concurrency_max,
+            latency_target=config.concurrency_latency_target,
+            backoff=config.concurrency_backoff,
+        )
+        self.retrier = Retrier(config.retry_policies)
+        self.circuit = CircuitBreaker(
+            threshold=config.circuit_failures,
+            open_seconds=config.circuit_open_seconds,
+        )
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.coalescer = Coalescer(
+            ttl=config.http_coalesce_ttl,
+            max_bytes=config.http_coalesce_max_bytes,
+            size=ajax_response_size,
+        )
+        self.response_cache = None
+        if config.cache_enabled:
+            self.response_cache = DiskCache(
+                config.cache_directory,
+                default_ttl=config.cache_ttl,
+                ttls=config.cache_ttls,
+                max_bytes=config.cache_max_bytes,
+            )
+        self.cassette = None
+        if config.cassette_mode != CassetteMode.OFF:
+            self.cassette = Cassette(config.cassette_path, config.cassette_mode)
+        self.parse_pool = ParsePool(
+            workers=config.scraper_workers,
+            soup_parser=config.scraper_parser,
+        )
+        self.api = WikidotApi(self, username, api_key)
+
+    @property
+    def offline(self) -> bool:
+        """
+        Whether responses are being replayed, so Wikidot is never contacted.
+        """
+
+        return self.cassette is not None and self.cassette.replaying
+
+    def close(self) -> None:
+        self.api.close()
+        self.parse_pool.close()
+        if self.cassette is not None:
+            self.cassette.close()
+
+    def parse(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a parsing function, in the parse pool if there is one.
+        """
+
+        return self.parse_pool.run(func, *args, **kwargs)
+
+    def session(self, site_slug: str) -> requests.Session:
+        """
+        Gets the HTTP session for requests to the given site.
+
+        Each site is on its own host, so each gets a session with its own pool
+        of keep-alive connections, which saves a TCP and TLS handshake on
+        every request. Sessions are shared between worker threads.
+        """
+
+        with self.sessions_lock:
+            session = self.sessions.get(site_slug)
+            if session is None:
+                logger.debug("Creating HTTP session for '%s'", site_slug)
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.config.http_pool_size,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[site_slug] = session
+
+            return session
+
+    def request(
+        self,
+        method: str,
+        site_slug: str,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Makes a raw HTTP request to the given site, using its session.
+        Callers are responsible for holding a slot for the site.
+        """
+
+        kwargs.setdefault(
+            "timeout",
+            (self.config.http_connect_timeout, self.config.http_read_timeout),
+        )
+        if self.cassette is None:
+            r = self.session(site_slug).request(method, url, **kwargs)
+        else:
+            r = self.cassette_request(method, site_slug, url, **kwargs)
+        r.raise_for_status()
+        return r
+
+    def cassette_request(
+        self,
+        method: str,
+        site_slug: str,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        assert self.cassette is not None, "No cassette to use"
+        key = request_key(
+            method,
+            url,
+            params=kwargs.get("params"),
+            data=kwargs.get("data"),
+        )
+
+        if self.cassette.replaying:
+            status, body = self.cassette.replay(key, f"{method} {url}")
+            r = requests.Response()
+            r.status_code = status
+            r._content = body
+            r.encoding = "utf-8"
+            r.url = url
+            r._content_consumed = True  # type: ignore[attr-defined]
+            return r
+
+        r = self.session(site_slug).request(method, url, **kwargs)
+        self.cassette.record(key, r.status_code, r.content)
+        return r
+
+    @contextmanager
+    def slot(self, site_slug: str) -> Iterator[None]:
+        """
+        Waits until a request may be made to the given site, under both
+        its rate limit and concurrency limit. How the request performs
+        is fed back to adjust the concurrency limit and circuit breaker.
+
+        Raises CircuitOpenError if the site's circuit breaker is open.
+        """
+
+        probe = self.circuit.check(site_slug)
+        try:
+            self.concurrency.acquire(site_slug)
+        except BaseException:
+            self.circuit.cancel(site_slug, probe)
+            raise
+
+        start = None
+        healthy = False
+        try:
+            # Only take a token once the request can be sent right away.
+            # Otherwise requests waiting on the concurrency limit would
+            # each hold one, and all be sent at once when slots free up.
+            if not self.offline:
+                self.rate_limiter.acquire(site_slug)
+            start = time.monotonic()
+            yield
+            healthy = True
+        except Exception as error:
+            healthy = not is_overload(error)
+            raise
+        finally:
+            if start is None:
+                self.concurrency.abandon(site_slug)
+                self.circuit.cancel(site_slug, probe)
+            else:
+                self.concurrency.release(
+                    site_slug,
+                    latency=time.monotonic() - start,
+                    healthy=healthy,
+                )
+                self.circuit.record(site_slug, probe, healthy=healthy)
+
+    def get(self, site_slug: str, url: str, **kwargs) -> requests.Response:
+        return self.retrier.call(
+            url,
+            lambda: self.get_once(site_slug, url, **kwargs),
+        )
+
+    def get_once(self, site_slug: str, url: str, **kwargs) -> requests.Response:
+        with self.slot(site_slug):
+            return self.request("GET", site_slug, url, **kwargs)
+
+    def get_until(self, site_slug: str, url: str, marker: bytes, **kwargs) -> bytes:
+        """
+        Downloads the start of a page, closing the connection once the marker
+        has been seen rather than reading the rest. See read_until().
+        """
+
+        return self.retrier.call(
+            url,
+            lambda: self.get_until_once(site_slug, url, marker, **kwargs),
+        )
+
+    def get_until_once(
+        self,
+        site_slug: str,
+        url: str,
+        marker: bytes,
+        **kwargs,
+    ) -> bytes:
+        with self.slot(site_slug):
+            r = self.request("GET", site_slug, url, stream=True, **kwargs)
+            try:
+                return read_until(r.iter_content(STREAM_CHUNK_SIZE), marker)
+            finally:
+                r.close()
 
     def ajax_module_connector(
         self,
@@ -44,37 +391,64 @@ class Wikidot:
         module_name: str,
         data: dict,
     ) -> dict:
+        # Module calls only read data, so identical ones can share a response
+        return self.coalescer.get(
+            ajax_request_key(site_slug, module_name, data),
+            lambda: self.ajax_module_call(site_slug, module_name, data),
+        )
+
+    def ajax_module_call(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> dict:
+        if self.response_cache is not None:
+            cache_key = ajax_cache_key(site_slug, data)
+            body = self.response_cache.get(module_name, cache_key)
+            if body is not None:
+                return cast(dict, json.loads(body))
+
         logger.debug("Making AJAX call for site '%s': %r", site_slug, data)
+        response = self.retrier.call(
+            f"{module_name} on '{site_slug}'",
+            lambda: self.ajax_module_call_once(site_slug, module_name, data),
+        )
 
-        # Set token7
+        if self.response_cache is not None:
+            body = json.dumps(response).encode()
+            self.response_cache.put(module_name, cache_key, body)
+        return response
+
+    def ajax_module_call_once(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> dict:
+        # Set token7, a new one for each attempt
         token7 = self.generate_token7()
         data["moduleName"] = module_name
         data["wikidot_token7"] = token7
 
-        # Make HTTP request
-        r = requests.post(
-            self.ajax_module_url(site_slug),
-            cookies={"wikidot_token7": token7},
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            data=data,
-        )
-        r.raise_for_status()
-        response = r.json()
-
-        # Process body
-        match response["status"]:
-            case "ok":
-                assert isinstance(response, dict)
-                return response
-            case "wrong_token7":
-                raise WikidotTokenError
-            case "not_ok":
-                raise WikidotError(response["message"])
-            case status:
-                raise WikidotError(status)
+        with self.slot(site_slug):
+            # Make HTTP request
+            r = self.request(
+                "POST",
+                site_slug,
+                self.ajax_module_url(site_slug),
+                cookies={"wikidot_token7": token7},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data=data,
+            )
+            return check_ajax_response(r.json())
 
     @cache
     def site_url(self, site_slug: str) -> str:
+        base_url = self.config.wikidot_base_url
+        if base_url is not None:
+            return f"{base_url}/{site_slug}"
+
         protocol = "https" if self.config.uses_tls(site_slug) else "http"
         return f"{protocol}://{site_slug}.wikidot.com"
 
@@ -82,6 +456,17 @@ class Wikidot:
     def ajax_module_url(self, site_slug: str) -> str:
         return f"{self.site_url(site_slug)}/ajax-module-connector.php"
 
+    def www_url(self, path: str) -> str:
+        """
+        Gets the URL of a resource on www.wikidot.com, such as the API.
+        """
+
+        base_url = self.config.wikidot_base_url
+        if base_url is not None:
+            return f"{base_url}/www/{path}"
+
+        return f"https://www.wikidot.com/{path}"
+
     @staticmethod
     def generate_token7() -> str:
         return "".join(random.choice(string.hexdigits) for _ in range(32))
@@ -0,0 +1,419 @@
+"""
+Asyncio variant of the Wikidot client.
+
+Jobs spend nearly all of their time waiting on Wikidot, so running them as
+tasks on an event loop allows far more requests in flight than a pool of
+threads could. This client wraps a regular Wikidot instance, sharing its
+rate limits and concurrency limits, so both obey the same budget.
+
+Parsing is CPU-bound, so it is run off the event loop,
+in the parse pool if there is one.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+import xmlrpc.client
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar, Union, cast
+
+import aiohttp
+from aiohttp import RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .api import (
+    API_PATH,
+    API_SESSION,
+    CallResult,
+    decode_response,
+    encode_call,
+)
+from .cache import DiskCache
+from .cassette import request_key
+from .config import getenv
+from .wikidot import (
+    STREAM_CHUNK_SIZE,
+    Wikidot,
+    ajax_cache_key,
+    ajax_request_key,
+    append_until,
+    check_ajax_response,
+    is_overload,
+)
+
+# How often to re-check for a free request slot, in case
+# it was released by a synchronous request on another thread.
+SLOT_POLL_INTERVAL = 1
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+async def read_until_async(content: aiohttp.StreamReader, marker: bytes) -> bytes:
+    """
+    Reads a streamed body until the marker has been seen.
+    See read_until().
+    """
+
+    body = bytearray()
+    async for chunk in content.iter_chunked(STREAM_CHUNK_SIZE):
+        if append_until(body, chunk, marker):
+            break
+    return bytes(body)
+
+
+def is_overload_async(error: Exception) -> bool:
+    match error:
+        case aiohttp.ClientResponseError(status=status):
+            return status >= 500 or status == 429
+        case aiohttp.ClientConnectionError() | TimeoutError():
+            return True
+        case _:
+            return is_overload(error)
+
+
+class AsyncWikidot:
+    __slots__ = ("wikidot", "session", "released", "api")
+
+    wikidot: Wikidot
+    session: Optional[aiohttp.ClientSession]
+    released: asyncio.Condition
+    api: "AsyncWikidotApi"
+
+    def __init__(self, wikidot: Wikidot, *, username=None, api_key=None) -> None:
+        self.wikidot = wikidot
+        self.session = None
+        self.released = asyncio.Condition()
+        self.api = AsyncWikidotApi(self, username, api_key)
+
+    async def __aenter__(self) -> "AsyncWikidot":
+        # The session must be created from within the event loop
+        config = self.wikidot.config
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=config.http_pool_size,
+            ),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=config.http_connect_timeout,
+                sock_read=config.http_read_timeout,
+            ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(
+        self,
+        method: str,
+        site_slug: str,
+        url: str,
+        *,
+        until: Optional[bytes] = None,
+        **kwargs,
+    ) -> bytes:
+        """
+        Makes a raw HTTP request to the given site, returning the body.
+        If "until" is given, stops reading once it has been seen.
+        Callers are responsible for holding a slot for the site.
+        """
+
+        assert self.session is not None, "Client used outside of 'async with'"
+        cassette = self.wikidot.cassette
+        if cassette is not None:
+            key = request_key(
+                method,
+                url,
+                params=kwargs.get("params"),
+                data=kwargs.get("data"),
+            )
+
+            if cassette.replaying:
+                status, body = cassette.replay(key, f"{method} {url}")
+                if status >= 400:
+                    raise aiohttp.ClientResponseError(
+                        RequestInfo(URL(url), method, CIMultiDictProxy(CIMultiDict())),
+                        (),
+                        status=status,
+                    )
+                return body
+
+        async with self.session.request(method, url, **kwargs) as r:
+            if until is None:
+                body = await r.read()
+            else:
+                body = await read_until_async(r.content, until)
+            if cassette is not None:
+                cassette.record(key, r.status, body)
+            r.raise_for_status()
+            return body
+
+    @asynccontextmanager
+    async def slot(self, site_slug: str) -> AsyncIterator[None]:
+        """
+        Waits until a request may be made to the given site.
+        See Wikidot.slot(), whose limits this shares.
+        """
+
+        circuit = self.wikidot.circuit
+        probe = circuit.check(site_slug)
+
+        concurrency = self.wikidot.concurrency
+        try:
+            async with self.released:
+                while not concurrency.try_acquire(site_slug):
+                    try:
+                        await asyncio.wait_for(
+                            self.released.wait(),
+                            SLOT_POLL_INTERVAL,
+                        )
+                    except TimeoutError:
+                        pass
+        except BaseException:
+            # Including being cancelled while waiting
+            circuit.cancel(site_slug, probe)
+            raise
+
+        start = None
+        healthy = False
+        cancelled = False
+        try:
+            # Only take a token once holding a slot, see Wikidot.slot().
+            # The database rate limiter blocks, so always reserve from a thread.
+            rate_limiter = self.wikidot.rate_limiter
+            delay = 0.0
+            if not self.wikidot.offline:
+                delay = await asyncio.to_thread(rate_limiter.reserve, site_slug)
+            if delay > 0:
+                logger.debug("Rate limited for '%s', waiting %.2fs", site_slug, delay)
+                await asyncio.sleep(delay)
+
+            start = time.monotonic()
+            yield
+            healthy = True
+        except asyncio.CancelledError:
+            # Says nothing about the site, e.g. the job is being shut down
+            cancelled = True
+            raise
+        except Exception as error:
+            healthy = not is_overload_async(error)
+            raise
+        finally:
+            if start is None or cancelled:
+                concurrency.abandon(site_slug)
+                circuit.cancel(site_slug, probe)
+            else:
+                concurrency.release(
+                    site_slug,
+                    latency=time.monotonic() - start,
+                    healthy=healthy,
+                )
+                circuit.record(site_slug, probe, healthy=healthy)
+            async with self.released:
+                self.released.notify_all()
+
+    async def parse(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a parsing function off the event loop,
+        in the parse pool if there is one.
+        """
+
+        return await self.wikidot.parse_pool.run_async(func, *args, **kwargs)
+
+    async def get(self, site_slug: str, url: str, **kwargs) -> bytes:
+        return await self.wikidot.retrier.call_async(
+            url,
+            lambda: self.get_once(site_slug, url, **kwargs),
+        )
+
+    async def get_once(self, site_slug: str, url: str, **kwargs) -> bytes:
+        async with self.slot(site_slug):
+            return await self.request("GET", site_slug, url, **kwargs)
+
+    async def get_until(
+        self,
+        site_slug: str,
+        url: str,
+        marker: bytes,
+        **kwargs,
+    ) -> bytes:
+        """
+        Downloads the start of a page, up to the marker.
+        See Wikidot.get_until().
+        """
+
+        return await self.get(site_slug, url, until=marker, **kwargs)
+
+    async def ajax_module_connector(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> str:
+        data = await self.ajax_module_connector_json(site_slug, module_name, data)
+        assert "body" in data, "No body field in AJAX module response"
+        body = data["body"]
+        assert isinstance(body, str), "Body field in AJAX module response not string"
+        return body
+
+    async def ajax_module_connector_json(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> dict:
+        # Responses are shared with the synchronous client
+        return await self.wikidot.coalescer.get_async(
+            ajax_request_key(site_slug, module_name, data),
+            lambda: self.ajax_module_call(site_slug, module_name, data),
+        )
+
+    async def ajax_module_call(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> dict:
+        cache = self.response_cache
+        if cache is not None:
+            cache_key = ajax_cache_key(site_slug, data)
+            cached = await asyncio.to_thread(cache.get, module_name, cache_key)
+            if cached is not None:
+                return cast(dict, json.loads(cached))
+
+        logger.debug("Making AJAX call for site '%s': %r", site_slug, data)
+        response = await self.wikidot.retrier.call_async(
+            f"{module_name} on '{site_slug}'",
+            lambda: self.ajax_module_call_once(site_slug, module_name, data),
+        )
+
+        if cache is not None:
+            body = json.dumps(response).encode()
+            await asyncio.to_thread(cache.put, module_name, cache_key, body)
+        return response
+
+    async def ajax_module_call_once(
+        self,
+        site_slug: str,
+        module_name: str,
+        data: dict,
+    ) -> dict:
+        # Set token7, a new one for each attempt
+        token7 = self.wikidot.generate_token7()
+        data["moduleName"] = module_name
+        data["wikidot_token7"] = token7
+
+        async with self.slot(site_slug):
+            body = await self.request(
+                "POST",
+                site_slug,
+                self.wikidot.ajax_module_url(site_slug),
+                cookies={"wikidot_token7": token7},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data={key: str(value) for key, value in data.items()},
+            )
+            return check_ajax_response(json.loads(body))
+
+    def site_url(self, site_slug: str) -> str:
+        return self.wikidot.site_url(site_slug)
+
+    def www_url(self, path: str) -> str:
+        return self.wikidot.www_url(path)
+
+    @property
+    def response_cache(self) -> Optional[DiskCache]:
+        return self.wikidot.response_cache
+
+
+class AsyncWikidotApi:
+    """
+    Asyncio variant of WikidotApi, over the shared HTTP session.
+    """
+
+    __slots__ = ("wikidot", "url", "authorization")
+
+    wikidot: AsyncWikidot
+    url: str
+    authorization: str
+
+    def __init__(self, wikidot: AsyncWikidot, username=None, api_key=None):
+        username = username or getenv("WIKIDOT_USERNAME")
+        api_key = api_key or getenv("WIKIDOT_API_KEY")
+        self.wikidot = wikidot
+        self.url = wikidot.www_url(API_PATH)
+        credentials = base64.b64encode(f"{username}:{api_key}".encode("utf-8"))
+        self.authorization = f"Basic {credentials.decode('ascii')}"
+
+    async def post(self, site_slug: str, data: bytes) -> bytes:
+        return await self.wikidot.wikidot.retrier.call_async(
+            f"API call on '{site_slug}'",
+            lambda: self.post_once(site_slug, data),
+        )
+
+    async def post_once(self, site_slug: str, data: bytes) -> bytes:
+        # API calls count towards the limits of the site they are about
+        async with self.wikidot.slot(site_slug):
+            return await self.wikidot.request(
+                "POST",
+                API_SESSION,
+                self.url,
+                headers={
+                    "Authorization": self.authorization,
+                    "Content-Type": "text/xml",
+                },
+                data=data,
+            )
+
+    async def call(self, site_slug: str, method: str, *params: Any) -> Any:
+        body = await self.post(site_slug, encode_call(method, params))
+        return decode_response(body)
+
+    async def call_result(
+        self,
+        site_slug: str,
+        method: str,
+        params: tuple,
+    ) -> CallResult:
+        try:
+            return await self.call(site_slug, method, *params)
+        except xmlrpc.client.Fault as fault:
+            return fault
+
+    async def call_concurrent(
+        self,
+        site_slug: str,
+        calls: list[tuple[str, tuple]],
+    ) -> list[CallResult]:
+        logger.debug(
+            "Making %d concurrent API calls for site '%s'",
+            len(calls),
+            site_slug,
+        )
+        return await asyncio.gather(
+            *(self.call_result(site_slug, *call) for call in calls),
+        )
+
+    async def posts_get(
+        self, *, site: str, posts: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        data = await self.call(site, "posts.get", {"site": site, "posts": posts})
+        return cast(dict[str, dict[str, Any]], data)
+
+    async def posts_get_many(
+        self,
+        *,
+        site: str,
+        batches: list[list[str]],
+    ) -> list[Union[dict[str, dict[str, Any]], xmlrpc.client.Fault]]:
+        return await self.call_concurrent(
+            site,
+            [("posts.get", ({"site": site, "posts": posts},)) for posts in batches],
+        )
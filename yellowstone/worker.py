@@ -0,0 +1,283 @@
+"""
+Pool of worker threads which process jobs concurrently.
+
+Jobs spend nearly all of their time blocked on a request to Wikidot,
+so many of them are run at once. The number of jobs in flight is capped
+both overall and per site, so no single wiki receives too many requests.
+
+Jobs are claimed from the queue in batches, so the pool also holds a small
+backlog of claimed jobs waiting for a free worker.
+
+Jobs can either be run on threads (WorkerPool) or as tasks on an event loop
+(AsyncWorkerPool), which allows many more to be in flight at once.
+"""
+
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, Optional, Union, cast
+
+from .job import JobDict
+
+logger = logging.getLogger(__name__)
+
+
+class JobPool(ABC):
+    """
+    Tracks which jobs are running or waiting, and on which sites.
+    Subclasses decide how a job is actually run.
+    """
+
+    __slots__ = (
+        "count",
+        "site_limit",
+        "site_limits",
+        "batch_size",
+        "running",
+        "backlog",
+        "site_running",
+        "site_load",
+        "wakeup",
+    )
+
+    count: int
+    site_limit: int
+    site_limits: dict[str, int]
+    batch_size: int
+    running: dict[Union[Future, asyncio.Future], JobDict]
+    backlog: deque[JobDict]
+    site_running: Counter[str]
+    site_load: Counter[str]
+    wakeup: Union[threading.Event, asyncio.Event]
+
+    def __init__(
+        self,
+        *,
+        count: int,
+        site_limit: int,
+        site_limits: dict[str, int],
+        batch_size: int,
+    ) -> None:
+        assert count >= 1, "Worker count must be positive"
+        assert site_limit >= 1, "Per-site worker limit must be positive"
+        assert all(limit >= 1 for limit in site_limits.values()), (
+            "Per-site worker limit must be positive"
+        )
+        assert batch_size >= 1, "Claim batch size must be positive"
+        self.count = count
+        self.site_limit = site_limit
+        self.site_limits = site_limits
+        self.batch_size = batch_size
+        self.running = {}
+        self.backlog = deque()
+        self.site_running = Counter()
+        self.site_load = Counter()
+
+    @property
+    def idle(self) -> bool:
+        return not self.running and not self.backlog
+
+    def wanted(self) -> int:
+        """
+        Returns how many jobs should be claimed now.
+
+        Nothing is claimed until the backlog has run dry, and then enough
+        jobs are claimed to refill it, so claims happen in batches of at
+        least the configured size.
+        """
+
+        outstanding = len(self.running) + len(self.backlog)
+        if outstanding > self.count:
+            return 0
+
+        return self.count + self.batch_size - outstanding
+
+    def limit(self, site_slug: str) -> int:
+        return self.site_limits.get(site_slug, self.site_limit)
+
+    def capacities(self, site_slugs: Iterable[str]) -> dict[str, int]:
+        """
+        Returns how many more jobs can be claimed for each site.
+        Sites which are already at their limit are left out.
+        """
+
+        capacities = {}
+        for site_slug in site_slugs:
+            capacity = self.limit(site_slug) - self.site_load[site_slug]
+            if capacity > 0:
+                capacities[site_slug] = capacity
+        return capacities
+
+    def add(self, jobs: list[JobDict]) -> None:
+        for job in jobs:
+            self.backlog.append(job)
+            self.site_load[job["site_slug"]] += 1
+
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        """
+        Submits jobs from the backlog, as far as the limits allow.
+        """
+
+        waiting: deque[JobDict] = deque()
+        while self.backlog:
+            job = self.backlog.popleft()
+            site_slug = job["site_slug"]
+            if len(self.running) >= self.count or self.site_running[
+                site_slug
+            ] >= self.limit(site_slug):
+                waiting.append(job)
+                continue
+
+            logger.debug("Submitting job %d for site '%s'", job["job_id"], site_slug)
+            future = self.submit(job)
+            self.running[future] = job
+            self.site_running[site_slug] += 1
+            future.add_done_callback(lambda _: self.wakeup.set())
+
+        self.backlog = waiting
+
+    @abstractmethod
+    def submit(self, job: JobDict) -> Union[Future, asyncio.Future]:
+        """
+        Starts running a job, returning a future for its completion.
+        """
+
+    def reap(self) -> None:
+        """
+        Removes finished jobs from the pool.
+
+        Jobs handle their own failures, so any exception which reaches
+        this point is fatal and is re-raised in the calling thread.
+        """
+
+        # Clear first, so a job finishing during the scan still wakes us
+        self.wakeup.clear()
+        for future in [future for future in self.running if future.done()]:
+            job = self.running.pop(future)
+            site_slug = job["site_slug"]
+            self.site_running[site_slug] -= 1
+            self.site_load[site_slug] -= 1
+            if not self.site_load[site_slug]:
+                del self.site_running[site_slug]
+                del self.site_load[site_slug]
+
+            future.result()
+
+        self.dispatch()
+
+    def drop_backlog(self) -> None:
+        if self.backlog:
+            logger.warning("Dropping %d claimed jobs", len(self.backlog))
+            self.backlog.clear()
+
+
+class WorkerPool(JobPool):
+    __slots__ = ("executor", "process")
+
+    executor: ThreadPoolExecutor
+    process: Callable[[JobDict], None]
+    wakeup: threading.Event
+
+    def __init__(
+        self,
+        process: Callable[[JobDict], None],
+        *,
+        count: int,
+        site_limit: int,
+        site_limits: Optional[dict[str, int]] = None,
+        batch_size: int = 1,
+        wakeup: Optional[threading.Event] = None,
+    ) -> None:
+        super().__init__(
+            count=count,
+            site_limit=site_limit,
+            site_limits=site_limits or {},
+            batch_size=batch_size,
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=count,
+            thread_name_prefix="worker",
+        )
+        self.process = process
+        self.wakeup = wakeup or threading.Event()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.shutdown()
+
+    def submit(self, job: JobDict) -> Future:
+        return self.executor.submit(self.process, job)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until a running job finishes since the last reap,
+        or the timeout elapses.
+
+        If the wakeup event is shared, anything else setting it
+        (such as new jobs being queued) also ends the wait.
+        """
+
+        self.wakeup.wait(timeout)
+
+    def shutdown(self) -> None:
+        self.drop_backlog()
+        logger.debug("Waiting for %d running jobs to finish", len(self.running))
+        self.executor.shutdown(wait=True)
+
+
+class AsyncWorkerPool(JobPool):
+    """
+    Runs jobs as tasks on the current event loop.
+    It must be created and used from within that loop.
+    """
+
+    __slots__ = ("process",)
+
+    process: Callable[[JobDict], Awaitable[None]]
+    wakeup: asyncio.Event
+
+    def __init__(
+        self,
+        process: Callable[[JobDict], Awaitable[None]],
+        *,
+        count: int,
+        site_limit: int,
+        site_limits: Optional[dict[str, int]] = None,
+        batch_size: int = 1,
+    ) -> None:
+        super().__init__(
+            count=count,
+            site_limit=site_limit,
+            site_limits=site_limits or {},
+            batch_size=batch_size,
+        )
+        self.process = process
+        self.wakeup = asyncio.Event()
+
+    async def __aenter__(self) -> "AsyncWorkerPool":
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.shutdown()
+
+    def submit(self, job: JobDict) -> asyncio.Future:
+        return asyncio.ensure_future(self.process(job))
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    async def shutdown(self) -> None:
+        self.drop_backlog()
+        logger.debug("Waiting for %d running jobs to finish", len(self.running))
+        if self.running:
+            await asyncio.wait([cast(asyncio.Future, task) for task in self.running])